@@ -0,0 +1,133 @@
+"""Benchmark of the jitter-buffered audio output against unpaced blobs.
+
+Replays TTS chunk arrivals with random jitter (a streamed or chunked
+reply) and compares, for several pre-roll sizes, how soon the
+caller hears audio, how often playback underruns and how evenly frames
+are paced. The unpaced row models a client playing each blob as it
+arrives. Run from ``backend/``::
+
+    python -m benchmarks.audio_output --chunks 30 --chunk-ms 200 --jitter-ms 150
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from src.agent.audio_output import AudioOutputScheduler
+
+SAMPLE_RATE = 16000
+BYTES_PER_MS = SAMPLE_RATE * 2 // 1000
+
+
+def arrival_plan(args, seed: int):
+    """(arrival offset s, audio bytes) per chunk: real time plus jitter."""
+    rng = random.Random(seed)
+    plan = []
+    produced_ms = 0.0
+    for _ in range(args.chunks):
+        # Chunks are synthesized ahead of real time, but each one may be late
+        due_ms = args.first_ms + produced_ms * args.synthesis_ratio
+        delay_ms = due_ms + rng.uniform(0, args.jitter_ms)
+        plan.append((delay_ms / 1000, bytes(int(args.chunk_ms * BYTES_PER_MS))))
+        produced_ms += args.chunk_ms
+    return sorted(plan, key=lambda item: item[0])
+
+
+def unpaced(plan):
+    """Audible gaps when each blob is played as soon as it arrives."""
+    playhead = None
+    gaps = 0
+    gap_ms = 0.0
+    for offset, audio in plan:
+        arrival_ms = offset * 1000
+        if playhead is not None and arrival_ms > playhead:
+            gaps += 1
+            gap_ms += arrival_ms - playhead
+        start = arrival_ms if playhead is None else max(playhead, arrival_ms)
+        playhead = start + len(audio) / BYTES_PER_MS
+    return {
+        'first_ms': plan[0][0] * 1000,
+        'underruns': gaps,
+        'silence_ms': gap_ms,
+        'jitter_ms': None,
+    }
+
+
+async def paced(plan, preroll_ms: int, frame_ms: int):
+    """Feed the plan through the scheduler and measure what the caller hears."""
+    frame_times = []
+
+    async def sink(frame: bytes):
+        frame_times.append(time.perf_counter())
+
+    scheduler = AudioOutputScheduler(sink, SAMPLE_RATE, frame_ms=frame_ms, preroll_ms=preroll_ms)
+    scheduler.start()
+
+    started = time.perf_counter()
+    for offset, audio in plan:
+        delay = started + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        scheduler.push(audio)
+    scheduler.end_turn()
+
+    while scheduler.buffer or scheduler.playing:
+        await asyncio.sleep(frame_ms / 1000)
+    await scheduler.close()
+
+    intervals = [(b - a) * 1000 for a, b in zip(frame_times, frame_times[1:])]
+    return {
+        'first_ms': (frame_times[0] - started) * 1000,
+        'underruns': scheduler.underruns,
+        'silence_ms': scheduler.silence_frames * frame_ms,
+        'jitter_ms': statistics.pstdev(intervals) if len(intervals) > 1 else 0.0,
+    }
+
+
+def average(results):
+    """Average each metric over the runs."""
+    keys = results[0].keys()
+    return {
+        key: (
+            sum(r[key] for r in results) / len(results)
+            if results[0][key] is not None else None
+        )
+        for key in keys
+    }
+
+
+async def run(args):
+    """Compare unpaced playback with the scheduler at several pre-rolls."""
+    plans = [arrival_plan(args, seed) for seed in range(args.repeat)]
+    total_ms = args.chunks * args.chunk_ms
+    print(f'{args.chunks} chunks x {args.chunk_ms:.0f} ms = {total_ms / 1000:.1f} s of audio, '
+          f'jitter up to {args.jitter_ms:.0f} ms, {args.repeat} runs')
+
+    rows = [('unpaced blobs', average([unpaced(p) for p in plans]))]
+    for preroll in args.preroll:
+        results = [await paced(p, preroll, args.frame_ms) for p in plans]
+        rows.append((f'paced, pre-roll {preroll} ms', average(results)))
+
+    print(f'{"":<26} {"first audio ms":>15} {"underruns":>10} {"silence ms":>11} {"frame jitter ms":>16}')
+    for label, r in rows:
+        jitter = f'{r["jitter_ms"]:.2f}' if r['jitter_ms'] is not None else 'n/a'
+        print(f'{label:<26} {r["first_ms"]:>15.1f} {r["underruns"]:>10.2f} '
+              f'{r["silence_ms"]:>11.1f} {jitter:>16}')
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--chunks', type=int, default=30)
+    parser.add_argument('--chunk-ms', type=float, default=200.0)
+    parser.add_argument('--first-ms', type=float, default=300.0)
+    parser.add_argument('--synthesis-ratio', type=float, default=0.9)
+    parser.add_argument('--jitter-ms', type=float, default=150.0)
+    parser.add_argument('--frame-ms', type=int, default=20)
+    parser.add_argument('--preroll', type=int, nargs='+', default=[60, 200, 400, 600])
+    parser.add_argument('--repeat', type=int, default=3)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
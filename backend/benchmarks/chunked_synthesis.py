@@ -0,0 +1,88 @@
+"""Benchmark of chunked parallel synthesis against a single TTS call.
+
+Uses a latency model of the TTS provider (fixed overhead + per-character
+generation time) by default; ``--real`` calls ElevenLabs with the keys in
+``.env``. Run from ``backend/``::
+
+    python -m benchmarks.chunked_synthesis --base-ms 350 --per-char-ms 6
+"""
+import argparse
+import asyncio
+import time
+from src.services.synthesis import plan_chunks, synthesize_ordered
+
+CLOSING_MESSAGE = (
+    'Ocorrência registrada!\n'
+    'Protocolo: DEMO-OCD4-8812\n'
+    'Prazo: 4 horas\n\n'
+    'A equipe precisa de livre acesso ao local.\n'
+    'Se a energia voltar antes, nos avise.\n\n'
+    'Posso te ajudar com algo mais?'
+)
+
+
+def simulated_tts(base_ms: float, per_char_ms: float):
+    """Return a fake TTS call following the latency model."""
+    async def synthesize(text: str) -> bytes:
+        await asyncio.sleep((base_ms + per_char_ms * len(text)) / 1000)
+        return bytes(len(text))
+    return synthesize
+
+
+async def measure_single(synthesize, text: str):
+    """Time one serial call: first audio and total are the same."""
+    started = time.perf_counter()
+    await synthesize(text)
+    elapsed = (time.perf_counter() - started) * 1000
+    return elapsed, elapsed
+
+
+async def measure_chunked(synthesize, text: str, concurrency: int):
+    """Time ordered chunked synthesis: first chunk and full reply."""
+    started = time.perf_counter()
+    first = None
+    async for _ in synthesize_ordered(plan_chunks(text), synthesize, concurrency):
+        if first is None:
+            first = (time.perf_counter() - started) * 1000
+    return first, (time.perf_counter() - started) * 1000
+
+
+async def run(args):
+    """Compare the single call with chunked synthesis at several caps."""
+    if args.real:
+        from src.services.elevenlabs import ElevenLabsService
+        synthesize = ElevenLabsService().text_to_speech
+    else:
+        synthesize = simulated_tts(args.base_ms, args.per_char_ms)
+
+    chunks = plan_chunks(CLOSING_MESSAGE)
+    print(f'{len(CLOSING_MESSAGE)} chars -> {len(chunks)} chunks: {[len(c) for c in chunks]}')
+
+    rows = [('single call', lambda: measure_single(synthesize, CLOSING_MESSAGE))]
+    for concurrency in args.concurrency:
+        rows.append((
+            f'chunked (cap {concurrency})',
+            lambda c=concurrency: measure_chunked(synthesize, CLOSING_MESSAGE, c),
+        ))
+
+    print(f'{"":<20} {"first audio ms":>15} {"total ms":>10}')
+    for label, measure in rows:
+        results = [await measure() for _ in range(args.repeat)]
+        first = sum(r[0] for r in results) / len(results)
+        total = sum(r[1] for r in results) / len(results)
+        print(f'{label:<20} {first:>15.1f} {total:>10.1f}')
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--base-ms', type=float, default=350.0)
+    parser.add_argument('--per-char-ms', type=float, default=6.0)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 3, 4])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--real', action='store_true')
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
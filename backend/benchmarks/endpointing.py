@@ -0,0 +1,149 @@
+"""Benchmark of adaptive endpointing against fixed commit rules.
+
+Simulates the Deepgram event stream of typical caller answers (names, UC
+and CPF dictated in groups, "sim", free speech with pauses) and compares
+three rules: commit on every final (cuts dictated numbers), commit on the
+fixed 1000 ms UtteranceEnd, and the adaptive endpointer. Times are scaled
+down by ``--scale`` to run quickly and reported at real scale. Run from
+``backend/``::
+
+    python -m benchmarks.endpointing --scale 4
+"""
+import argparse
+import asyncio
+import time
+from src.agent.endpointing import Endpointer, expected_answer
+from src.agent.gisa_prompt import GISA_UC_VALIDATED
+from src.models import ConversationMessage, SessionState
+
+WORD_MS = 250
+DEEPGRAM_ENDPOINTING_MS = 300
+UTTERANCE_END_MS = 1000
+
+WINDOWS_MS = {'confirmation': 400, 'name': 500, 'free': 400, 'digits': 1500}
+
+
+def after(line: str) -> str:
+    """Answer kind the agent expects in FASE_3 after GISA says a line."""
+    state = SessionState(session_id='bench', start_time=0.0, current_phase='FASE_3')
+    state.conversation_history.append(
+        ConversationMessage(role='assistant', content=line, timestamp=0.0)
+    )
+    return expected_answer(state)
+
+
+# (expected answer, [(segment, pause after it in ms)])
+CORPUS = [
+    ('name', [('Oi, aqui é a Maria Souza', 0)]),
+    ('digits', [('um dois três', 700), ('quatro cinco seis', 0)]),
+    ('digits', [('meu CPF é um dois três', 800), ('quatro cinco seis', 600),
+                ('sete oito nove', 500), ('zero zero', 0)]),
+    ('digits', [('não sei o número', 0)]),
+    ('confirmation', [('sim', 0)]),
+    ('confirmation', [('não, obrigado', 0)]),
+    ('free', [('a rua inteira está sem luz', 400), ('desde ontem à noite', 0)]),
+    ('free', [('tem manutenção programada hoje', 0)]),
+    # First FASE_3 turn, right after the UC was validated: free speech, not digits
+    (after(GISA_UC_VALIDATED), [('tem manutenção programada hoje', 0)]),
+    (after('Claro. Poderia me informar o seu CPF?'),
+     [('um dois três', 800), ('quatro cinco seis', 600), ('sete oito nove', 500),
+      ('zero zero', 0)]),
+]
+
+
+def events(segments):
+    """Deepgram events (ms, type, payload) and the end of speech for one answer."""
+    timeline = []
+    clock = 0.0
+    for index, (text, pause_ms) in enumerate(segments):
+        last = index == len(segments) - 1
+        # Interim results keep arriving while the caller speaks
+        for _ in text.split():
+            timeline.append((clock, 'interim', text))
+            clock += WORD_MS
+        gap = float('inf') if last else pause_ms
+        speech_final = gap >= DEEPGRAM_ENDPOINTING_MS
+        final_at = clock + (DEEPGRAM_ENDPOINTING_MS if speech_final else 0)
+        timeline.append((final_at, 'final', (text, speech_final)))
+        if gap >= UTTERANCE_END_MS:
+            timeline.append((clock + UTTERANCE_END_MS, 'utterance_end', None))
+        clock += 0 if last else pause_ms
+    return sorted(timeline, key=lambda e: e[0]), clock
+
+
+def every_final(timeline, end_ms):
+    """Old rule: each final starts a turn."""
+    commits = [at for at, kind, _ in timeline if kind == 'final']
+    return commits[-1] - end_ms, len(commits) - 1
+
+
+def utterance_end(timeline, end_ms):
+    """Fixed rule: commit on the first UtteranceEnd."""
+    first = min(at for at, kind, _ in timeline if kind == 'utterance_end')
+    return first - end_ms, int(first < end_ms)
+
+
+async def adaptive(timeline, end_ms, expected: str, scale: float):
+    """Run the real endpointer over the scaled event stream."""
+    commits = []
+    started = time.monotonic()
+
+    async def commit(text: str):
+        commits.append((time.monotonic() - started) * 1000 * scale)
+
+    endpointer = Endpointer(
+        commit, lambda: expected, {k: v / scale for k, v in WINDOWS_MS.items()}
+    )
+    for at, kind, payload in timeline:
+        delay = started + at / scale / 1000 - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if kind == 'interim':
+            endpointer.on_activity()
+        elif kind == 'final':
+            await endpointer.on_final(*payload)
+        else:
+            await endpointer.on_utterance_end()
+
+    deadline = time.monotonic() + max(WINDOWS_MS.values()) / scale / 1000 + 0.1
+    while endpointer.pending and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    endpointer.close()
+    cuts = sum(1 for at in commits if at < end_ms)
+    return commits[-1] - end_ms, cuts
+
+
+async def run(args):
+    """Compare the three rules over the corpus."""
+    rows = []
+    for expected, segments in CORPUS:
+        timeline, end_ms = events(segments)
+        rows.append((
+            expected,
+            ' / '.join(text for text, _ in segments),
+            every_final(timeline, end_ms),
+            utterance_end(timeline, end_ms),
+            await adaptive(timeline, end_ms, expected, args.scale),
+        ))
+
+    print('latency from end of speech to turn start (ms), and cut-offs (turns started mid-answer)')
+    print(f'{"answer":<14} {"every final":>14} {"utterance end":>14} {"adaptive":>14}  utterance')
+    for expected, text, *results in rows:
+        cells = [f'{lat:>8.0f} ({cuts})' for lat, cuts in results]
+        print(f'{expected:<14} {cells[0]:>14} {cells[1]:>14} {cells[2]:>14}  {text[:48]}')
+
+    for index, label in enumerate(('every final', 'utterance end', 'adaptive')):
+        latencies = [r[2 + index][0] for r in rows]
+        cuts = sum(r[2 + index][1] for r in rows)
+        print(f'{label:<14} avg {sum(latencies) / len(latencies):>6.0f} ms, {cuts} cut-offs')
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', type=float, default=4.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark of per-call logging cost on the calling (event-loop) thread.
+
+Compares the old synchronous ``print`` with the queue-backed structured
+logger. Output goes to a line-buffered file, like stdout under a process
+supervisor. Run from ``backend/``::
+
+    python -m benchmarks.logging_overhead --calls 50000
+    python -m benchmarks.logging_overhead --calls 5000 --stall-us 200
+"""
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+from src.context import current_session_id, current_phase
+from src.observability import logs
+
+
+class SlowSink:
+    """Line-buffered output whose writes stall, like a full pipe or slow terminal."""
+
+    def __init__(self, target, stall_us: float):
+        """Initialize sink."""
+        self.target = target
+        self.stall_s = stall_us / 1e6
+
+    def write(self, text: str) -> int:
+        """Write after the stall."""
+        if self.stall_s:
+            time.sleep(self.stall_s)
+        return self.target.write(text)
+
+    def flush(self):
+        """Flush the target."""
+        self.target.flush()
+
+
+def bench(label: str, fn, calls: int):
+    """Run fn ``calls`` times and print the cost per call."""
+    started = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    elapsed = time.perf_counter() - started
+    print(f'{label:<32} {elapsed / calls * 1e6:>8.2f} us/call', file=sys.__stdout__)
+
+
+def main():
+    """Compare print with structured, sampled and filtered logging."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=50000)
+    parser.add_argument('--stall-us', type=float, default=0.0, help='simulated stdout stall per write')
+    args = parser.parse_args()
+
+    current_session_id.set('bench-session')
+    current_phase.set('FASE_3')
+    transcript = 'a rua inteira está sem luz desde ontem'
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = SlowSink(open(os.path.join(tmp, 'stdout.log'), 'w', buffering=1), args.stall_us)
+
+        with contextlib.redirect_stdout(out):
+            bench('print (interim)', lambda i: print(f'💭 Interim: {transcript} {i}'), args.calls)
+
+            logs.setup_logging('DEBUG')
+            log = logs.get_logger('benchmark')
+            bench(
+                'log.info structured',
+                lambda i: log.info('interim transcript', stage='stt', transcript=transcript, n=i),
+                args.calls,
+            )
+            bench(
+                'log.debug sampled 5%',
+                lambda i: log.debug('interim transcript', stage='stt', transcript=transcript, sample=0.05),
+                args.calls,
+            )
+            logs.logging.getLogger('gisa.benchmark').setLevel('INFO')
+            bench(
+                'log.debug filtered by level',
+                lambda i: log.debug('interim transcript', stage='stt', transcript=transcript),
+                args.calls,
+            )
+
+            drain_started = time.perf_counter()
+            logs.shutdown_logging()
+            drain = time.perf_counter() - drain_started
+
+        out.target.close()
+
+    print(f'(background writer drained the queue in {drain * 1000:.1f} ms after the run)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Benchmark of phase-scoped prompt assembly against the full prompt.
+
+For a typical turn in each phase and scenario group, compares the input
+sent to Gemini (system prompt plus conversation so far) with the full
+prompt and with the scoped one. Offline, tokens are estimated at ~4
+characters per token and latency from a prefill cost per 1k input tokens;
+with ``--live`` (needs ``GOOGLE_API_KEY``) every turn is sent to Gemini
+and the reported usage and measured latency are used instead. Run from
+``backend/``::
+
+    python -m benchmarks.prompt_scoping --prefill-ms-per-1k 120
+    python -m benchmarks.prompt_scoping --live --repeat 3
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from src.agent.gisa_prompt import GISA_INITIAL_MESSAGE, GISA_UC_REQUEST, GISA_UC_VALIDATED
+from src.agent.prompt_builder import build_prompt
+from src.config import settings
+from src.context import current_ledger, current_phase, current_scenario
+from src.models import ConversationMessage
+from src.observability.ledger import ResourceLedger
+from src.services.gemini import CHARS_PER_TOKEN
+
+ACK = 'Entendido. Vou seguir essas diretrizes.'
+
+# (label, phase, scenario, caller utterance)
+TURNS = [
+    ('FASE_1 greeting', 'FASE_1', None, 'Oi, aqui é a Maria'),
+    ('FASE_2 UC', 'FASE_2', None, 'é um dois três quatro'),
+    ('FASE_3 unclassified', 'FASE_3', None, 'estou com um problema na energia'),
+    ('FASE_3 A (A2)', 'FASE_3', 'A2', 'o disjuntor desarma toda hora'),
+    ('FASE_3 B (B1)', 'FASE_3', 'B1', 'tem manutenção programada hoje?'),
+    ('FASE_3 C (C2)', 'FASE_3', 'C2', 'a rua inteira está sem luz'),
+    ('FASE_3 D (D1)', 'FASE_3', 'D1', 'a equipe veio mas não resolveu'),
+]
+
+# Conversation before the turn, per phase
+HISTORY = {
+    'FASE_1': [('assistant', GISA_INITIAL_MESSAGE)],
+    'FASE_2': [('assistant', GISA_INITIAL_MESSAGE), ('user', 'Maria'),
+               ('assistant', GISA_UC_REQUEST)],
+    'FASE_3': [('assistant', GISA_INITIAL_MESSAGE), ('user', 'Maria'),
+               ('assistant', GISA_UC_REQUEST), ('user', 'um dois três quatro'),
+               ('assistant', GISA_UC_VALIDATED)],
+}
+
+
+def conversation(phase: str, utterance: str):
+    """History sent with the turn, ending with the caller's utterance."""
+    messages = [ConversationMessage(role=role, content=text, timestamp=0.0)
+                for role, text in HISTORY[phase]]
+    messages.append(ConversationMessage(role='user', content=utterance, timestamp=0.0))
+    return messages
+
+
+def estimated_tokens(system_prompt: str, history) -> int:
+    """Input tokens at ~4 characters per token."""
+    chars = len(system_prompt) + len(ACK) + sum(len(m.content) for m in history)
+    return chars // CHARS_PER_TOKEN
+
+
+def offline(args):
+    """Estimate input tokens and prefill latency per turn."""
+    print(f'estimated: ~{CHARS_PER_TOKEN} chars/token, '
+          f'{args.prefill_ms_per_1k:.0f} ms prefill per 1k input tokens')
+    rows = []
+    for label, phase, scenario, utterance in TURNS:
+        history = conversation(phase, utterance)
+        full = estimated_tokens(build_prompt(''), history)
+        scoped = estimated_tokens(build_prompt(phase, scenario), history)
+        rows.append((label, full, scoped,
+                     full * args.prefill_ms_per_1k / 1000,
+                     scoped * args.prefill_ms_per_1k / 1000))
+    report(rows)
+
+    # Assembly cost: precompiled lookup per turn
+    started = time.perf_counter()
+    for _ in range(100000):
+        build_prompt('FASE_3', 'B1')
+    print(f'build_prompt: {(time.perf_counter() - started) * 10:.3f} us per turn')
+
+
+async def live(args):
+    """Send every turn to Gemini with and without scoping."""
+    from src.services.gemini import GeminiService
+
+    service = GeminiService()
+    service.cache = None
+    rows = []
+    for label, phase, scenario, utterance in TURNS:
+        history = conversation(phase, utterance)
+        current_phase.set(phase)
+        current_scenario.set(scenario)
+        measured = {}
+        for scoped in (False, True):
+            settings.prompt_scoping_enabled = scoped
+            tokens, latencies = [], []
+            for _ in range(args.repeat):
+                ledger = ResourceLedger()
+                current_ledger.set(ledger)
+                started = time.perf_counter()
+                await service.generate_response(history)
+                latencies.append((time.perf_counter() - started) * 1000)
+                tokens.append(ledger.totals.get('llm_input_tokens', 0))
+            measured[scoped] = (statistics.mean(tokens), statistics.median(latencies))
+        rows.append((label, measured[False][0], measured[True][0],
+                     measured[False][1], measured[True][1]))
+    print(f'live: {args.repeat} calls per turn and variant (median latency)')
+    report(rows)
+
+
+def report(rows):
+    """Print tokens and latency per turn, then the FASE_3 average."""
+    print(f'{"turn":<22} {"full tok":>9} {"scoped tok":>11} {"saved":>7} '
+          f'{"full ms":>9} {"scoped ms":>10}')
+    for label, full, scoped, full_ms, scoped_ms in rows:
+        print(f'{label:<22} {full:>9.0f} {scoped:>11.0f} {1 - scoped / full:>7.0%} '
+              f'{full_ms:>9.1f} {scoped_ms:>10.1f}')
+    fase_3 = [r for r in rows if r[0].startswith('FASE_3')]
+    full = sum(r[1] for r in fase_3)
+    scoped = sum(r[2] for r in fase_3)
+    print(f'FASE_3 turns: {1 - scoped / full:.0%} fewer input tokens, '
+          f'{statistics.mean(r[3] - r[4] for r in fase_3):.1f} ms faster on average')
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--live', action='store_true')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--prefill-ms-per-1k', type=float, default=120.0)
+    args = parser.parse_args()
+    if args.live:
+        asyncio.run(live(args))
+    else:
+        offline(args)
+
+
+if __name__ == '__main__':
+    main()
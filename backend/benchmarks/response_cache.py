@@ -0,0 +1,122 @@
+"""Benchmark of the FASE_3 reply cache over a stream of caller questions.
+
+Draws FASE_3 turns from paraphrases of common questions (popular ones
+more often), including turns that must bypass the cache (registrations,
+digits, the caller's name), and reports the hit rate and the LLM latency
+with and without the cache. LLM latency is simulated, so it runs offline.
+Run from ``backend/``::
+
+    python -m benchmarks.response_cache --turns 2000 --llm-ms 900
+"""
+import argparse
+import random
+import statistics
+from src.services.response_cache import ResponseCache
+
+LOOKUP_MS = 0.05
+
+# (weight, reply, paraphrases)
+QUESTIONS = [
+    (8, 'A manutenção programada vai das 14h às 17h.', [
+        'tem manutenção programada hoje?',
+        'Oi, tem manutenção programada hoje?',
+        'tem manutencao programada hoje, né?',
+        'é manutenção programada?',
+    ]),
+    (6, 'Seu protocolo DEMO-2024150 está dentro do prazo.', [
+        'quanto tempo falta do meu protocolo?',
+        'Quanto tempo falta pro meu protocolo?',
+        'já tenho protocolo, quanto tempo falta?',
+    ]),
+    (4, 'A iluminação pública é responsabilidade da prefeitura.', [
+        'a luz do poste da rua apagou',
+        'o poste da rua está apagado',
+    ]),
+    (3, 'Recomendo chamar um eletricista particular.', [
+        'o disjuntor desarma toda hora',
+        'meu disjuntor desarma toda hora',
+    ]),
+    (3, 'Identifiquei um débito de R$ 478,00.', [
+        'cortaram a minha luz',
+        'acho que cortaram a luz por conta atrasada',
+    ]),
+    (2, 'A verificação tem uma taxa de R$ 40,00.', [
+        'a equipe EPB disse que vão cobrar taxa',
+    ]),
+    # Must never be cached: new registrations, digits, the caller's name
+    (5, 'Ocorrência registrada! Protocolo: DEMO-REG-{n}', [
+        'a rua inteira está sem luz',
+        'só minha casa está sem luz',
+    ]),
+    (2, 'Claro, {name}! A manutenção vai das 14h às 17h.', [
+        'é a {name}, tem manutenção programada hoje?',
+    ]),
+    (2, 'A manutenção programada vai das 14h às 17h.', [
+        'na UC 1234 tem manutenção programada?',
+    ]),
+]
+
+NAMES = ['Maria', 'João', 'Ana Paula', 'Carlos']
+
+
+def turns(count: int, seed: int):
+    """(utterance, reply, caller name) per simulated FASE_3 turn."""
+    rng = random.Random(seed)
+    weights = [w for w, _, _ in QUESTIONS]
+    for n in range(count):
+        _, reply, paraphrases = rng.choices(QUESTIONS, weights)[0]
+        name = rng.choice(NAMES)
+        utterance = rng.choice(paraphrases).format(name=name)
+        yield utterance, reply.format(n=n, name=name), name
+
+
+def percentile(values, p: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def main():
+    """Run the turn stream with and without the cache."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--turns', type=int, default=2000)
+    parser.add_argument('--llm-ms', type=float, default=900.0)
+    parser.add_argument('--ttl-s', type=float, default=600.0)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cache = ResponseCache(ttl_s=args.ttl_s)
+    uncached, cached = [], []
+    leaks = 0
+
+    for utterance, reply, name in turns(args.turns, args.seed):
+        llm_ms = rng.lognormvariate(0, 0.35) * args.llm_ms
+        uncached.append(llm_ms)
+
+        slots = (name, '1234')
+        key = cache.key('gemini', 'FASE_3', utterance, slots)
+        hit = cache.get(key) if key else None
+        if hit is not None:
+            cached.append(LOOKUP_MS)
+            leaks += hit != reply
+            continue
+        cached.append(llm_ms)
+        if key:
+            cache.put(key, reply, llm_ms, slots)
+
+    stats = cache.stats()
+    print(f'{args.turns} FASE_3 turns, simulated LLM ~{args.llm_ms:.0f} ms')
+    print(f'hit rate {stats["hit_rate"]:.1%} of cacheable turns, '
+          f'{stats["hits"] / args.turns:.1%} of all turns; '
+          f'{stats["bypassed"]} bypassed, {stats["rejected"]} replies not stored, '
+          f'{leaks} wrong replies served')
+    print(f'{"":<14} {"mean ms":>9} {"p50 ms":>9} {"p95 ms":>9}')
+    for label, values in (('no cache', uncached), ('reply cache', cached)):
+        print(f'{label:<14} {statistics.mean(values):>9.1f} '
+              f'{percentile(values, 50):>9.1f} {percentile(values, 95):>9.1f}')
+    print(f'LLM time saved: {stats["saved_ms"] / 1000:.1f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,348 @@
+"""Scenario routing and latency benchmark over a labeled utterance corpus.
+
+Each utterance of ``benchmarks/scenario_corpus.jsonl`` (labeled with
+its scenario A1–D3 and whether a protocol must be registered) is run as a
+FASE_3 turn, with at most ``--concurrency`` turns in flight: the local
+classifier picks the candidate scenario (and so the prompt group) and an
+LLM replies. Reports, per scenario, the classifier's accuracy and,
+separately, the model's: the scenario it handled and whether it registered
+a protocol are read from its reply (protocol prefix or closing format),
+never from the classifier. Also latency percentiles and tokens. LLMs:
+
+- ``local`` (default): offline stand-in that answers the labeled scenario,
+  except on a seeded ``--local-accuracy`` share of turns, with seeded
+  latency that grows with the input tokens. Its model accuracy is that
+  parameter, not a measurement: it exercises the harness, latency and tokens
+- ``gemini``: the real ``GeminiService`` (needs ``GOOGLE_API_KEY``);
+  ``--record FILE`` saves its replies, latency and token usage
+- ``recorded``: replays a ``--record`` file offline, reproducibly
+
+Run from ``backend/``::
+
+    python -m benchmarks.scenarios
+    python -m benchmarks.scenarios --llm gemini --record recorded.json --concurrency 4
+    python -m benchmarks.scenarios --llm recorded --recordings recorded.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, List, Optional
+from src.agent.classifier import SCENARIO_GROUPS, classify
+from src.agent.dialogue import fold
+from src.agent.gisa_prompt import (
+    GISA_CLOSING_TEMPLATES, GISA_INITIAL_MESSAGE, GISA_SYSTEM_PROMPT, GISA_UC_REQUEST,
+    GISA_UC_VALIDATED,
+)
+from src.agent.prompt_builder import build_prompt
+from src.config import settings
+from src.context import current_ledger, current_phase, current_scenario
+from src.models import ConversationMessage, LLMResponse
+from src.observability.ledger import ResourceLedger, charge
+from src.services.gemini import CHARS_PER_TOKEN
+from src.services.providers import ProviderCapabilities
+from src.services.response_cache import FIXED_PROTOCOLS, PROTOCOL
+
+CORPUS = Path(__file__).parent / 'scenario_corpus.jsonl'
+
+# Conversation before the FASE_3 turn
+HISTORY = [
+    ('assistant', GISA_INITIAL_MESSAGE), ('user', 'Maria'),
+    ('assistant', GISA_UC_REQUEST), ('user', 'um dois três quatro'),
+    ('assistant', GISA_UC_VALIDATED),
+]
+
+# Protocol prefixes of the registering scenarios (the prompt's closing formats)
+REGISTRATION_PREFIX = {
+    'B3': 'DEMO-', 'C1': 'DEMO-', 'C2': 'DEMO-', 'C3': 'DEMO-',
+    'C4': 'DEMO-VIP-', 'D1': 'DEMO-OCD4-', 'D3': 'DEMO-EAC-',
+}
+
+# Stand-in replies without registration, per scenario
+STAND_IN_REPLIES = {
+    'A1': 'A iluminação pública é de responsabilidade da prefeitura. Posso te ajudar com algo mais?',
+    'A2': 'Como o disjuntor desarma só na sua casa, recomendo chamar um eletricista particular. '
+          'Posso te ajudar com algo mais?',
+    'A3': 'Não use esse equipamento e chame a assistência técnica. Posso te ajudar com algo mais?',
+    'A4': GISA_CLOSING_TEMPLATES['debt'].format(amount='R$ 478,00'),
+    'B1': 'Há uma manutenção programada das 14h às 17h. Posso te ajudar com algo mais?',
+    'B2': 'Seu protocolo DEMO-2024150 está dentro do prazo. Posso te ajudar com algo mais?',
+    'D2': GISA_CLOSING_TEMPLATES['inspection_fee'].format(amount='R$ 40,00'),
+}
+
+# Scenario of a new protocol, by prefix (longest first); plain DEMO- is any of these
+PROTOCOL_SCENARIOS = (
+    ('DEMO-VIP-', {'C4'}),
+    ('DEMO-OCD4-', {'D1'}),
+    ('DEMO-EAC-', {'D3'}),
+    ('DEMO-', {'B3', 'C1', 'C2', 'C3'}),
+)
+
+# Scenarios answered without registration, by what the reply says (folded)
+REPLY_SIGNALS = (
+    ('A1', ('iluminacao publica', 'prefeitura')),
+    ('A2', ('eletricista',)),
+    ('A3', ('assistencia tecnica',)),
+    ('A4', ('debito', 'religacao')),
+    ('B1', ('manutencao',)),
+    ('B2', ('2024150',)),
+    ('D2', ('taxa',)),
+)
+
+
+def reply_scenarios(text: str) -> FrozenSet[str]:
+    """Scenarios a reply is consistent with; empty if it shows none."""
+    protocols = set(PROTOCOL.findall(text)) - FIXED_PROTOCOLS
+    for prefix, scenarios in PROTOCOL_SCENARIOS:
+        if any(p.startswith(prefix) for p in protocols):
+            # A new registration citing the expired protocol is B3
+            if prefix == 'DEMO-' and 'DEMO-2024098' in text:
+                return frozenset({'B3'})
+            return frozenset(scenarios)
+    folded = fold(text)
+    return frozenset(
+        scenario for scenario, signals in REPLY_SIGNALS
+        if any(signal in folded for signal in signals)
+    )
+
+
+def load_corpus(path: Path) -> List[Dict]:
+    """Labeled utterances, one JSON object per line."""
+    with path.open(encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def conversation(utterance: str) -> List[ConversationMessage]:
+    """FASE_3 history ending with the caller's utterance."""
+    messages = [ConversationMessage(role=role, content=text, timestamp=0.0)
+                for role, text in HISTORY]
+    messages.append(ConversationMessage(role='user', content=utterance, timestamp=0.0))
+    return messages
+
+
+def input_chars(history: List[ConversationMessage]) -> int:
+    """Characters sent for a turn, with the prompt GeminiService would send."""
+    prompt = (
+        build_prompt(current_phase.get(), current_scenario.get())
+        if settings.prompt_scoping_enabled else GISA_SYSTEM_PROMPT
+    )
+    return len(prompt) + sum(len(m.content) for m in history)
+
+
+class LocalLLM:
+    """Offline stand-in: answers the labeled scenario, wrong on a seeded share of turns."""
+
+    capabilities = ProviderCapabilities()
+
+    def __init__(
+        self,
+        labels: Dict[str, str],
+        accuracy: float,
+        base_ms: float,
+        prefill_ms_per_1k: float,
+        speed: float,
+        seed: int,
+    ):
+        """Initialize stand-in with the corpus labels keyed by utterance."""
+        self.labels = labels
+        self.accuracy = accuracy
+        self.base_ms = base_ms
+        self.prefill_ms_per_1k = prefill_ms_per_1k
+        self.speed = speed
+        self.seed = seed
+
+    async def generate_response(
+        self,
+        conversation_history: List[ConversationMessage],
+        on_partial: Optional[Callable[[str], None]] = None,
+    ) -> LLMResponse:
+        """Reply in the prompt's closing format for the scenario it picked."""
+        utterance = conversation_history[-1].content
+        rng = random.Random(f'{self.seed}:{utterance}')
+
+        # Independent of the classifier, so model accuracy doesn't mirror routing
+        scenario = self.labels[utterance]
+        if rng.random() >= self.accuracy:
+            scenario = rng.choice([s for s in SCENARIO_GROUPS if s != scenario])
+
+        prefix = REGISTRATION_PREFIX.get(scenario)
+        if prefix:
+            number = zlib.crc32(utterance.encode()) % 10000
+            text = GISA_CLOSING_TEMPLATES['registration'].format(protocol=f'{prefix}{number:04d}')
+            if scenario == 'B3':
+                text = f'Seu protocolo DEMO-2024098 passou do prazo. {text}'
+        else:
+            text = STAND_IN_REPLIES[scenario]
+
+        input_tokens = input_chars(conversation_history) // CHARS_PER_TOKEN
+        latency_ms = (self.base_ms + input_tokens * self.prefill_ms_per_1k / 1000) \
+            * rng.lognormvariate(0, 0.25)
+        await asyncio.sleep(latency_ms / 1000 / self.speed)
+
+        charge('llm_input_tokens', input_tokens)
+        charge('llm_output_tokens', len(text) // CHARS_PER_TOKEN)
+        return LLMResponse(text=text, metadata={})
+
+
+class RecordedLLM:
+    """Replays replies, latency and token usage recorded from a live run."""
+
+    capabilities = ProviderCapabilities()
+
+    def __init__(self, recordings: Dict[str, Dict], speed: float):
+        """Initialize with recordings keyed by utterance."""
+        self.recordings = recordings
+        self.speed = speed
+
+    async def generate_response(
+        self,
+        conversation_history: List[ConversationMessage],
+        on_partial: Optional[Callable[[str], None]] = None,
+    ) -> LLMResponse:
+        """Return the recorded reply after the recorded latency."""
+        recorded = self.recordings[conversation_history[-1].content]
+        await asyncio.sleep(recorded['latency_ms'] / 1000 / self.speed)
+        charge('llm_input_tokens', recorded['input_tokens'])
+        charge('llm_output_tokens', recorded['output_tokens'])
+        return LLMResponse(text=recorded['reply'], metadata={})
+
+
+async def run_turn(llm, item: Dict, semaphore: asyncio.Semaphore, speed: float) -> Dict:
+    """Route and answer one utterance as a FASE_3 turn."""
+    async with semaphore:
+        # Each turn runs in its own task, so these stay per turn
+        ledger = ResourceLedger()
+        current_ledger.set(ledger)
+        current_phase.set('FASE_3')
+
+        started = time.perf_counter()
+        classified = classify(item['utterance'])
+        current_scenario.set(classified)
+        response = await llm.generate_response(conversation(item['utterance']))
+        latency_ms = (time.perf_counter() - started) * 1000 * speed
+
+    # Protocols from the simulation data (B2's active one) are not new registrations
+    protocols = set(PROTOCOL.findall(response.text)) - FIXED_PROTOCOLS
+    return {
+        **item,
+        'classified': classified,
+        'answered': sorted(reply_scenarios(response.text)),
+        'registered': bool(protocols),
+        'reply': response.text,
+        'latency_ms': latency_ms,
+        'input_tokens': int(ledger.totals.get('llm_input_tokens', 0)),
+        'output_tokens': int(ledger.totals.get('llm_output_tokens', 0)),
+    }
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def report(results: List[Dict], show_misses: int):
+    """Print classifier and model accuracy, latency percentiles and tokens per scenario."""
+    print(f'{"scenario":<9} {"n":>3} {"classifier":>10} {"model":>6} {"protocol":>9} '
+          f'{"p50 ms":>8} {"p95 ms":>8} {"in tok":>7} {"out tok":>8}')
+    by_scenario: Dict[str, List[Dict]] = {}
+    for result in results:
+        by_scenario.setdefault(result['scenario'], []).append(result)
+
+    for label, rows in [*sorted(by_scenario.items()), ('all', results)]:
+        latencies = [r['latency_ms'] for r in rows]
+        print(
+            f'{label:<9} {len(rows):>3} '
+            f'{statistics.mean(r["classified"] == r["scenario"] for r in rows):>10.0%} '
+            f'{statistics.mean(r["scenario"] in r["answered"] for r in rows):>6.0%} '
+            f'{statistics.mean(r["registered"] == r["protocol"] for r in rows):>9.0%} '
+            f'{percentile(latencies, 50):>8.0f} {percentile(latencies, 95):>8.0f} '
+            f'{statistics.mean(r["input_tokens"] for r in rows):>7.0f} '
+            f'{statistics.mean(r["output_tokens"] for r in rows):>8.0f}'
+        )
+    print('model: scenario read from the reply; a plain DEMO- registration '
+          'counts for any of B3/C1/C2/C3')
+
+    misses = [r for r in results
+              if r['scenario'] not in r['answered'] or r['registered'] != r['protocol']]
+    for r in misses[:show_misses]:
+        print(f'  miss {r["scenario"]} -> model {"/".join(r["answered"]) or "-"}, '
+              f'classifier {r["classified"] or "-"} '
+              f'(protocol {r["registered"]}, expected {r["protocol"]}): {r["utterance"]}')
+
+
+async def run(args):
+    """Build the LLM, run the corpus and report."""
+    corpus = load_corpus(Path(args.corpus))
+    speed = args.speed
+    if args.llm == 'gemini':
+        from src.services.gemini import GeminiService
+
+        llm = GeminiService()
+        # Measure the model, not the reply cache
+        llm.cache = None
+        speed = 1.0
+    elif args.llm == 'recorded':
+        llm = RecordedLLM(json.loads(Path(args.recordings).read_text(encoding='utf-8')), speed)
+    else:
+        labels = {item['utterance']: item['scenario'] for item in corpus}
+        llm = LocalLLM(
+            labels, args.local_accuracy, args.base_ms, args.prefill_ms_per_1k, speed, args.seed
+        )
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(run_turn(llm, item, semaphore, speed) for item in corpus))
+    elapsed = time.perf_counter() - started
+
+    print(f'{len(results)} utterances, llm={args.llm}, concurrency {args.concurrency}, '
+          f'prompt scoping {"on" if settings.prompt_scoping_enabled else "off"}, '
+          f'{elapsed:.1f} s wall')
+    report(results, args.show_misses)
+
+    if args.record:
+        recordings = {
+            r['utterance']: {
+                'reply': r['reply'],
+                'latency_ms': round(r['latency_ms'], 1),
+                'input_tokens': r['input_tokens'],
+                'output_tokens': r['output_tokens'],
+            }
+            for r in results
+        }
+        Path(args.record).write_text(
+            json.dumps(recordings, ensure_ascii=False, indent=2), encoding='utf-8'
+        )
+        print(f'recorded {len(recordings)} responses to {args.record}')
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--llm', choices=('local', 'gemini', 'recorded'), default='local')
+    parser.add_argument('--corpus', default=str(CORPUS))
+    parser.add_argument('--recordings', help='file written by --record (for --llm recorded)')
+    parser.add_argument('--record', help='save replies, latency and tokens to this file')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--speed', type=float, default=10.0,
+                        help='time compression of offline latencies (reported at real scale)')
+    parser.add_argument('--base-ms', type=float, default=450.0)
+    parser.add_argument('--prefill-ms-per-1k', type=float, default=120.0)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--local-accuracy', type=float, default=0.9,
+                        help='share of turns the local stand-in answers as labeled')
+    parser.add_argument('--show-misses', type=int, default=20)
+    args = parser.parse_args()
+    if args.llm == 'recorded' and not args.recordings:
+        parser.error('--llm recorded needs --recordings')
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark of session-start latency with and without the warm STT pool.
+
+Sessions arrive as a Poisson process; opening a live connection is modelled
+as a fixed handshake cost plus jitter. Run from ``backend/``::
+
+    python -m benchmarks.stt_pool --rate 2 --duration 20 --open-ms 300
+"""
+import argparse
+import asyncio
+import random
+import time
+from src.services.budget import ProviderBudget
+from src.services.deepgram_pool import LiveConnectionPool
+from src.services.resilience import LatencyTracker
+from src.services.scheduler import UpstreamScheduler
+
+
+class ModelConnection:
+    """Live connection stand-in."""
+
+    def on(self, event, handler):
+        """Accept handlers."""
+
+    async def send(self, data):
+        """Accept keepalives."""
+
+    async def finish(self):
+        """Close instantly."""
+
+
+def model_opener(open_ms: float, jitter_ms: float):
+    """Return a connection opener following the latency model."""
+    async def open_connection():
+        await asyncio.sleep(max(0.0, random.gauss(open_ms, jitter_ms)) / 1000)
+        return ModelConnection()
+    return open_connection
+
+
+async def simulate(args, pooled: bool) -> LatencyTracker:
+    """Run one arrival sequence and return session-start latencies."""
+    random.seed(args.seed)
+    scheduler = UpstreamScheduler('bench', ProviderBudget(args.max_streams, max_queue=1000, max_wait_s=30))
+    opener = model_opener(args.open_ms, args.jitter_ms)
+
+    pool = None
+    if pooled:
+        pool = LiveConnectionPool(opener, scheduler, min_size=args.pool_min, max_size=args.pool_max)
+        pool.start()
+        await asyncio.sleep(args.open_ms / 1000 * 2)
+
+    starts = LatencyTracker(window=100000)
+
+    async def session():
+        started = time.perf_counter()
+        connection = pool.take() if pool else None
+        if connection is None:
+            await scheduler.acquire()
+            await opener()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        starts.record(elapsed_ms)
+        if pool:
+            pool.record_start(connection is not None, elapsed_ms)
+        await asyncio.sleep(random.expovariate(1 / args.hold_s))
+        scheduler.release()
+
+    sessions = []
+    deadline = time.monotonic() + args.duration
+    while time.monotonic() < deadline:
+        sessions.append(asyncio.create_task(session()))
+        await asyncio.sleep(random.expovariate(args.rate))
+    await asyncio.gather(*sessions)
+
+    if pool:
+        print(f'pool stats: {pool.stats()}')
+        await pool.stop()
+    return starts
+
+
+async def run(args):
+    """Compare cold and pooled session starts."""
+    print(f'{"":<10} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8}')
+    for label, pooled in (('cold', False), ('pooled', True)):
+        starts = await simulate(args, pooled)
+        print(
+            f'{label:<10} {starts.percentile(50):>8.1f} '
+            f'{starts.percentile(95):>8.1f} {starts.percentile(99):>8.1f}'
+        )
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rate', type=float, default=2.0, help='sessions per second')
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--hold-s', type=float, default=5.0, help='mean session length')
+    parser.add_argument('--open-ms', type=float, default=300.0)
+    parser.add_argument('--jitter-ms', type=float, default=80.0)
+    parser.add_argument('--max-streams', type=int, default=50)
+    parser.add_argument('--pool-min', type=int, default=2)
+    parser.add_argument('--pool-max', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=7)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark of template splicing against full synthesis of closing replies.
+
+Uses a latency model of the TTS provider (fixed overhead + per-character
+generation time) and counts the characters actually sent for synthesis.
+Run from ``backend/``::
+
+    python -m benchmarks.template_splicing --replies 50
+"""
+import argparse
+import asyncio
+import math
+import random
+import time
+from array import array
+from typing import Dict
+from src.agent.gisa_prompt import GISA_CLOSING_TEMPLATES
+from src.services.tts_templates import TemplateEngine
+
+SAMPLE_RATE = 16000
+
+
+class ModelTTS:
+    """TTS stand-in with a latency model and a per-process phrase cache."""
+
+    def __init__(self, base_ms: float, per_char_ms: float):
+        """Initialize model."""
+        self.base_ms = base_ms
+        self.per_char_ms = per_char_ms
+        self.cache: Dict[str, bytes] = {}
+        self.characters = 0
+
+    async def text_to_speech(self, text: str) -> bytes:
+        """Synthesize a tone roughly as long as the spoken text."""
+        self.characters += len(text)
+        await asyncio.sleep((self.base_ms + self.per_char_ms * len(text)) / 1000)
+        samples = len(text) * SAMPLE_RATE // 15
+        return array('h', (int(6000 * math.sin(i / 6)) for i in range(samples))).tobytes()
+
+    async def cached_phrase(self, text: str) -> bytes:
+        """Return audio for a fixed phrase, synthesizing it once."""
+        if text not in self.cache:
+            self.cache[text] = await self.text_to_speech(text)
+        return self.cache[text]
+
+
+def closing_replies(count: int):
+    """Registration closings with random protocols, plus the two amount closings."""
+    prefixes = ['DEMO', 'DEMO-VIP', 'DEMO-OCD4', 'DEMO-EAC']
+    replies = [
+        GISA_CLOSING_TEMPLATES['registration'].format(
+            protocol=f'{random.choice(prefixes)}-{random.randint(1000, 99999)}'
+        )
+        for _ in range(count)
+    ]
+    replies.append(GISA_CLOSING_TEMPLATES['debt'].format(amount='R$ 478,00'))
+    replies.append(GISA_CLOSING_TEMPLATES['inspection_fee'].format(amount='R$ 40,00'))
+    return replies
+
+
+async def run(args):
+    """Compare characters and latency per reply."""
+    replies = closing_replies(args.replies)
+
+    full = ModelTTS(args.base_ms, args.per_char_ms)
+    started = time.perf_counter()
+    for reply in replies:
+        await full.text_to_speech(reply)
+    full_ms = (time.perf_counter() - started) * 1000 / len(replies)
+
+    spliced = ModelTTS(args.base_ms, args.per_char_ms)
+    engine = TemplateEngine(spliced)
+    for phrase in engine.phrases():
+        await spliced.cached_phrase(phrase)
+    warm_chars = spliced.characters
+    spliced.characters = 0
+
+    started = time.perf_counter()
+    for reply in replies:
+        assert await engine.render(reply) is not None
+    spliced_ms = (time.perf_counter() - started) * 1000 / len(replies)
+
+    print(f'{len(replies)} closing replies (warm-up: {warm_chars} chars once per process)')
+    print(f'{"":<16} {"chars/reply":>12} {"ms/reply":>10}')
+    print(f'{"full synthesis":<16} {full.characters / len(replies):>12.1f} {full_ms:>10.1f}')
+    print(f'{"template splice":<16} {spliced.characters / len(replies):>12.1f} {spliced_ms:>10.1f}')
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--replies', type=int, default=50)
+    parser.add_argument('--base-ms', type=float, default=350.0)
+    parser.add_argument('--per-char-ms', type=float, default=6.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""Jitter-buffered, real-time-paced audio output.
+
+TTS audio arrives in bursts (a whole reply, or parallel chunks finishing
+out of step). The scheduler buffers it, waits for a short pre-roll, then
+sends fixed-duration PCM frames to the transport on a real-time clock.
+When the next chunk is late it plays comfort silence instead of stalling,
+and a barge-in flushes everything still queued.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from ..observability.logs import get_logger
+
+log = get_logger(__name__)
+
+# 16-bit mono PCM
+BYTES_PER_SAMPLE = 2
+
+
+class AudioOutputScheduler:
+    """Per-session jitter buffer emitting paced PCM frames."""
+
+    def __init__(
+        self,
+        sink: Callable[[bytes], Awaitable[None]],
+        sample_rate: int,
+        frame_ms: int = 20,
+        preroll_ms: int = 60,
+        max_buffer_ms: int = 30000,
+    ):
+        """Initialize scheduler."""
+        self.sink = sink
+        self.frame_s = frame_ms / 1000
+        self.bytes_per_ms = sample_rate * BYTES_PER_SAMPLE // 1000
+        self.frame_bytes = self.bytes_per_ms * frame_ms
+        self.preroll_bytes = self.bytes_per_ms * preroll_ms
+        self.max_buffer_bytes = self.bytes_per_ms * max_buffer_ms
+        self.silence = bytes(self.frame_bytes)
+
+        self.buffer = bytearray()
+        self.wakeup = asyncio.Event()
+        # More audio of the current turn is still expected
+        self.turn_open = False
+        self.playing = False
+        self.task: Optional[asyncio.Task] = None
+
+        self.frames = 0
+        self.silence_frames = 0
+        self.underruns = 0
+        self.overruns = 0
+        self.dropped_ms = 0.0
+        self.late_frames = 0
+        self.flushes = 0
+
+    def start(self):
+        """Start the pacing task (needs a running loop)."""
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Drop queued audio and stop pacing."""
+        self.flush()
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def push(self, audio_bytes: bytes):
+        """Queue audio of the current turn (never blocks)."""
+        if not audio_bytes:
+            return
+        self.buffer.extend(audio_bytes)
+        self.turn_open = True
+
+        excess = len(self.buffer) - self.max_buffer_bytes
+        if excess > 0:
+            # Keep whole samples when dropping the oldest audio
+            excess += excess % BYTES_PER_SAMPLE
+            del self.buffer[:excess]
+            self.overruns += 1
+            self.dropped_ms += excess / self.bytes_per_ms
+        self.wakeup.set()
+
+    def end_turn(self):
+        """Mark the current turn's audio complete: play out the tail, then go idle."""
+        self.turn_open = False
+        self.wakeup.set()
+
+    def flush(self):
+        """Drop everything queued at once (barge-in, cancelled turn)."""
+        if self.buffer or self.playing:
+            self.flushes += 1
+        self.buffer.clear()
+        self.turn_open = False
+        self.playing = False
+        self.wakeup.set()
+
+    @property
+    def buffered_ms(self) -> float:
+        """Audio waiting to be played."""
+        return len(self.buffer) / self.bytes_per_ms
+
+    def _can_start(self) -> bool:
+        """Pre-roll reached, or the turn is complete and shorter than the pre-roll."""
+        return len(self.buffer) >= self.preroll_bytes or (bool(self.buffer) and not self.turn_open)
+
+    async def _run(self):
+        """Wait for pre-roll, then emit one frame per frame period until the turn ends."""
+        while True:
+            while not self._can_start():
+                self.wakeup.clear()
+                await self.wakeup.wait()
+
+            self.playing = True
+            in_gap = False
+            deadline = time.monotonic()
+
+            while self.playing:
+                if len(self.buffer) >= self.frame_bytes:
+                    frame = bytes(self.buffer[:self.frame_bytes])
+                    del self.buffer[:self.frame_bytes]
+                    in_gap = False
+                elif not self.turn_open:
+                    if not self.buffer:
+                        break
+                    # Pad the tail of the turn to a whole frame
+                    frame = bytes(self.buffer) + self.silence[len(self.buffer):]
+                    self.buffer.clear()
+                else:
+                    # Next chunk is late: comfort silence keeps the clock running
+                    frame = self.silence
+                    self.silence_frames += 1
+                    if not in_gap:
+                        self.underruns += 1
+                        in_gap = True
+
+                await self._send(frame)
+
+                deadline += self.frame_s
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                elif delay < -self.frame_s:
+                    # The transport fell behind; resync instead of bursting to catch up
+                    self.late_frames += 1
+                    deadline = time.monotonic()
+
+            self.playing = False
+
+    async def _send(self, frame: bytes):
+        """Hand one frame to the transport."""
+        self.frames += 1
+        try:
+            await self.sink(frame)
+        except Exception as e:
+            log.error('audio sink error', stage='audio_out', error=str(e))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return output counters."""
+        return {
+            'frames': self.frames,
+            'silence_frames': self.silence_frames,
+            'underruns': self.underruns,
+            'overruns': self.overruns,
+            'dropped_ms': round(self.dropped_ms, 1),
+            'late_frames': self.late_frames,
+            'flushes': self.flushes,
+            'buffered_ms': round(self.buffered_ms, 1),
+        }
@@ -0,0 +1,72 @@
+"""Local turn classifier for the 14 GISA scenarios (A1–D3).
+
+Matches the caller signals listed in ``gisa_prompt.py``. It is a cheap
+first guess used for routing and prioritization; the LLM still decides the
+final handling of the turn.
+"""
+import re
+from typing import Dict, Optional, Tuple
+from .dialogue import fold
+
+# Scenario -> signal patterns over folded text (lowercase, no accents)
+SCENARIO_SIGNALS: Dict[str, Tuple[str, ...]] = {
+    'C4': (r'\bhospita', r'\buti\b', r'\bemergencia', r'\bpronto socorro', r'\bclinica'),
+    'D3': (r'\bvila restauracao', r'\bmarechal thau'),
+    'D1': (r'\bequipe (ja )?veio', r'\bnao resolveu', r'\bcaiu de novo', r'\bvoltou a cair', r'\beto\b'),
+    'D2': (r'\bepb\b', r'\bdefeito interno', r'\btaxa\b', r'\bcobrar'),
+    'B3': (r'\bpassou do prazo', r'\bvenc(eu|eram)', r'\bfora do prazo', r'\bprazo (ja )?passou'),
+    'B2': (r'\bja (tenho|abri|fiz)( um)? (protocolo|chamado|ocorrencia)', r'\bquanto tempo falta', r'\bmeu protocolo'),
+    'B1': (r'\bprogramad', r'\bmanutencao'),
+    'A4': (r'\bcortaram', r'\bcontas? atrasad', r'\bdebito', r'\bsuspens'),
+    'A1': (r'\bposte', r'\biluminacao publica', r'\bvia publica'),
+    'A2': (r'\bdisjuntor', r'\bdesarma'),
+    'A3': (r'\bquando (eu )?lig(o|a) (o|a)\b', r'\bapaga tudo'),
+    'C3': (r'\bnao (lembro|sei|tenho)( o numero)? (da|a) (uc|unidade|conta)', r'\bperdi a conta'),
+    'C2': (r'\brua (inteira|toda)', r'\bbairro', r'\bvizinhos? tambem', r'\btodo mundo'),
+    'C1': (r'\bso (a )?minha casa', r'\bapenas (a )?minha casa', r'\bsomente (a )?minha casa'),
+}
+
+COMPILED_SIGNALS = {
+    scenario: tuple(re.compile(p) for p in patterns)
+    for scenario, patterns in SCENARIO_SIGNALS.items()
+}
+
+# Dict order is the tie-break: critical and specific scenarios first
+PRECEDENCE = list(SCENARIO_SIGNALS)
+
+SCENARIO_GROUPS = {scenario: scenario[0] for scenario in SCENARIO_SIGNALS}
+
+# Scheduling class of each scenario; anything else is 'normal'
+SCENARIO_PRIORITY = {
+    'C4': 'critical',
+    'B3': 'high',
+}
+
+PRIORITY_RANK = {'critical': 0, 'high': 1, 'normal': 2}
+
+
+def classify(transcript: str) -> Optional[str]:
+    """Return the most likely scenario for a caller utterance, if any."""
+    text = fold(transcript)
+
+    best = None
+    best_hits = 0
+    for scenario in PRECEDENCE:
+        hits = sum(1 for pattern in COMPILED_SIGNALS[scenario] if pattern.search(text))
+        if hits > best_hits:
+            best, best_hits = scenario, hits
+
+    return best
+
+
+def priority_for(scenario: Optional[str], metadata: Optional[dict] = None) -> str:
+    """Return the scheduling class for a scenario and response metadata."""
+    protocol = (metadata or {}).get('protocol', '')
+    if protocol.startswith('DEMO-VIP'):
+        return 'critical'
+    return SCENARIO_PRIORITY.get(scenario, 'normal')
+
+
+def promote(current: str, candidate: str) -> str:
+    """Return the higher of two priority classes (promotion is sticky)."""
+    return candidate if PRIORITY_RANK[candidate] < PRIORITY_RANK[current] else current
@@ -0,0 +1,301 @@
+"""Local dialogue state machine for the scripted FASE_1/FASE_2 turns."""
+import re
+import unicodedata
+from typing import List, NamedTuple, Optional
+from ..models import SessionState
+from .gisa_prompt import (
+    GISA_INITIAL_MESSAGE,
+    GISA_HOLD_MESSAGE,
+    GISA_NAME_GREETING,
+    GISA_NAME_RETRY,
+    GISA_UC_REQUEST,
+    GISA_UC_RETRY,
+    GISA_UC_VALIDATED,
+    GISA_DEFAULT_UC,
+)
+
+# Fixed phrases whose audio is cached once per process
+SCRIPTED_PHRASES = (
+    GISA_HOLD_MESSAGE,
+    GISA_UC_REQUEST,
+    GISA_UC_VALIDATED,
+    GISA_UC_RETRY,
+    GISA_NAME_RETRY,
+    GISA_INITIAL_MESSAGE,
+)
+
+# Failed UC attempts before falling back to the default UC
+MAX_UC_ATTEMPTS = 2
+
+# Name re-asks before moving on without one
+MAX_NAME_ATTEMPTS = 2
+
+MIN_UC_DIGITS = 3
+
+UNITS = {
+    'zero': 0, 'um': 1, 'uma': 1, 'dois': 2, 'duas': 2, 'tres': 3,
+    'quatro': 4, 'cinco': 5, 'seis': 6, 'meia': 6, 'sete': 7, 'oito': 8,
+    'nove': 9,
+}
+
+TEENS = {
+    'dez': 10, 'onze': 11, 'doze': 12, 'treze': 13, 'quatorze': 14,
+    'catorze': 14, 'quinze': 15, 'dezesseis': 16, 'dezessete': 17,
+    'dezoito': 18, 'dezenove': 19,
+}
+
+TENS = {
+    'vinte': 20, 'trinta': 30, 'quarenta': 40, 'cinquenta': 50,
+    'sessenta': 60, 'setenta': 70, 'oitenta': 80, 'noventa': 90,
+}
+
+HUNDREDS = {
+    'cem': 100, 'cento': 100, 'duzentos': 200, 'duzentas': 200,
+    'trezentos': 300, 'trezentas': 300, 'quatrocentos': 400,
+    'quatrocentas': 400, 'quinhentos': 500, 'quinhentas': 500,
+    'seiscentos': 600, 'seiscentas': 600, 'setecentos': 700,
+    'setecentas': 700, 'oitocentos': 800, 'oitocentas': 800,
+    'novecentos': 900, 'novecentas': 900,
+}
+
+NUMBER_WORDS = {**UNITS, **TEENS, **TENS, **HUNDREDS}
+
+UNKNOWN_UC_PATTERNS = (
+    'nao sei', 'nao lembro', 'nao tenho', 'nao sei informar',
+    'perdi a conta', 'esqueci',
+)
+
+NAME_PATTERNS = (
+    re.compile(r'\b(?:meu nome e|me chamo|aqui e|aqui quem fala e|quem fala e)\s+(?:o |a )?(.+)'),
+    re.compile(r'\b(?:sou|fala)\s+(?:o |a )(.+)'),
+    re.compile(r'^e\s+(?:o |a )(.+)'),
+    re.compile(r'\bsou\s+(.+)'),
+)
+
+# Words that end a name or never belong to one
+NAME_STOPWORDS = {
+    'e', 'tudo', 'bem', 'aqui', 'oi', 'ola', 'alo', 'bom', 'boa', 'dia',
+    'tarde', 'noite', 'sim', 'nao', 'eu', 'estou', 'to', 'minha', 'meu',
+    'quero', 'preciso', 'falando', 'obrigado', 'obrigada', 'gisa', 'ta',
+    'cliente', 'sem', 'luz', 'energia', 'uc', 'rua', 'casa', 'bairro',
+    'caiu', 'cair', 'acabou', 'faltou', 'falta', 'pode', 'ser', 'tem', 'ter',
+    'esta', 'estava', 'foi', 'vai', 'queria', 'gostaria', 'ligando', 'liguei',
+    'problema', 'conta', 'poste', 'fio', 'hospital', 'empresa', 'loja',
+    'escola', 'vizinho', 'vizinha', 'ok', 'certo', 'isso', 'alguem',
+}
+
+# Particles allowed inside a name ("Maria da Silva") but never at its end
+NAME_PARTICLES = {'da', 'de', 'do', 'das', 'dos'}
+
+GREETING_WORDS = {'oi', 'ola', 'alo', 'bom', 'boa', 'dia', 'tarde', 'noite', 'tudo', 'bem'}
+
+MAX_NAME_WORDS = 3
+
+# A bare answer without "meu nome é" counts as a name only this short
+MAX_BARE_NAME_WORDS = 2
+
+
+class ScriptedReply(NamedTuple):
+    """Reply produced locally, without an LLM round trip."""
+    text: str
+    # Ordered audio segments: (text, is_cacheable)
+    segments: List[tuple]
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents and punctuation."""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r'[^\w\s]', ' ', text)
+
+
+def extract_digits(transcript: str) -> str:
+    """Extract digits from a transcript, including spoken Portuguese numbers."""
+    groups: List[str] = []
+    current: Optional[int] = None
+    after_e = False
+    after_mil = False
+
+    def flush():
+        nonlocal current, after_mil
+        if current is not None:
+            groups.append(str(current))
+        current = None
+        after_mil = False
+
+    for token in fold(transcript).split():
+        if token.isdigit():
+            flush()
+            groups.append(token)
+            after_e = False
+            continue
+
+        if token == 'e' and current is not None:
+            after_e = True
+            continue
+
+        if token == 'mil':
+            current = (current or 1) * 1000
+            after_mil = True
+            after_e = False
+            continue
+
+        value = NUMBER_WORDS.get(token)
+        if value is None:
+            flush()
+            after_e = False
+            continue
+
+        # "trinta e quatro" and "mil duzentos" join; anything else starts a new group
+        if current is not None and (after_e or (after_mil and value < 1000)):
+            current += value
+        else:
+            flush()
+            current = value
+        after_e = False
+
+    flush()
+    return ''.join(groups)
+
+
+def _bare_name(words: List[str]) -> bool:
+    """Whether a bare answer ("Maria", "João Silva") looks like a name."""
+    parts = [w for w in words if fold(w).strip() not in NAME_PARTICLES]
+    if not parts or len(parts) > MAX_BARE_NAME_WORDS:
+        return False
+    if fold(words[0]).strip() in NAME_PARTICLES or fold(words[-1]).strip() in NAME_PARTICLES:
+        return False
+    return all(
+        w[0].isupper() and fold(w).strip() not in NAME_STOPWORDS
+        and fold(w).strip() not in NUMBER_WORDS and not w.isdigit()
+        for w in parts
+    )
+
+
+def extract_name(transcript: str) -> Optional[str]:
+    """Extract the caller's name from a transcript."""
+    folded = fold(transcript).strip()
+    original = re.sub(r'[^\w\s]', ' ', transcript).split()
+
+    candidate = None
+    for pattern in NAME_PATTERNS:
+        match = pattern.search(folded)
+        if match:
+            candidate = match.group(1).split()
+            break
+
+    if candidate is None:
+        # Only short capitalized answers ("Maria", "Oi, João Silva") are a
+        # bare name; "Caiu a luz" or "Pode ser" are not, and the name is re-asked
+        words = [w for w in original if fold(w).strip() not in GREETING_WORDS]
+        if not _bare_name(words):
+            return None
+        candidate = [fold(w).strip() for w in words]
+
+    while candidate and candidate[0] in NAME_PARTICLES:
+        candidate = candidate[1:]
+
+    name_words = []
+    for word in candidate:
+        if word in NAME_STOPWORDS or word.isdigit() or word in NUMBER_WORDS:
+            break
+        name_words.append(word)
+        if len(name_words) - sum(w in NAME_PARTICLES for w in name_words) == MAX_NAME_WORDS:
+            break
+
+    while name_words and name_words[-1] in NAME_PARTICLES:
+        name_words.pop()
+
+    if not name_words:
+        return None
+
+    # Recover the original spelling (accents) from the transcript
+    folded_original = [fold(w).strip() for w in original]
+    restored = []
+    for word in name_words:
+        if word in folded_original:
+            restored.append(original[folded_original.index(word)])
+        else:
+            restored.append(word)
+
+    return ' '.join(
+        w if w.lower() in NAME_PARTICLES else w.capitalize() for w in restored
+    )
+
+
+class DialogueStateMachine:
+    """Per-session state machine for the scripted greeting and UC validation.
+
+    FASE_1 and FASE_2 are answered from templates; from FASE_3 on,
+    ``handle`` returns None and the turn goes to the LLM.
+    """
+
+    def __init__(self, session_state: SessionState):
+        """Initialize state machine."""
+        self.state = session_state
+        self.uc_attempts = 0
+        self.name_attempts = 0
+
+    @property
+    def scripted(self) -> bool:
+        """Whether the current phase is answered locally."""
+        return self.state.current_phase in ('FASE_1', 'FASE_2')
+
+    def handle(self, transcript: str) -> Optional[ScriptedReply]:
+        """Advance the dialogue with a final transcript."""
+        if self.state.current_phase == 'FASE_1':
+            return self._handle_greeting(transcript)
+        if self.state.current_phase == 'FASE_2':
+            return self._handle_uc(transcript)
+        return None
+
+    def _handle_greeting(self, transcript: str) -> ScriptedReply:
+        """Capture the caller's name and ask for the UC."""
+        name = extract_name(transcript)
+        if name:
+            self.state.caller_name = name
+
+        # Caller may volunteer the UC together with the name
+        digits = extract_digits(transcript)
+        if len(digits) >= MIN_UC_DIGITS:
+            return self._validate(digits, greet=True)
+
+        if not name:
+            self.name_attempts += 1
+            if self.name_attempts < MAX_NAME_ATTEMPTS:
+                return self._reply([GISA_NAME_RETRY])
+
+        self.state.current_phase = 'FASE_2'
+        return self._reply([GISA_UC_REQUEST], greet=True)
+
+    def _handle_uc(self, transcript: str) -> ScriptedReply:
+        """Capture and validate the UC number."""
+        digits = extract_digits(transcript)
+        if len(digits) >= MIN_UC_DIGITS:
+            return self._validate(digits)
+
+        folded = fold(transcript)
+        self.uc_attempts += 1
+        if any(p in folded for p in UNKNOWN_UC_PATTERNS) or self.uc_attempts >= MAX_UC_ATTEMPTS:
+            return self._validate(GISA_DEFAULT_UC)
+
+        return self._reply([GISA_UC_RETRY])
+
+    def _validate(self, uc_number: str, greet: bool = False) -> ScriptedReply:
+        """Mark the UC as validated and move to FASE_3."""
+        self.state.uc_number = uc_number
+        self.state.uc_validated = True
+        self.state.current_phase = 'FASE_3'
+        return self._reply([GISA_UC_VALIDATED], greet=greet)
+
+    def _reply(self, phrases: List[str], greet: bool = False) -> ScriptedReply:
+        """Build a reply from fixed phrases, optionally greeting by name."""
+        segments = [(phrase, True) for phrase in phrases]
+        if greet and self.state.caller_name:
+            greeting = GISA_NAME_GREETING.format(name=self.state.caller_name)
+            segments.insert(0, (greeting, False))
+
+        return ScriptedReply(
+            text=' '.join(text for text, _ in segments),
+            segments=segments,
+        )
@@ -0,0 +1,229 @@
+"""Adaptive, phase-aware endpointing.
+
+Deciding when the caller has finished speaking used to be fixed: every
+Deepgram final started a turn. That cut callers off between digit groups
+while they dictated a UC or CPF, and a fixed 1 s UtteranceEnd would add a
+second to every "sim". The endpointer collects final segments into one
+utterance and commits it based on what the caller is expected to answer
+(from the phase and GISA's last question): short confirmations go at
+once, names on Deepgram's speech_final, free speech after a short extra
+silence (callers pause mid-sentence), and digit sequences only once
+complete, on UtteranceEnd or after a longer silence.
+"""
+import asyncio
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from ..models import SessionState
+from ..observability.logs import get_logger
+from .dialogue import MIN_UC_DIGITS, UNKNOWN_UC_PATTERNS, extract_digits, fold
+
+log = get_logger(__name__)
+
+# Expected answer kinds
+CONFIRMATION = 'confirmation'
+NAME = 'name'
+DIGITS = 'digits'
+FREE = 'free'
+
+CPF_DIGITS = 11
+
+# Words that make up a complete short answer ("sim", "nao, obrigado")
+CONFIRMATION_WORDS = {
+    'sim', 'nao', 'isso', 'ai', 'ok', 'okay', 'pode', 'claro', 'certo', 'exato',
+    'correto', 'obrigado', 'obrigada', 'so', 'mesmo', 'beleza', 'ta', 'tudo',
+    'bem', 'valeu', 'positivo', 'negativo',
+}
+MAX_CONFIRMATION_WORDS = 3
+
+# GISA's last question, over folded text
+QUESTION = re.compile(r'[^.!?\n]*\?')
+# Only an explicit request for a number ("poderia me informar o seu CPF?"), not a
+# line that merely mentions one ("validei sua Unidade Consumidora, como posso ajudar?")
+DIGITS_QUESTION = re.compile(
+    r'\b(informar|informe|passar|passe|repetir|repita|digitar|digite|dizer|diga|qual)\b'
+    r'.*\b(numero|cpf)\b'
+)
+CONFIRMATION_QUESTION = re.compile(
+    r'\b(algo mais|confirma|correto|certo|pode ser|esta bem|tudo bem|ok)\s*$'
+)
+
+
+def expected_answer(state: SessionState) -> str:
+    """What kind of answer the caller is about to give."""
+    if state.current_phase == 'FASE_1':
+        return NAME
+    if state.current_phase == 'FASE_2':
+        return DIGITS
+
+    last = next(
+        (m.content for m in reversed(state.conversation_history) if m.role == 'assistant'), ''
+    )
+    questions = QUESTION.findall(last)
+    if not questions:
+        return FREE
+    question = fold(questions[-1]).strip()
+    if DIGITS_QUESTION.search(question):
+        return DIGITS
+    if CONFIRMATION_QUESTION.search(question):
+        return CONFIRMATION
+    return FREE
+
+
+def is_confirmation(text: str) -> bool:
+    """Whether an utterance is a complete short answer."""
+    words = fold(text).split()
+    return 0 < len(words) <= MAX_CONFIRMATION_WORDS and all(
+        w in CONFIRMATION_WORDS for w in words
+    )
+
+
+class Endpointer:
+    """Commits caller utterances using finals, UtteranceEnd and local silence."""
+
+    def __init__(
+        self,
+        commit: Callable[[str], Awaitable[None]],
+        expected: Callable[[], str],
+        windows_ms: Dict[str, float],
+    ):
+        """Initialize endpointer.
+
+        ``windows_ms`` maps each answer kind to the silence after the last
+        final that commits the utterance.
+        """
+        self.commit = commit
+        self.expected = expected
+        self.windows_ms = windows_ms
+
+        self.pending: List[str] = []
+        self.last_speech = 0.0
+        self.timer: Optional[asyncio.Task] = None
+
+        self.commits: Dict[str, int] = {}
+        self.latency_ms: Dict[str, List[float]] = {}
+
+    def on_activity(self):
+        """Caller is speaking (interim or SpeechStarted): hold any pending commit."""
+        self.last_speech = time.monotonic()
+        if self.pending:
+            self._arm(self._kind())
+
+    async def on_final(self, transcript: str, speech_final: bool = False):
+        """Add a final segment and commit if the utterance is complete."""
+        self.last_speech = time.monotonic()
+        self.pending.append(transcript)
+        kind = self._kind()
+        text = ' '.join(self.pending)
+
+        if is_confirmation(text):
+            await self._commit(kind, 'confirmation')
+        elif kind == DIGITS and len(extract_digits(text)) >= CPF_DIGITS:
+            await self._commit(kind, 'digits_complete')
+        elif speech_final and kind in (CONFIRMATION, NAME):
+            await self._commit(kind, 'speech_final')
+        else:
+            self._arm(kind)
+
+    async def on_utterance_end(self):
+        """Deepgram saw a long gap after the last word."""
+        if not self.pending:
+            return
+        kind = self._kind()
+        if kind == DIGITS and not self._has_uc_answer():
+            # Still dictating: wait for the rest of the number
+            self._arm(kind)
+            return
+        await self._commit(kind, 'utterance_end')
+
+    def close(self):
+        """Drop any pending utterance."""
+        self._disarm()
+        self.pending.clear()
+
+    def _kind(self) -> str:
+        """Expected answer kind, with a fast path for digits answers without digits."""
+        kind = self.expected()
+        if kind == DIGITS:
+            folded = fold(' '.join(self.pending))
+            if any(p in folded for p in UNKNOWN_UC_PATTERNS):
+                return FREE
+        return kind
+
+    def _has_uc_answer(self) -> bool:
+        """Enough digits for a UC number."""
+        return len(extract_digits(' '.join(self.pending))) >= MIN_UC_DIGITS
+
+    def _arm(self, kind: str):
+        """(Re)start the silence timer for this answer kind."""
+        self._disarm()
+        self.timer = asyncio.create_task(self._wait(kind, self.windows_ms[kind] / 1000))
+
+    def _disarm(self):
+        """Cancel the silence timer."""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    async def _wait(self, kind: str, delay_s: float):
+        """Commit once the caller has been silent for the window."""
+        await asyncio.sleep(delay_s)
+        # Detach first so the commit below is never cancelled by a re-arm
+        self.timer = None
+        await self._commit(kind, 'silence')
+
+    async def _commit(self, kind: str, reason: str):
+        """Start the turn with everything said so far."""
+        self._disarm()
+        if not self.pending:
+            return
+        text = ' '.join(self.pending)
+        self.pending.clear()
+
+        latency_ms = (time.monotonic() - self.last_speech) * 1000
+        self.commits[reason] = self.commits.get(reason, 0) + 1
+        self.latency_ms.setdefault(kind, []).append(latency_ms)
+        _record(kind, latency_ms)
+        log.debug(
+            'utterance committed', stage='endpointing', kind=kind, reason=reason,
+            latency_ms=round(latency_ms, 1),
+        )
+        await self.commit(text)
+
+    def stats(self) -> Dict[str, Any]:
+        """Average latency from the last transcript to the turn start, per answer kind."""
+        samples = [v for values in self.latency_ms.values() for v in values]
+        return {
+            'turns': len(samples),
+            'avg_latency_ms': round(sum(samples) / len(samples), 1) if samples else None,
+            'by_kind': {
+                kind: round(sum(values) / len(values), 1)
+                for kind, values in self.latency_ms.items()
+            },
+            'commits': dict(self.commits),
+        }
+
+
+# Process-wide latency totals per answer kind: [turns, total ms]
+_totals: Dict[str, List[float]] = {}
+
+
+def _record(kind: str, latency_ms: float):
+    """Add one commit to the process-wide totals."""
+    totals = _totals.setdefault(kind, [0, 0.0])
+    totals[0] += 1
+    totals[1] += latency_ms
+
+
+def endpointing_stats() -> Dict[str, Any]:
+    """Average end-of-speech to turn-start latency across sessions."""
+    turns = sum(t[0] for t in _totals.values())
+    total_ms = sum(t[1] for t in _totals.values())
+    return {
+        'turns': turns,
+        'avg_latency_ms': round(total_ms / turns, 1) if turns else None,
+        'by_kind': {
+            kind: {'turns': t[0], 'avg_latency_ms': round(t[1] / t[0], 1)}
+            for kind, t in _totals.items()
+        },
+    }
@@ -0,0 +1,138 @@
+"""Per-session event bus feeding the server-sent events stream.
+
+The agent publishes without ever awaiting: each subscriber has its own
+bounded buffer, and when a slow subscriber falls behind its oldest events
+are dropped (and counted) instead of back-pressuring the turn.
+
+Events: interim and final transcripts, llm_partial text as the reply
+streams, the full reply, phase changes, protocol numbers and a closing end.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Set
+
+
+class Subscription:
+    """One subscriber's bounded buffer."""
+
+    def __init__(self, max_events: int):
+        """Initialize subscription."""
+        self.buffer: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self.ready = asyncio.Event()
+        self.dropped = 0
+        self.closed = False
+
+    def push(self, event: Dict[str, Any]):
+        """Buffer an event, dropping the oldest one when full."""
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append(event)
+        self.ready.set()
+
+    def close(self):
+        """Stop the subscription once the buffer is drained."""
+        self.closed = True
+        self.ready.set()
+
+    def pop(self) -> Optional[Dict[str, Any]]:
+        """Return the oldest buffered event, if any."""
+        return self.buffer.popleft() if self.buffer else None
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for new events or closing; False on timeout."""
+        if self.buffer or self.closed:
+            return True
+        self.ready.clear()
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+class SessionEvents:
+    """Fan-out of one session's events to its subscribers."""
+
+    def __init__(self, session_id: str, max_events: int = 256):
+        """Initialize bus."""
+        self.session_id = session_id
+        self.max_events = max_events
+        self.subscribers: Set[Subscription] = set()
+        self.seq = 0
+        self.published = 0
+        # Drops of subscribers that already left
+        self.dropped = 0
+        self.closed = False
+
+    @property
+    def active(self) -> bool:
+        """Whether anyone is listening (lets the agent skip optional work)."""
+        return bool(self.subscribers)
+
+    def publish(self, event_type: str, **data: Any):
+        """Push an event to every subscriber (never blocks)."""
+        if not self.subscribers:
+            return
+        self.seq += 1
+        self.published += 1
+        event = {'id': self.seq, 'type': event_type, 'ts': time.time(), **data}
+        for subscription in self.subscribers:
+            subscription.push(event)
+
+    def subscribe(self) -> Subscription:
+        """Register a subscriber."""
+        subscription = Subscription(self.max_events)
+        if self.closed:
+            subscription.close()
+        else:
+            self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a subscriber."""
+        if subscription in self.subscribers:
+            self.subscribers.discard(subscription)
+            self.dropped += subscription.dropped
+
+    def close(self):
+        """Send the final event and end every subscription."""
+        self.publish('end')
+        self.closed = True
+        for subscription in list(self.subscribers):
+            subscription.close()
+            self.unsubscribe(subscription)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return bus statistics."""
+        return {
+            'subscribers': len(self.subscribers),
+            'published': self.published,
+            'dropped': self.dropped + sum(s.dropped for s in self.subscribers),
+        }
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Encode an event in the text/event-stream wire format."""
+    return (
+        f"id: {event['id']}\n"
+        f"event: {event['type']}\n"
+        f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+    )
+
+
+async def stream_sse(
+    subscription: Subscription, keepalive_s: float = 15.0
+) -> AsyncIterator[str]:
+    """Encode a subscription as SSE, with comment keepalives while idle."""
+    while True:
+        event = subscription.pop()
+        if event is not None:
+            yield format_sse(event)
+            continue
+        if subscription.closed:
+            return
+        if not await subscription.wait(keepalive_s):
+            # Keeps proxies from closing an idle stream
+            yield ': keepalive\n\n'
@@ -0,0 +1,86 @@
+"""Phase- and scenario-scoped assembly of the GISA system prompt.
+
+The full prompt (about 1.7k tokens) used to go with every Gemini turn.
+Each turn now gets only what it needs: identity, style and critical rules
+always; the rules of the current phase; and in FASE_3, the matrix block of
+the candidate scenario group (from the local classifier) with a one-line
+index of the other scenarios, that group's closing formats and the
+simulation data. Without a candidate group, FASE_3 gets the full matrix.
+Every combination is assembled once at import.
+"""
+import re
+from typing import Dict, Optional, Tuple
+from .classifier import SCENARIO_GROUPS
+from .gisa_prompt import (
+    GISA_CLOSING_FORMATS,
+    GISA_CLOSINGS_HEADER,
+    GISA_CRITICAL_RULES,
+    GISA_FLOW_HEADER,
+    GISA_IDENTITY,
+    GISA_MATRIX_HEADER,
+    GISA_PHASE_RULES,
+    GISA_SCENARIO_GROUPS,
+    GISA_SIMULATION_DATA,
+    GISA_STYLE,
+    GISA_SYSTEM_PROMPT,
+    SECTION_SEPARATOR,
+    join_section,
+)
+
+# Closing formats each scenario group can end with (B3, C and D register)
+GROUP_CLOSINGS = {
+    'A': ('debt', 'no_registration'),
+    'B': ('registration', 'no_registration'),
+    'C': ('registration',),
+    'D': ('registration', 'inspection_fee'),
+}
+
+SCENARIO_HEADING = re.compile(r'^#### (\w\d): (.+)\n\*\*Sinais:\*\* (.+)$', re.MULTILINE)
+
+INDEX_HEADER = '### Outros cenários (se a fala indicar outro caso)'
+
+
+def _scenario_index(group: str) -> str:
+    """One line per scenario outside the group, so the model can still reroute."""
+    lines = [
+        f'- {code} {title}: {signals}'
+        for other, block in GISA_SCENARIO_GROUPS.items() if other != group
+        for code, title, signals in SCENARIO_HEADING.findall(block)
+    ]
+    return '\n'.join((INDEX_HEADER, *lines))
+
+
+def _assemble(phase: str, group: Optional[str]) -> str:
+    """Sections needed in a phase, for a candidate scenario group."""
+    sections = [
+        GISA_IDENTITY,
+        GISA_STYLE,
+        join_section(GISA_FLOW_HEADER, (GISA_PHASE_RULES[phase],)),
+    ]
+    if phase == 'FASE_3':
+        if group:
+            matrix = (GISA_SCENARIO_GROUPS[group], _scenario_index(group))
+            closings = GROUP_CLOSINGS[group]
+        else:
+            matrix = GISA_SCENARIO_GROUPS.values()
+            closings = GISA_CLOSING_FORMATS
+        sections.append(join_section(GISA_MATRIX_HEADER, matrix))
+        sections.append(join_section(
+            GISA_CLOSINGS_HEADER, (GISA_CLOSING_FORMATS[name] for name in closings)
+        ))
+    sections.append(GISA_CRITICAL_RULES)
+    if phase == 'FASE_3':
+        sections.append(GISA_SIMULATION_DATA)
+    return SECTION_SEPARATOR.join(sections)
+
+
+PROMPTS: Dict[Tuple[str, Optional[str]], str] = {
+    (phase, group): _assemble(phase, group)
+    for phase in GISA_PHASE_RULES
+    for group in (None, *GISA_SCENARIO_GROUPS)
+}
+
+
+def build_prompt(phase: str, scenario: Optional[str] = None) -> str:
+    """System prompt for a turn; the full prompt when the phase is unknown."""
+    return PROMPTS.get((phase, SCENARIO_GROUPS.get(scenario)), GISA_SYSTEM_PROMPT)
@@ -2,22 +2,64 @@
 import asyncio
 import time
 from typing import Optional
-from ..models import SessionState, ConversationMessage, STTResult
-from ..services.deepgram import DeepgramService
-from ..services.gemini import GeminiService
-from ..services.elevenlabs import ElevenLabsService
-from .gisa_prompt import GISA_INITIAL_MESSAGE, GISA_SYSTEM_PROMPT
+from ..config import settings
+from ..models import SessionState, SessionSnapshot, ConversationMessage, STTResult
+from ..services import providers
+from ..services.budget import ProviderBusyError
+from ..services.tts_templates import TemplateEngine, sample_rate
+from ..storage.session_archive import get_archive
+from ..context import (
+    current_session_id, current_priority, current_phase, current_scenario, current_slots,
+    current_ledger,
+)
+from ..observability.ledger import ResourceLedger, STT_BYTES_PER_S, record_session
+from ..observability.logs import get_logger
+from .gisa_prompt import GISA_INITIAL_MESSAGE, GISA_SYSTEM_PROMPT, GISA_HOLD_MESSAGE
+from .dialogue import DialogueStateMachine, ScriptedReply
+from .classifier import classify, priority_for, promote
+from .events import SessionEvents
+from .audio_output import AudioOutputScheduler
+from .endpointing import Endpointer, expected_answer
+
+log = get_logger(__name__)
 
 
 class VoiceAgent:
     """Voice agent that orchestrates STT, LLM, and TTS."""
 
-    def __init__(self, session_id: str):
-        """Initialize voice agent."""
+    def __init__(
+        self,
+        session_id: str,
+        stt_service=None,
+        llm_service=None,
+        tts_service=None,
+        snapshot: Optional[SessionSnapshot] = None,
+    ):
+        """Initialize voice agent (services can be injected, e.g. for replay).
+
+        With a snapshot, the session resumes where another worker left it.
+        """
         self.session_id = session_id
-        self.stt_service = DeepgramService()
-        self.llm_service = GeminiService()
-        self.tts_service = ElevenLabsService()
+
+        # Providers come from the registry (A/B variant per session) unless injected
+        specs = providers.select(session_id)
+        self.providers = {
+            kind: spec if injected is None else type(injected).__name__
+            for (kind, spec), injected in zip(
+                specs.items(), (stt_service, llm_service, tts_service)
+            )
+        }
+        self.stt_service = stt_service or providers.create('stt', specs['stt'])
+        self.llm_service = llm_service or providers.create('llm', specs['llm'])
+        self.tts_service = tts_service or providers.create('tts', specs['tts'])
+        self.capabilities = {
+            kind: getattr(service, 'capabilities', providers.ProviderCapabilities())
+            for kind, service in (
+                ('stt', self.stt_service), ('llm', self.llm_service), ('tts', self.tts_service)
+            )
+        }
+        self.templates = TemplateEngine(self.tts_service)
+        self.ledger = ResourceLedger()
 
         self.session_state = SessionState(
             session_id=session_id,
@@ -32,71 +74,121 @@ class VoiceAgent:
             uc_validated=False,
             start_time=time.time(),
         )
+        self.dialogue = DialogueStateMachine(self.session_state)
+
+        self.resumed = snapshot is not None
+        if snapshot:
+            self._restore(snapshot)
+
+        self.events = SessionEvents(session_id, settings.events_buffer_size)
+        self.archive = get_archive()
+        self.audio_in_buffer = bytearray()
+        if self.archive:
+            self.archive.append(session_id, {
+                'type': 'resume' if self.resumed else 'start',
+                'ts': time.time(),
+            })
 
         self.interim_transcript = ''
         self.is_processing = False
         self.on_audio_callback: Optional[callable] = None
         self.on_response_callback: Optional[callable] = None
 
+        # Turns start when the expected answer is complete, not on every final
+        self.endpointer = Endpointer(
+            self._process_user_input,
+            lambda: expected_answer(self.session_state),
+            {
+                'confirmation': settings.endpoint_confirmation_ms,
+                'name': settings.endpoint_name_ms,
+                'free': settings.endpoint_free_ms,
+                'digits': settings.endpoint_digits_ms,
+            },
+        )
+
+        # Paced PCM frames instead of whole blobs (needs a pcm_* TTS format)
+        rate = sample_rate(providers.output_format(self.tts_service))
+        self.output: Optional[AudioOutputScheduler] = None
+        if settings.audio_pacing_enabled and rate:
+            self.output = AudioOutputScheduler(
+                self._send_audio,
+                rate,
+                frame_ms=settings.audio_frame_ms,
+                preroll_ms=settings.audio_preroll_ms,
+                max_buffer_ms=settings.audio_max_buffer_ms,
+            )
+
     async def initialize(self):
         """Initialize the voice agent."""
         try:
-            print('🚀 Initializing voice agent...')
+            log.info('initializing voice agent')
+            self._set_turn_context()
+            if self.output:
+                self.output.start()
 
             # Start STT streaming
             await self.stt_service.start_streaming()
 
             # Set up STT callbacks
             self.stt_service.on_transcript = self._handle_transcript
+            self.stt_service.on_utterance_end = self.endpointer.on_utterance_end
+            self.stt_service.on_speech_started = self._handle_speech_started
             self.stt_service.on_error = self._handle_error
 
-            # Generate and send initial greeting
-            await self._send_initial_greeting()
+            # A resumed caller is mid-conversation: no second greeting
+            if not self.resumed:
+                await self._send_initial_greeting()
 
-            print('✅ Voice agent initialized')
+            log.info('voice agent initialized')
 
         except Exception as e:
-            print(f'❌ Failed to initialize voice agent: {e}')
+            log.error('failed to initialize voice agent', error=str(e))
             raise
 
     async def _send_initial_greeting(self):
         """Send initial greeting."""
         try:
             # Add to conversation history
-            self.session_state.conversation_history.append(
-                ConversationMessage(
-                    role='assistant',
-                    content=GISA_INITIAL_MESSAGE,
-                    timestamp=time.time(),
-                )
-            )
+            self._add_message('assistant', GISA_INITIAL_MESSAGE)
 
-            # Generate audio
-            audio_bytes = await self.tts_service.text_to_speech(GISA_INITIAL_MESSAGE)
+            # Generate audio (fixed phrase, cached once per process)
+            audio_bytes = await self.tts_service.cached_phrase(GISA_INITIAL_MESSAGE)
 
             # Emit audio
-            if self.on_audio_callback:
-                await self.on_audio_callback(audio_bytes)
+            await self._emit_audio(audio_bytes)
+            self._end_audio_turn()
 
         except Exception as e:
-            print(f'❌ Failed to send initial greeting: {e}')
+            log.error('failed to send initial greeting', error=str(e))
             raise
 
     async def _handle_transcript(self, result: dict):
         """Handle transcript from STT."""
+        self._barge_in()
+
         if result['is_final']:
-            print(f"📝 Final transcript: {result['transcript']}")
+            log.info('final transcript', stage='stt', transcript=result['transcript'])
             self.interim_transcript = ''
+            self.events.publish('final', transcript=result['transcript'])
 
-            if not self.is_processing:
-                await self._process_user_input(result['transcript'])
+            await self.endpointer.on_final(result['transcript'], result.get('speech_final', False))
         else:
             self.interim_transcript = result['transcript']
-            print(f"💭 Interim: {self.interim_transcript}")
+            self.endpointer.on_activity()
+            self.events.publish('interim', transcript=self.interim_transcript)
+            log.debug(
+                'interim transcript', stage='stt', transcript=self.interim_transcript,
+                sample=settings.log_sample_interim,
+            )
+
+    async def _handle_speech_started(self):
+        """Caller started talking (VAD)."""
+        self._barge_in()
+        self.endpointer.on_activity()
 
     async def _handle_error(self, error):
         """Handle STT error."""
-        print(f'❌ STT Error: {error}')
+        log.error('stt error', stage='stt', error=str(error))
 
     async def _process_user_input(self, transcript: str):
         """Process user input."""
@@ -104,75 +196,253 @@ class VoiceAgent:
             return
 
         self.is_processing = True
+        started = time.perf_counter()
+        phase_before = self.session_state.current_phase
+        self._set_turn_context()
 
         try:
-            print(f'🎯 Processing user input: {transcript}')
+            log.info('processing user input', transcript=transcript)
 
             # Add user message to history
-            self.session_state.conversation_history.append(
-                ConversationMessage(
-                    role='user',
-                    content=transcript,
-                    timestamp=time.time(),
+            self._add_message('user', transcript)
+            self._archive_audio_in()
+
+            # Classify locally so VIP/B3 sessions jump the upstream queues
+            scenario = classify(transcript)
+            if scenario:
+                self.session_state.scenario = scenario
+                self._promote(priority_for(scenario))
+            self._set_turn_context()
+
+            # Scripted phases are answered locally; the LLM only runs from FASE_3
+            scripted = self.dialogue.handle(transcript)
+            if scripted:
+                text = scripted.text
+                metadata = {}
+            else:
+                # Stream partial text only while someone watches and the model can
+                stream = self.events.active and self.capabilities['llm'].streaming_output
+                llm_response = await self.llm_service.generate_response(
+                    self.session_state.conversation_history,
+                    on_partial=self._publish_partial if stream else None,
                 )
+                text = llm_response.text
+                metadata = llm_response.metadata or {}
+                self._promote(priority_for(self.session_state.scenario, metadata))
+
+            # The reply may have moved the session to a new phase or priority
+            self._set_turn_context()
+            log.info(
+                'response', stage='scripted' if scripted else 'llm', text=text[:100],
+                duration_ms=round((time.perf_counter() - started) * 1000, 1),
             )
-
-            # Get LLM response
-            llm_response = await self.llm_service.generate_response(
-                self.session_state.conversation_history
-            )
-
-            print(f'🤖 LLM Response: {llm_response.text}')
-
-            # Update session state based on metadata
-            if llm_response.metadata:
-                if 'phase' in llm_response.metadata:
-                    self.session_state.current_phase = llm_response.metadata['phase']
-
-                # Check if UC was validated
-                if (
-                    'validei' in llm_response.text.lower()
-                    or 'perfeito' in llm_response.text.lower()
-                ):
-                    self.session_state.uc_validated = True
+            metadata['phase'] = self.session_state.current_phase
+            if self.session_state.scenario:
+                metadata['scenario'] = self.session_state.scenario
 
             # Add assistant response to history
-            self.session_state.conversation_history.append(
-                ConversationMessage(
-                    role='assistant',
-                    content=llm_response.text,
-                    timestamp=time.time(),
-                )
-            )
+            self._add_message('assistant', text, metadata)
+            self._publish_reply(text, metadata, phase_before)
 
             # Generate speech
-            audio_bytes = await self.tts_service.text_to_speech(llm_response.text)
-
-            # Emit audio
-            if self.on_audio_callback:
-                await self.on_audio_callback(audio_bytes)
+            spliced = None if scripted else await self.templates.render(text)
+            if scripted:
+                audio_bytes = await self._synthesize_scripted(scripted)
+                await self._emit_audio(audio_bytes)
+            elif spliced is not None:
+                audio_bytes = spliced
+                await self._emit_audio(audio_bytes)
+            elif len(text) >= settings.tts_chunk_min_chars and self._parallel_tts:
+                audio_bytes = await self._synthesize_chunked(text)
+            else:
+                audio_bytes = await self.tts_service.text_to_speech(text)
+                await self._emit_audio(audio_bytes)
+
+            if self.archive:
+                self.archive.append_audio(self.session_id, 'out', audio_bytes)
 
             # Emit response for UI
             if self.on_response_callback:
                 await self.on_response_callback({
-                    'text': llm_response.text,
-                    'metadata': llm_response.metadata,
+                    'text': text,
+                    'metadata': metadata,
                 })
 
+        except ProviderBusyError as e:
+            log.warning('provider over budget, turn dropped', error=str(e))
+            await self._send_hold_audio()
         except Exception as e:
-            print(f'❌ Error processing user input: {e}')
+            log.error('error processing user input', error=str(e))
+            await self._send_hold_audio()
         finally:
+            self._end_audio_turn()
             self.is_processing = False
 
+    @property
+    def _parallel_tts(self) -> bool:
+        """Whether the TTS provider gains from parallel chunked synthesis."""
+        limit = self.capabilities['tts'].max_concurrency
+        return limit is None or limit > 1
+
+    def _set_turn_context(self):
+        """Expose session id, priority, phase, scenario, slots and ledger to the services for this turn."""
+        state = self.session_state
+        current_session_id.set(self.session_id)
+        current_priority.set(state.priority)
+        current_phase.set(state.current_phase)
+        current_scenario.set(state.scenario)
+        current_slots.set(tuple(v for v in (state.caller_name, state.uc_number) if v))
+        current_ledger.set(self.ledger)
+
+    def _publish_partial(self, text: str):
+        """Forward a streamed LLM text chunk to subscribers."""
+        self.events.publish('llm_partial', text=text)
+
+    def _publish_reply(self, text: str, metadata: dict, phase_before: str):
+        """Publish the full reply and what it changed in the session."""
+        if not self.events.active:
+            return
+        state = self.session_state
+        if state.current_phase != phase_before:
+            self.events.publish('phase', previous=phase_before, phase=state.current_phase)
+        if metadata.get('protocol'):
+            self.events.publish(
+                'protocol', protocol=metadata['protocol'], scenario=state.scenario,
+            )
+        self.events.publish('reply', text=text, metadata=metadata)
+
+    def _promote(self, priority: str):
+        """Raise the session's scheduling priority (never lowers it)."""
+        promoted = promote(self.session_state.priority, priority)
+        if promoted != self.session_state.priority:
+            log.info('session promoted', priority=promoted)
+            self.session_state.priority = promoted
+
+    def _add_message(self, role: str, content: str, metadata: Optional[dict] = None):
+        """Append a message to the history and the session archive."""
+        message = ConversationMessage(role=role, content=content, timestamp=time.time())
+        self.session_state.conversation_history.append(message)
+
+        if self.archive:
+            record = {'type': 'message', 'role': role, 'content': content, 'ts': message.timestamp}
+            if metadata:
+                record['metadata'] = metadata
+            self.archive.append(self.session_id, record)
+
+    def _archive_audio_in(self):
+        """Archive the caller audio of the utterance just committed."""
+        if self.archive and self.audio_in_buffer:
+            self.archive.append_audio(self.session_id, 'in', bytes(self.audio_in_buffer))
+        self.audio_in_buffer.clear()
+
+    async def _synthesize_scripted(self, reply: ScriptedReply) -> bytes:
+        """Synthesize a scripted reply, using cached audio for fixed phrases."""
+        segments = await asyncio.gather(*[
+            self.tts_service.cached_phrase(text) if cacheable
+            else self.tts_service.text_to_speech(text)
+            for text, cacheable in reply.segments
+        ])
+        return b''.join(segments)
+
+    async def _synthesize_chunked(self, text: str) -> bytes:
+        """Synthesize a long reply in parallel chunks, emitting each in order."""
+        chunks = []
+        async for audio_bytes in self.tts_service.text_to_speech_chunks(text):
+            chunks.append(audio_bytes)
+            await self._emit_audio(audio_bytes)
+        return b''.join(chunks)
+
+    async def _emit_audio(self, audio_bytes: bytes):
+        """Send audio to the caller, through the jitter buffer when pacing."""
+        if self.output:
+            self.output.push(audio_bytes)
+        else:
+            await self._send_audio(audio_bytes)
+
+    async def _send_audio(self, audio_bytes: bytes):
+        """Hand audio (a whole clip or one paced frame) to the transport."""
+        if self.on_audio_callback:
+            await self.on_audio_callback(audio_bytes)
+
+    def _end_audio_turn(self):
+        """No more audio for this turn: play out what is buffered."""
+        if self.output:
+            self.output.end_turn()
+
+    def _barge_in(self):
+        """Stop playback when the caller talks over a finished reply."""
+        output = self.output
+        if not (settings.audio_barge_in and output) or self.is_processing:
+            return
+        if output.playing or output.buffer:
+            log.info('barge-in, audio flushed', stage='audio_out', buffered_ms=output.buffered_ms)
+            output.flush()
+
+    async def _send_hold_audio(self):
+        """Tell the caller to hold on instead of leaving them in silence."""
+        try:
+            audio_bytes = await self.tts_service.cached_phrase(GISA_HOLD_MESSAGE)
+            await self._emit_audio(audio_bytes)
+        except Exception as e:
+            log.error('failed to send hold audio', error=str(e))
+
     async def process_audio(self, audio_data: bytes):
         """Process incoming audio."""
+        self.ledger.add(
+            'stt_audio_s', len(audio_data) / STT_BYTES_PER_S, self.session_state.current_phase
+        )
+        if self.archive and self.archive.record_audio:
+            self.audio_in_buffer.extend(audio_data)
         await self.stt_service.send_audio(audio_data)
 
+    def snapshot(self) -> SessionSnapshot:
+        """Compact snapshot of the session, with only the recent history window."""
+        state = self.session_state
+        history = [m for m in state.conversation_history if m.role != 'system']
+        window = history[-settings.snapshot_history_window:]
+        return SessionSnapshot(
+            taken_at=time.time(),
+            state=state.model_copy(update={'conversation_history': window}),
+            uc_attempts=self.dialogue.uc_attempts,
+            name_attempts=self.dialogue.name_attempts,
+        )
+
+    def _restore(self, snapshot: SessionSnapshot):
+        """Load a snapshot into this agent (the system prompt is not snapshotted)."""
+        system = self.session_state.conversation_history[0]
+        self.session_state = snapshot.state.model_copy(update={
+            'conversation_history': [system] + list(snapshot.state.conversation_history),
+        })
+        self.dialogue = DialogueStateMachine(self.session_state)
+        self.dialogue.uc_attempts = snapshot.uc_attempts
+        self.dialogue.name_attempts = snapshot.name_attempts
+
     def get_session_state(self) -> SessionState:
         """Get current session state."""
         return self.session_state
 
     async def shutdown(self):
         """Shutdown the voice agent."""
-        print('🛑 Shutting down voice agent...')
+        log.info('shutting down voice agent')
+        self.endpointer.close()
+        log.info('endpointing', stage='endpointing', **self.endpointer.stats())
+        self.events.close()
+        if self.output:
+            log.info('audio output', stage='audio_out', **self.output.stats())
+            await self.output.close()
         await self.stt_service.close()
+
+        state = self.session_state
+        record_session(self.ledger, state.scenario, self.providers)
+
+        if self.archive:
+            self.archive.append(self.session_id, {
+                'type': 'end',
+                'phase': state.current_phase,
+                'uc_validated': state.uc_validated,
+                'uc_number': state.uc_number,
+                'caller_name': state.caller_name,
+                'message_count': len(state.conversation_history),
+                'duration': time.time() - state.start_time,
+                'resources': self.ledger.snapshot(),
+            })
@@ -16,16 +16,129 @@ class Settings(BaseSettings):
     livekit_url: str = os.getenv('LIVEKIT_URL', 'ws://localhost:7880')
     livekit_api_key: str = os.getenv('LIVEKIT_API_KEY', '')
     livekit_api_secret: str = os.getenv('LIVEKIT_API_SECRET', '')
+    livekit_token_ttl_s: int = int(os.getenv('LIVEKIT_TOKEN_TTL_S', '600'))
+    livekit_token_reuse_margin_s: int = int(os.getenv('LIVEKIT_TOKEN_REUSE_MARGIN_S', '120'))
+    livekit_token_bulk_max: int = int(os.getenv('LIVEKIT_TOKEN_BULK_MAX', '1000'))
+
+    # Providers per kind (name or name:option, e.g. gemini:gemini-1.5-flash);
+    # the *_PROVIDER_B variants go to PROVIDER_AB_FRACTION of sessions
+    stt_provider: str = os.getenv('STT_PROVIDER', 'deepgram')
+    llm_provider: str = os.getenv('LLM_PROVIDER', 'gemini')
+    tts_provider: str = os.getenv('TTS_PROVIDER', 'elevenlabs')
+    stt_provider_b: str = os.getenv('STT_PROVIDER_B', '')
+    llm_provider_b: str = os.getenv('LLM_PROVIDER_B', '')
+    tts_provider_b: str = os.getenv('TTS_PROVIDER_B', '')
+    provider_ab_fraction: float = float(os.getenv('PROVIDER_AB_FRACTION', '0'))
 
     # Deepgram (STT)
     deepgram_api_key: str = os.getenv('DEEPGRAM_API_KEY', '')
 
+    # Endpointing: Deepgram speech_final silence, and the local silence that
+    # commits an utterance per expected answer (digit sequences wait longest)
+    stt_endpointing_ms: int = int(os.getenv('STT_ENDPOINTING_MS', '300'))
+    endpoint_confirmation_ms: float = float(os.getenv('ENDPOINT_CONFIRMATION_MS', '400'))
+    endpoint_name_ms: float = float(os.getenv('ENDPOINT_NAME_MS', '500'))
+    endpoint_free_ms: float = float(os.getenv('ENDPOINT_FREE_MS', '400'))
+    endpoint_digits_ms: float = float(os.getenv('ENDPOINT_DIGITS_MS', '1500'))
+
+    # Warm pool of pre-opened live connections (size adapts between min and max)
+    stt_pool_enabled: bool = os.getenv('STT_POOL_ENABLED', 'true').lower() == 'true'
+    stt_pool_min: int = int(os.getenv('STT_POOL_MIN', '2'))
+    stt_pool_max: int = int(os.getenv('STT_POOL_MAX', '10'))
+    stt_pool_keepalive_s: float = float(os.getenv('STT_POOL_KEEPALIVE_S', '5'))
+    stt_pool_max_age_s: float = float(os.getenv('STT_POOL_MAX_AGE_S', '300'))
+
     # Google Gemini (LLM)
     google_api_key: str = os.getenv('GOOGLE_API_KEY', '')
 
     # ElevenLabs (TTS)
     elevenlabs_api_key: str = os.getenv('ELEVENLABS_API_KEY', '')
     elevenlabs_voice_id: str = os.getenv('ELEVENLABS_VOICE_ID', '')
+    elevenlabs_output_format: str = os.getenv('ELEVENLABS_OUTPUT_FORMAT', 'pcm_16000')
+
+    # Send only the prompt sections the phase and candidate scenario group need
+    prompt_scoping_enabled: bool = os.getenv('PROMPT_SCOPING_ENABLED', 'true').lower() == 'true'
+
+    # FASE_3 reply cache for repeated informational questions
+    llm_cache_enabled: bool = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+    llm_cache_max_entries: int = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '512'))
+    llm_cache_ttl_s: float = float(os.getenv('LLM_CACHE_TTL_S', '600'))
+
+    # Resilience (deadlines, circuit breakers)
+    llm_timeout_s: float = float(os.getenv('LLM_TIMEOUT_S', '8'))
+    llm_latency_slo_ms: float = float(os.getenv('LLM_LATENCY_SLO_MS', '3000'))
+    llm_fallback_model: str = os.getenv('LLM_FALLBACK_MODEL', 'gemini-1.5-flash')
+    tts_timeout_s: float = float(os.getenv('TTS_TIMEOUT_S', '6'))
+    tts_latency_slo_ms: float = float(os.getenv('TTS_LATENCY_SLO_MS', '2000'))
+    breaker_window: int = int(os.getenv('BREAKER_WINDOW', '20'))
+    breaker_min_calls: int = int(os.getenv('BREAKER_MIN_CALLS', '10'))
+    breaker_error_rate: float = float(os.getenv('BREAKER_ERROR_RATE', '0.5'))
+    breaker_slow_rate: float = float(os.getenv('BREAKER_SLOW_RATE', '0.5'))
+    breaker_cooldown_s: float = float(os.getenv('BREAKER_COOLDOWN_S', '30'))
+
+    # Provider budgets: concurrency, rate (token bucket), bounded queue, queue deadline
+    llm_max_inflight: int = int(os.getenv('LLM_MAX_INFLIGHT', '32'))
+    llm_rate_per_s: float = float(os.getenv('LLM_RATE_PER_S', '10'))
+    llm_burst: float = float(os.getenv('LLM_BURST', '20'))
+    llm_max_queue: int = int(os.getenv('LLM_MAX_QUEUE', '200'))
+    llm_queue_timeout_s: float = float(os.getenv('LLM_QUEUE_TIMEOUT_S', '2'))
+    tts_max_inflight: int = int(os.getenv('TTS_MAX_INFLIGHT', '16'))
+    tts_rate_per_s: float = float(os.getenv('TTS_RATE_PER_S', '0'))
+    tts_burst: float = float(os.getenv('TTS_BURST', '0'))
+    tts_max_queue: int = int(os.getenv('TTS_MAX_QUEUE', '200'))
+    tts_queue_timeout_s: float = float(os.getenv('TTS_QUEUE_TIMEOUT_S', '2'))
+    stt_max_streams: int = int(os.getenv('STT_MAX_STREAMS', '50'))
+    stt_rate_per_s: float = float(os.getenv('STT_RATE_PER_S', '0'))
+    stt_max_queue: int = int(os.getenv('STT_MAX_QUEUE', '50'))
+    stt_queue_timeout_s: float = float(os.getenv('STT_QUEUE_TIMEOUT_S', '3'))
+
+    # Chunked synthesis of long replies
+    tts_chunk_min_chars: int = int(os.getenv('TTS_CHUNK_MIN_CHARS', '120'))
+    tts_chunk_concurrency: int = int(os.getenv('TTS_CHUNK_CONCURRENCY', '3'))
+
+    # Closing formats spliced from cached audio (needs a pcm_* output format)
+    tts_templates_enabled: bool = os.getenv('TTS_TEMPLATES_ENABLED', 'true').lower() == 'true'
+
+    # Paced audio output: jitter buffer with pre-roll, fixed frames, barge-in flush
+    audio_pacing_enabled: bool = os.getenv('AUDIO_PACING_ENABLED', 'true').lower() == 'true'
+    audio_frame_ms: int = int(os.getenv('AUDIO_FRAME_MS', '20'))
+    audio_preroll_ms: int = int(os.getenv('AUDIO_PREROLL_MS', '60'))
+    audio_max_buffer_ms: int = int(os.getenv('AUDIO_MAX_BUFFER_MS', '30000'))
+    audio_barge_in: bool = os.getenv('AUDIO_BARGE_IN', 'true').lower() == 'true'
+
+    # Session archive
+    archive_enabled: bool = os.getenv('ARCHIVE_ENABLED', 'true').lower() == 'true'
+    archive_dir: str = os.getenv('ARCHIVE_DIR', 'data/archive')
+    archive_segment_mb: int = int(os.getenv('ARCHIVE_SEGMENT_MB', '64'))
+    archive_audio: bool = os.getenv('ARCHIVE_AUDIO', 'false').lower() == 'true'
+
+    # Server-sent events: per-subscriber buffer (oldest dropped) and idle keepalive
+    events_buffer_size: int = int(os.getenv('EVENTS_BUFFER_SIZE', '256'))
+    events_keepalive_s: float = float(os.getenv('EVENTS_KEEPALIVE_S', '15'))
+
+    # Drain and session handoff (snapshots in a shared dir and/or posted to a peer)
+    drain_deadline_s: float = float(os.getenv('DRAIN_DEADLINE_S', '10'))
+    snapshot_handoff_timeout_s: float = float(os.getenv('SNAPSHOT_HANDOFF_TIMEOUT_S', '5'))
+    snapshot_dir: str = os.getenv('SNAPSHOT_DIR', 'data/snapshots')
+    snapshot_peer_url: str = os.getenv('SNAPSHOT_PEER_URL', '')
+    snapshot_ttl_s: float = float(os.getenv('SNAPSHOT_TTL_S', '300'))
+    snapshot_history_window: int = int(os.getenv('SNAPSHOT_HISTORY_WINDOW', '20'))
+    admin_token: str = os.getenv('ADMIN_TOKEN', '')
+
+    # Event-loop lag monitor (stacks captured for a sampled fraction of stalls)
+    loop_monitor_enabled: bool = os.getenv('LOOP_MONITOR_ENABLED', 'true').lower() == 'true'
+    loop_monitor_interval_ms: float = float(os.getenv('LOOP_MONITOR_INTERVAL_MS', '50'))
+    loop_block_threshold_ms: float = float(os.getenv('LOOP_BLOCK_THRESHOLD_MS', '100'))
+    loop_stack_sample_rate: float = float(os.getenv('LOOP_STACK_SAMPLE_RATE', '0.25'))
+
+    # Logging: queue-backed writer, per-module levels (agent=DEBUG,services.deepgram=WARNING)
+    log_level: str = os.getenv('LOG_LEVEL', 'INFO')
+    log_levels: str = os.getenv('LOG_LEVELS', '')
+    log_format: str = os.getenv('LOG_FORMAT', 'text')
+    log_sample_interim: float = float(os.getenv('LOG_SAMPLE_INTERIM', '0.05'))
+
+    # Startup
+    warmup_enabled: bool = os.getenv('WARMUP_ENABLED', 'true').lower() == 'true'
 
     # Server
     port: int = int(os.getenv('PORT', '3000'))
@@ -0,0 +1,18 @@
+"""Per-turn context shared between the agent and the provider services.
+
+VoiceAgent sets these at the start of each turn; since every turn runs in
+its own task, services read the values of the session they are serving.
+"""
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .observability.ledger import ResourceLedger
+
+current_session_id: ContextVar[str] = ContextVar('current_session_id', default='')
+current_priority: ContextVar[str] = ContextVar('current_priority', default='normal')
+current_phase: ContextVar[str] = ContextVar('current_phase', default='')
+current_scenario: ContextVar[Optional[str]] = ContextVar('current_scenario', default=None)
+# Caller-specific values (name, UC) that must never leak into shared caches
+current_slots: ContextVar[Tuple[str, ...]] = ContextVar('current_slots', default=())
+current_ledger: ContextVar[Optional['ResourceLedger']] = ContextVar('current_ledger', default=None)
@@ -3,21 +3,41 @@ import asyncio
 import time
 from datetime import datetime
 from typing import Dict
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from livekit import api
+from fastapi.responses import JSONResponse, StreamingResponse
 from .config import settings, validate_config
 from .models import (
     TokenRequest,
     TokenResponse,
+    BulkTokenRequest,
+    BulkTokenResponse,
+    IssuedToken,
     SessionStartRequest,
     SessionResponse,
     HealthResponse,
+    ReadyResponse,
+    DrainResponse,
+    LoopReport,
+    SessionSnapshot,
 )
 from .agent.voice_agent import VoiceAgent
-
-# Validate configuration on startup
-validate_config()
+from .agent.endpointing import endpointing_stats
+from .agent.events import stream_sse
+from .services.budget import ProviderBusyError
+from .services.deepgram import start_pool, stop_pool, pool_stats
+from .services.livekit_tokens import get_issuer
+from .services.response_cache import get_response_cache
+from .services.resilience import breaker_states
+from .services.scheduler import forget_session, scheduler_states
+from .storage.session_archive import start_archive, stop_archive
+from .storage.snapshots import get_snapshot_store, hand_off
+from .observability.ledger import ledger_totals
+from .observability.logs import get_logger, setup_logging, shutdown_logging
+from .observability.loop_monitor import get_monitor, start_monitor, stop_monitor
+from .warmup import readiness, warm_up, mark_ready
+
+log = get_logger(__name__)
 
 app = FastAPI(
     title='GISA Voice Agent API',
@@ -37,10 +57,35 @@ app.add_middleware(
 # Store active sessions
 active_sessions: Dict[str, VoiceAgent] = {}
 
+# Set once the worker starts draining: no new sessions are admitted
+draining = False
+
 
 @app.on_event('startup')
 async def startup_event():
     """Startup event."""
+    # Validated here rather than at import so `-X importtime` and tooling stay cheap
+    validate_config()
+
+    setup_logging(settings.log_level, settings.log_levels, settings.log_format)
+
+    # Started first so stalls during warm-up are caught too
+    if settings.loop_monitor_enabled:
+        start_monitor(
+            interval_s=settings.loop_monitor_interval_ms / 1000,
+            threshold_ms=settings.loop_block_threshold_ms,
+            sample_rate=settings.loop_stack_sample_rate,
+        )
+
+    await start_archive()
+
+    # Provider SDKs load lazily; warm them up without delaying the server start
+    if settings.warmup_enabled:
+        asyncio.create_task(warm_up())
+    else:
+        mark_ready()
+        start_pool()
+
     print('')
     print('🎙️  ========================================')
     print('🎙️   GISA - Voice Agent Server (Python)')
@@ -54,7 +99,7 @@ async def startup_event():
     print('   - Gemini 2.0 Flash (LLM): ✓')
     print('   - ElevenLabs (TTS): ✓')
     print('')
-    print('🚀 Ready to accept connections!')
+    print('🚀 Accepting connections (see /ready for warm-up status)')
     print('')
 
 
@@ -63,67 +108,191 @@ async def shutdown_event():
     """Shutdown event."""
     print('\n🛑 Shutting down server...')
 
-    # Shutdown all active sessions
-    for session_id, agent in active_sessions.items():
-        print(f'   Ending session: {session_id}')
-        await agent.shutdown()
+    # Hand live sessions off to the next worker and end them concurrently
+    result = await drain_sessions()
+    print(f'   Drained {result.sessions} sessions in {result.duration_s:.2f}s')
 
+    await stop_pool()
+
+    # Flush archived transcripts after the last sessions have ended
+    await stop_archive()
+    await stop_monitor()
+    shutdown_logging()
+
+
+async def drain_sessions() -> DrainResponse:
+    """Stop admissions, hand off session snapshots and end sessions within the deadline."""
+    global draining
+    draining = True
+    started = time.perf_counter()
+
+    agents = list(active_sessions.values())
     active_sessions.clear()
 
+    # Snapshots are taken before anything is torn down
+    snapshots = [agent.snapshot() for agent in agents]
+
+    # Hand off first, under its own deadline, so a slow shutdown can't cancel it
+    handed_off = 0
+    timed_out = False
+    try:
+        handed_off = await asyncio.wait_for(
+            hand_off(snapshots), settings.snapshot_handoff_timeout_s
+        )
+    except asyncio.TimeoutError:
+        timed_out = True
+        log.warning('snapshot handoff deadline exceeded',
+                    deadline_s=settings.snapshot_handoff_timeout_s)
+    except Exception as e:
+        log.error('snapshot handoff failed', error=str(e))
+
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*[agent.shutdown() for agent in agents], return_exceptions=True),
+            settings.drain_deadline_s,
+        )
+    except asyncio.TimeoutError:
+        timed_out = True
+        log.warning('drain deadline exceeded', deadline_s=settings.drain_deadline_s)
+
+    for agent in agents:
+        forget_session(agent.session_id)
+
+    return DrainResponse(
+        sessions=len(agents),
+        handed_off=handed_off,
+        timed_out=timed_out,
+        duration_s=round(time.perf_counter() - started, 3),
+    )
+
 
 @app.get('/health', response_model=HealthResponse)
 async def health_check():
     """Health check endpoint."""
+    breakers = breaker_states()
+    degraded = any(b['state'] != 'closed' for b in breakers.values())
+
+    response_cache = get_response_cache()
     return HealthResponse(
-        status='healthy',
+        status='degraded' if degraded else 'healthy',
         timestamp=datetime.now().isoformat(),
         active_sessions=len(active_sessions),
+        breakers=breakers,
+        queues=scheduler_states(),
+        pools=pool_stats(),
+        resources=ledger_totals(),
+        endpointing=endpointing_stats(),
+        llm_cache=response_cache.stats() if response_cache else {},
     )
 
 
+@app.get('/ready', response_model=ReadyResponse)
+async def ready_check():
+    """Readiness endpoint: 200 only once warm-up has finished."""
+    state = ReadyResponse(**readiness.snapshot(), draining=draining)
+    if not state.ready or draining:
+        return JSONResponse(status_code=503, content=state.model_dump())
+    return state
+
+
+@app.get('/debug/loop', response_model=LoopReport)
+async def loop_report(limit: int = 10):
+    """Event-loop lag histogram and the stacks that blocked the loop the longest."""
+    monitor = get_monitor()
+    if not monitor:
+        raise HTTPException(status_code=404, detail='Loop monitor disabled')
+    return LoopReport(**monitor.report(limit))
+
+
 @app.post('/api/token', response_model=TokenResponse)
 async def generate_token(request: TokenRequest):
     """Generate LiveKit token for client."""
     try:
-        token = api.AccessToken(
-            settings.livekit_api_key,
-            settings.livekit_api_secret,
-        )
+        # Reconnects to the same room reuse the cached token until near expiry
+        jwt_token = get_issuer().issue(request.room_name, request.participant_name)
+
+        log.info('token issued', room=request.room_name, participant=request.participant_name)
 
-        token.with_identity(request.participant_name)
-        token.with_name(request.participant_name)
-        token.with_grants(
-            api.VideoGrants(
-                room_join=True,
-                room=request.room_name,
-                can_publish=True,
-                can_subscribe=True,
-                can_publish_data=True,
-            )
+        return TokenResponse(
+            token=jwt_token,
+            url=settings.livekit_url,
         )
 
-        jwt_token = token.to_jwt()
+    except Exception as e:
+        log.error('error generating token', error=str(e))
+        raise HTTPException(status_code=500, detail='Failed to generate token')
+
 
-        print(
-            f'🎫 Generated token for {request.participant_name} in room {request.room_name}'
+@app.post('/api/token/bulk', response_model=BulkTokenResponse)
+async def generate_tokens_bulk(request: BulkTokenRequest):
+    """Generate LiveKit tokens for many participants (load tests, batch dialing)."""
+    if len(request.participants) > settings.livekit_token_bulk_max:
+        raise HTTPException(
+            status_code=413,
+            detail=f'At most {settings.livekit_token_bulk_max} participants per request',
         )
 
-        return TokenResponse(
-            token=jwt_token,
+    try:
+        pairs = [(p.room_name, p.participant_name) for p in request.participants]
+
+        # Signing many JWTs is CPU work, keep it off the event loop
+        tokens = await asyncio.to_thread(get_issuer().issue_many, pairs)
+
+        log.info('tokens issued in bulk', count=len(tokens))
+
+        return BulkTokenResponse(
             url=settings.livekit_url,
+            tokens=[
+                IssuedToken(room_name=room, participant_name=participant, token=token)
+                for (room, participant), token in zip(pairs, tokens)
+            ],
         )
 
     except Exception as e:
-        print(f'❌ Error generating token: {e}')
-        raise HTTPException(status_code=500, detail='Failed to generate token')
+        log.error('error generating tokens', error=str(e))
+        raise HTTPException(status_code=500, detail='Failed to generate tokens')
+
+
+@app.post('/admin/drain', response_model=DrainResponse)
+async def drain(x_admin_token: str = Header(default='')):
+    """Drain this worker before a restart: stop admissions and hand sessions off."""
+    if not settings.admin_token or x_admin_token != settings.admin_token:
+        raise HTTPException(status_code=403, detail='Forbidden')
+
+    result = await drain_sessions()
+    log.info('worker drained', sessions=result.sessions, duration_s=result.duration_s)
+    return result
+
+
+@app.post('/api/session/snapshot', response_model=SessionResponse)
+async def receive_snapshot(snapshot: SessionSnapshot, x_admin_token: str = Header(default='')):
+    """Accept a session snapshot handed off by a draining worker."""
+    # Workers share ADMIN_TOKEN; a snapshot decides what a resumed call knows
+    if not settings.admin_token or x_admin_token != settings.admin_token:
+        raise HTTPException(status_code=403, detail='Forbidden')
+
+    try:
+        await asyncio.to_thread(get_snapshot_store().save, snapshot)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    return SessionResponse(
+        session_id=snapshot.state.session_id,
+        status='handed_off',
+        phase=snapshot.state.current_phase,
+    )
 
 
 @app.post('/api/session/start', response_model=SessionResponse)
 async def start_session(request: SessionStartRequest):
-    """Start a new voice agent session."""
+    """Start a new voice agent session, resuming it if a snapshot was handed off."""
+    if draining:
+        raise HTTPException(status_code=503, detail='Worker is draining, reconnect')
+
     try:
-        # Create voice agent
-        agent = VoiceAgent(request.session_id)
+        # A reconnecting caller resumes mid-call from the previous worker's snapshot
+        snapshot = await asyncio.to_thread(get_snapshot_store().take, request.session_id)
+        agent = VoiceAgent(request.session_id, snapshot=snapshot)
 
         # TODO: Connect to LiveKit room and handle audio streams
         # This requires additional LiveKit integration for Python
@@ -134,16 +303,21 @@ async def start_session(request: SessionStartRequest):
         # Store session
         active_sessions[request.session_id] = agent
 
-        print(f'✅ Session started: {request.session_id}')
+        log.info('session started', session_id=request.session_id, resumed=agent.resumed)
 
         return SessionResponse(
             session_id=request.session_id,
-            status='active',
+            status='resumed' if agent.resumed else 'active',
             phase=agent.get_session_state().current_phase,
+            providers=agent.providers,
         )
 
+    except ProviderBusyError as e:
+        log.warning('session rejected, stt over budget', session_id=request.session_id, error=str(e))
+        raise HTTPException(status_code=503, detail='Voice capacity exhausted, try again')
+
     except Exception as e:
-        print(f'❌ Error starting session: {e}')
+        log.error('error starting session', session_id=request.session_id, error=str(e))
         raise HTTPException(status_code=500, detail='Failed to start session')
 
 
@@ -164,6 +338,34 @@ async def get_session(session_id: str):
         uc_validated=state.uc_validated,
         message_count=len(state.conversation_history),
         uptime=time.time() - state.start_time,
+        resources=agent.ledger.snapshot(),
+        audio_output=agent.output.stats() if agent.output else None,
+        endpointing=agent.endpointer.stats(),
+        providers=agent.providers,
+    )
+
+
+@app.get('/api/session/{session_id}/events')
+async def session_events(session_id: str):
+    """Server-sent events: transcripts, streamed reply text, phase and protocol changes."""
+    agent = active_sessions.get(session_id)
+
+    if not agent:
+        raise HTTPException(status_code=404, detail='Session not found')
+
+    subscription = agent.events.subscribe()
+
+    async def stream():
+        try:
+            async for chunk in stream_sse(subscription, settings.events_keepalive_s):
+                yield chunk
+        finally:
+            agent.events.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
     )
 
 
@@ -177,12 +379,14 @@ async def end_session(session_id: str):
 
     await agent.shutdown()
     active_sessions.pop(session_id)
+    forget_session(session_id)
 
-    print(f'🛑 Session ended: {session_id}')
+    log.info('session ended', session_id=session_id)
 
     return SessionResponse(
         session_id=session_id,
         status='ended',
+        resources=agent.ledger.snapshot(),
     )
 
 
@@ -1,5 +1,5 @@
 """Pydantic models."""
-from typing import Literal, Optional, List
+from typing import Any, Literal, Optional, List, Dict
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -18,9 +18,21 @@ class SessionState(BaseModel):
     current_phase: Literal['FASE_1', 'FASE_2', 'FASE_3'] = 'FASE_1'
     uc_validated: bool = False
     uc_number: Optional[str] = None
+    caller_name: Optional[str] = None
+    scenario: Optional[str] = None
+    priority: Literal['critical', 'high', 'normal'] = 'normal'
     start_time: float
 
 
+class SessionSnapshot(BaseModel):
+    """Compact, resumable state of a live session (history window only)."""
+    version: int = 1
+    taken_at: float
+    state: SessionState
+    uc_attempts: int = 0
+    name_attempts: int = 0
+
+
 class TokenRequest(BaseModel):
     """Token request."""
     room_name: str
@@ -33,6 +45,24 @@ class TokenResponse(BaseModel):
     url: str
 
 
+class BulkTokenRequest(BaseModel):
+    """Bulk token request."""
+    participants: List[TokenRequest]
+
+
+class IssuedToken(BaseModel):
+    """Token issued for one participant."""
+    room_name: str
+    participant_name: str
+    token: str
+
+
+class BulkTokenResponse(BaseModel):
+    """Bulk token response."""
+    url: str
+    tokens: List[IssuedToken]
+
+
 class SessionStartRequest(BaseModel):
     """Session start request."""
     session_id: str
@@ -47,6 +77,10 @@ class SessionResponse(BaseModel):
     uc_validated: Optional[bool] = None
     message_count: Optional[int] = None
     uptime: Optional[float] = None
+    resources: Optional[Dict[str, Any]] = None
+    audio_output: Optional[Dict[str, Any]] = None
+    endpointing: Optional[Dict[str, Any]] = None
+    providers: Optional[Dict[str, str]] = None
 
 
 class HealthResponse(BaseModel):
@@ -54,6 +88,37 @@ class HealthResponse(BaseModel):
     status: str
     timestamp: str
     active_sessions: int
+    breakers: Dict[str, dict] = {}
+    queues: Dict[str, dict] = {}
+    pools: Dict[str, dict] = {}
+    resources: Dict[str, dict] = {}
+    endpointing: Dict[str, Any] = {}
+    llm_cache: Dict[str, Any] = {}
+
+
+class ReadyResponse(BaseModel):
+    """Readiness check response."""
+    ready: bool
+    draining: bool = False
+    stages: Dict[str, str] = {}
+    warmup_s: Optional[float] = None
+
+
+class DrainResponse(BaseModel):
+    """Result of draining a worker."""
+    sessions: int
+    handed_off: int
+    timed_out: bool
+    duration_s: float
+
+
+class LoopReport(BaseModel):
+    """Event-loop lag and blocking-call report."""
+    lag: Dict[str, Any]
+    threshold_ms: float
+    stalls: int
+    captured: int
+    offenders: List[dict] = []
 
 
 class STTResult(BaseModel):
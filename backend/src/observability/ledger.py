@@ -0,0 +1,115 @@
+"""Per-session resource ledger.
+
+Services charge what each call costs (audio seconds sent to STT, LLM
+tokens, TTS characters, cache hits, upstream time) to the ledger of the
+session they are serving, found through the turn context. Updates are a
+couple of dict increments, bucketed by the session's current phase; when a
+session ends its ledger is folded into process-wide totals per phase and
+per classified scenario.
+"""
+from typing import Any, Dict, Optional
+from ..context import current_ledger, current_phase
+
+# Caller audio is 16 kHz, 16-bit mono PCM
+STT_BYTES_PER_S = 16000 * 2
+
+UPSTREAM_PREFIX = 'upstream_ms:'
+
+
+def _nest(counters: Dict[str, float]) -> Dict[str, Any]:
+    """Group ``upstream_ms:<provider>`` counters under ``upstream_ms``."""
+    result: Dict[str, Any] = {}
+    upstream: Dict[str, float] = {}
+    for key, value in counters.items():
+        if key.startswith(UPSTREAM_PREFIX):
+            upstream[key[len(UPSTREAM_PREFIX):]] = round(value, 1)
+        else:
+            result[key] = int(value) if value.is_integer() else round(value, 3)
+    if upstream:
+        result['upstream_ms'] = upstream
+    return result
+
+
+def _merge(target: Dict[str, float], counters: Dict[str, float]):
+    """Add counters into target."""
+    for key, value in counters.items():
+        target[key] = target.get(key, 0.0) + value
+
+
+class ResourceLedger:
+    """What one session cost, in total and per phase."""
+
+    def __init__(self):
+        """Initialize ledger."""
+        self.totals: Dict[str, float] = {}
+        self.by_phase: Dict[str, Dict[str, float]] = {}
+
+    def add(self, key: str, amount: float, phase: Optional[str] = None):
+        """Charge an amount to the session and to its current phase."""
+        phase = phase or current_phase.get() or 'none'
+        self.totals[key] = self.totals.get(key, 0.0) + amount
+        bucket = self.by_phase.get(phase)
+        if bucket is None:
+            bucket = self.by_phase[phase] = {}
+        bucket[key] = bucket.get(key, 0.0) + amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return ledger state."""
+        return {
+            **_nest(self.totals),
+            'by_phase': {phase: _nest(bucket) for phase, bucket in self.by_phase.items()},
+        }
+
+
+def charge(key: str, amount: float):
+    """Charge the ledger of the session this turn belongs to, if any."""
+    ledger = current_ledger.get()
+    if ledger is not None:
+        ledger.add(key, amount)
+
+
+def charge_upstream(provider: str, duration_ms: float):
+    """Charge time spent waiting on a provider."""
+    charge(UPSTREAM_PREFIX + provider, duration_ms)
+
+
+# Totals of ended sessions
+_phase_totals: Dict[str, Dict[str, float]] = {}
+_scenario_totals: Dict[str, Dict[str, float]] = {}
+_provider_totals: Dict[str, Dict[str, float]] = {}
+
+
+def _add_session(totals: Dict[str, Dict[str, float]], key: str, counters: Dict[str, float]):
+    """Fold one session's counters into a keyed total."""
+    bucket = totals.setdefault(key, {})
+    _merge(bucket, counters)
+    bucket['sessions'] = bucket.get('sessions', 0.0) + 1
+
+
+def record_session(
+    ledger: ResourceLedger,
+    scenario: Optional[str],
+    providers: Optional[Dict[str, str]] = None,
+):
+    """Fold an ended session's ledger into the per-phase, scenario and provider totals."""
+    for phase, bucket in ledger.by_phase.items():
+        _merge(_phase_totals.setdefault(phase, {}), bucket)
+
+    _add_session(_scenario_totals, scenario or 'unclassified', ledger.totals)
+
+    # Per provider, so A/B variants can be compared (e.g. llm=gemini vs llm=gemini:<model>)
+    for kind, name in (providers or {}).items():
+        _add_session(_provider_totals, f'{kind}={name}', ledger.totals)
+
+
+def ledger_totals() -> Dict[str, Any]:
+    """Return the totals of ended sessions per phase and per scenario."""
+    return {
+        'by_phase': {phase: _nest(bucket) for phase, bucket in _phase_totals.items()},
+        'by_scenario': {
+            scenario: _nest(bucket) for scenario, bucket in sorted(_scenario_totals.items())
+        },
+        'by_provider': {
+            provider: _nest(bucket) for provider, bucket in sorted(_provider_totals.items())
+        },
+    }
@@ -0,0 +1,177 @@
+"""Async, sampled, structured logging.
+
+Records are handed to a queue on the calling thread and formatted and
+written by a background listener, so the event loop never blocks on stdout.
+Every record carries structured fields (session_id and phase from the turn
+context, plus stage, duration_ms, etc. given by the caller), and
+high-frequency events such as interim transcripts can be sampled before any
+work is done.
+"""
+import json
+import logging
+import queue
+import random
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+from ..context import current_session_id, current_phase
+
+ROOT_LOGGER = 'gisa'
+
+# Keyword arguments that belong to logging itself rather than to the fields
+_LOGGING_KWARGS = ('exc_info', 'extra')
+
+_listener: Optional[QueueListener] = None
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """Logger taking structured fields as keyword arguments.
+
+    ``log.info('tts done', stage='tts', duration_ms=120.5)``; pass
+    ``sample=0.05`` to keep only a fraction of a high-frequency event.
+    """
+
+    def log(self, level: int, msg: Any, *args, sample: Optional[float] = None, **kwargs):
+        """Log with fields, dropping unsampled records before any formatting."""
+        if not self.logger.isEnabledFor(level):
+            return
+        if sample is not None and random.random() >= sample:
+            return
+
+        fields = {k: kwargs.pop(k) for k in list(kwargs) if k not in _LOGGING_KWARGS}
+        session_id = current_session_id.get()
+        if session_id:
+            fields.setdefault('session_id', session_id)
+        phase = current_phase.get()
+        if phase:
+            fields.setdefault('phase', phase)
+        if sample is not None:
+            fields['sample_rate'] = sample
+
+        exc_info = kwargs.get('exc_info')
+        if exc_info and not isinstance(exc_info, tuple):
+            exc_info = sys.exc_info()
+
+        # Build the record directly: no caller lookup (stack walk) on the loop thread
+        record = self.logger.makeRecord(
+            self.logger.name, level, '', 0, msg, args, exc_info,
+            extra={**kwargs.get('extra', {}), 'fields': fields},
+        )
+        self.logger.handle(record)
+
+    def debug(self, msg: Any, *args, **kwargs):
+        """Log at DEBUG."""
+        self.log(logging.DEBUG, msg, *args, **kwargs)
+
+    def info(self, msg: Any, *args, **kwargs):
+        """Log at INFO."""
+        self.log(logging.INFO, msg, *args, **kwargs)
+
+    def warning(self, msg: Any, *args, **kwargs):
+        """Log at WARNING."""
+        self.log(logging.WARNING, msg, *args, **kwargs)
+
+    def error(self, msg: Any, *args, **kwargs):
+        """Log at ERROR."""
+        self.log(logging.ERROR, msg, *args, **kwargs)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    """Return a structured logger under the ``gisa`` hierarchy.
+
+    Module names (``src.services.deepgram``) map to ``gisa.services.deepgram``
+    so levels can be set per module.
+    """
+    if name.startswith('src.'):
+        name = name[len('src.'):]
+    return StructuredLogger(logging.getLogger(f'{ROOT_LOGGER}.{name}'), {})
+
+
+class TextFormatter(logging.Formatter):
+    """``time level logger message key=value ...`` lines."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format a record with its fields."""
+        fields = getattr(record, 'fields', {})
+        parts = [
+            time.strftime('%H:%M:%S', time.localtime(record.created)) + f'.{int(record.msecs):03d}',
+            f'{record.levelname:<7}',
+            record.name[len(ROOT_LOGGER) + 1:] or record.name,
+            record.getMessage(),
+        ]
+        parts.extend(f'{key}={value}' for key, value in fields.items())
+        line = ' '.join(parts)
+        if record.exc_info:
+            line += '\n' + self.formatException(record.exc_info)
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format a record as JSON."""
+        entry: Dict[str, Any] = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            **getattr(record, 'fields', {}),
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _LoopSafeQueueHandler(QueueHandler):
+    """Queue handler that leaves all formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Enqueue the record as-is (same process, no pickling needed)."""
+        return record
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """Parse ``agent=DEBUG,services.deepgram=WARNING`` into logger levels."""
+    levels = {}
+    for item in spec.split(','):
+        if '=' in item:
+            module, level = item.split('=', 1)
+            levels[f'{ROOT_LOGGER}.{module.strip()}'] = level.strip().upper()
+    return levels
+
+
+def setup_logging(level: str = 'INFO', module_levels: str = '', fmt: str = 'text'):
+    """Route ``gisa`` logs through a queue to a background stdout writer."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter())
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(level.upper())
+    root.handlers = [_LoopSafeQueueHandler(log_queue)]
+    root.propagate = False
+
+    for name, module_level in parse_levels(module_levels).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    # Thread and process names are never printed; skip collecting them per record
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,246 @@
+"""Event-loop lag monitor and blocking-call detector.
+
+A sampler task measures how late the loop wakes it up (loop lag) into a
+histogram. A watchdog thread watches the sampler's heartbeat; when the loop
+has been stuck longer than the threshold, it captures the loop thread's
+stack (for a sampled fraction of stalls) so the blocking call can be found
+without attaching a profiler.
+"""
+import asyncio
+import random
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Dict, List, Optional, Tuple
+
+# Upper bounds (ms) of the lag histogram buckets
+LAG_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Frames kept per captured stack, and frames that identify an offender
+STACK_DEPTH = 15
+SIGNATURE_DEPTH = 3
+
+
+class LagHistogram:
+    """Fixed-bucket histogram of loop lag."""
+
+    def __init__(self):
+        """Initialize histogram."""
+        self.counts = [0] * (len(LAG_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, lag_ms: float):
+        """Record one lag sample."""
+        index = 0
+        while index < len(LAG_BUCKETS_MS) and lag_ms > LAG_BUCKETS_MS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ms += lag_ms
+        self.max_ms = max(self.max_ms, lag_ms)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given percentile."""
+        if not self.count:
+            return None
+        rank = pct / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return LAG_BUCKETS_MS[index] if index < len(LAG_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return histogram state."""
+        labels = [f'<={b}ms' for b in LAG_BUCKETS_MS] + [f'>{LAG_BUCKETS_MS[-1]}ms']
+        return {
+            'samples': self.count,
+            'mean_ms': round(self.total_ms / self.count, 2) if self.count else None,
+            'p50_ms': self.percentile(50),
+            'p99_ms': self.percentile(99),
+            'max_ms': round(self.max_ms, 1),
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class Offender:
+    """A stack seen blocking the loop, with how long it blocked."""
+
+    def __init__(self, stack: List[str]):
+        """Initialize offender."""
+        self.stack = stack
+        self.stalls = 0
+        self.blocked_ms = 0.0
+        self.max_ms = 0.0
+        self.last_seen = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return offender state."""
+        return {
+            'stalls': self.stalls,
+            'blocked_ms': round(self.blocked_ms, 1),
+            'max_ms': round(self.max_ms, 1),
+            'last_seen': self.last_seen,
+            'stack': self.stack,
+        }
+
+
+def _loop_stack(frame) -> List[traceback.FrameSummary]:
+    """Stack of the loop thread without the asyncio/uvicorn plumbing below the callback."""
+    stack = traceback.extract_stack(frame)
+    start = 0
+    for index, entry in enumerate(stack):
+        if '/asyncio/' in entry.filename.replace('\\', '/') or '/uvicorn/' in entry.filename:
+            start = index + 1
+    return stack[start:] or stack
+
+
+class LoopMonitor:
+    """Samples loop lag and captures the stacks of blocking callbacks."""
+
+    def __init__(
+        self,
+        interval_s: float = 0.05,
+        threshold_ms: float = 100.0,
+        sample_rate: float = 0.25,
+        max_offenders: int = 50,
+    ):
+        """Initialize monitor."""
+        self.interval_s = interval_s
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.max_offenders = max_offenders
+
+        self.histogram = LagHistogram()
+        self.offenders: Dict[Tuple, Offender] = {}
+        self.stalls = 0
+        self.captured = 0
+
+        self.heartbeat = time.monotonic()
+        self.loop_thread_id: Optional[int] = None
+        # Offender captured during the current stall, credited once it ends
+        self.pending: Optional[Offender] = None
+        self.in_stall = False
+
+        self.task: Optional[asyncio.Task] = None
+        self.watchdog: Optional[threading.Thread] = None
+        self.stopped = threading.Event()
+
+    def start(self):
+        """Start the sampler task and the watchdog thread (needs a running loop)."""
+        if self.task is not None:
+            return
+        self.loop_thread_id = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self.stopped.clear()
+        self.task = asyncio.create_task(self._sample())
+        self.watchdog = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self.watchdog.start()
+
+    async def stop(self):
+        """Stop sampling."""
+        self.stopped.set()
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _sample(self):
+        """Measure how late the loop resumes a fixed sleep."""
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval_s)
+            now = time.monotonic()
+            self.heartbeat = now
+
+            lag_ms = max(0.0, (now - started - self.interval_s) * 1000)
+            self.histogram.record(lag_ms)
+
+            if self.in_stall:
+                self.in_stall = False
+                if self.pending:
+                    self.pending.blocked_ms += lag_ms
+                    self.pending.max_ms = max(self.pending.max_ms, lag_ms)
+                    self.pending = None
+
+    def _watch(self):
+        """Watchdog thread: detect stalls and capture the loop's stack."""
+        poll_s = self.threshold_ms / 2000
+        while not self.stopped.wait(poll_s):
+            stalled_ms = (time.monotonic() - self.heartbeat) * 1000 - self.interval_s * 1000
+            if stalled_ms < self.threshold_ms or self.in_stall:
+                continue
+
+            # One decision per stall; the sampler clears the flag when the loop resumes
+            self.in_stall = True
+            self.stalls += 1
+            if random.random() < self.sample_rate:
+                self._capture()
+
+    def _capture(self):
+        """Record the stack the loop thread is currently stuck in."""
+        frame = sys._current_frames().get(self.loop_thread_id)
+        if frame is None:
+            return
+
+        stack = _loop_stack(frame)
+        signature = tuple((f.filename, f.lineno) for f in stack[-SIGNATURE_DEPTH:])
+
+        offender = self.offenders.get(signature)
+        if offender is None:
+            if len(self.offenders) >= self.max_offenders:
+                least = min(self.offenders, key=lambda k: self.offenders[k].blocked_ms)
+                del self.offenders[least]
+            offender = Offender([
+                f'{f.filename}:{f.lineno} in {f.name}: {f.line}' for f in stack[-STACK_DEPTH:]
+            ])
+            self.offenders[signature] = offender
+
+        offender.stalls += 1
+        offender.last_seen = time.time()
+        self.pending = offender
+        self.captured += 1
+
+    def report(self, limit: int = 10) -> Dict[str, Any]:
+        """Return lag stats and the worst offenders by blocked time."""
+        # The watchdog thread may add offenders meanwhile, so copy first
+        worst = sorted(list(self.offenders.values()), key=lambda o: o.blocked_ms, reverse=True)
+        return {
+            'lag': self.histogram.snapshot(),
+            'threshold_ms': self.threshold_ms,
+            'stalls': self.stalls,
+            'captured': self.captured,
+            'offenders': [o.snapshot() for o in worst[:limit]],
+        }
+
+
+_monitor: Optional[LoopMonitor] = None
+
+
+def get_monitor() -> Optional[LoopMonitor]:
+    """Return the process-wide loop monitor, if started."""
+    return _monitor
+
+
+def start_monitor(**kwargs) -> LoopMonitor:
+    """Start the process-wide loop monitor."""
+    global _monitor
+    if _monitor is None:
+        _monitor = LoopMonitor(**kwargs)
+        _monitor.start()
+    return _monitor
+
+
+async def stop_monitor():
+    """Stop the process-wide loop monitor."""
+    global _monitor
+    if _monitor:
+        await _monitor.stop()
+        _monitor = None
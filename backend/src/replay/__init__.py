@@ -0,0 +1 @@
+"""Session replay module."""
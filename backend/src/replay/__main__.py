@@ -0,0 +1,87 @@
+"""Replay recorded sessions and diff per-turn latency against a baseline.
+
+Usage (from ``backend/``)::
+
+    python -m src.replay --archive data/archive --date 2026-10-19 --out run.json
+    python -m src.replay --timeline calls.json --speed 0 --baseline run.json
+"""
+import argparse
+import asyncio
+import json
+from ..config import settings
+from .engine import ReplayEngine, diff_reports, load_archive_timelines, load_file_timelines
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Replay GISA sessions through VoiceAgent')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--archive', default=settings.archive_dir, help='Session archive directory')
+    source.add_argument('--timeline', help='JSON file with transcript timelines')
+    parser.add_argument('--session', action='append', help='Session id to replay (repeatable)')
+    parser.add_argument('--date', help='Replay every session recorded on a date (YYYY-MM-DD)')
+    parser.add_argument('--providers', choices=['stub', 'real'], default='stub')
+    parser.add_argument('--mode', choices=['transcript', 'audio'], default='transcript')
+    parser.add_argument('--speed', type=float, default=0.0, help='Timing speed-up; 0 = no waiting')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--llm-latency-ms', type=float, default=0.0, help='Stub LLM latency')
+    parser.add_argument('--tts-latency-ms', type=float, default=0.0, help='Stub TTS latency')
+    parser.add_argument('--out', help='Write the run report to this file')
+    parser.add_argument('--baseline', help='Baseline run report to diff against')
+    return parser.parse_args()
+
+
+async def main():
+    """Run the replay."""
+    args = parse_args()
+
+    if args.timeline:
+        timelines = load_file_timelines(args.timeline)
+    else:
+        timelines = load_archive_timelines(
+            args.archive, args.session, args.date, with_audio=args.mode == 'audio'
+        )
+
+    if not timelines:
+        print('⚠️ No sessions to replay')
+        return
+
+    engine = ReplayEngine(
+        providers=args.providers,
+        mode=args.mode,
+        speed=args.speed,
+        concurrency=args.concurrency,
+        llm_latency_ms=args.llm_latency_ms,
+        tts_latency_ms=args.tts_latency_ms,
+    )
+    report = await engine.run(timelines)
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"🔁 Replayed {report['summary']['turns']} turns from "
+          f"{report['summary']['sessions']} sessions in {report['wall_s']}s")
+    print(json.dumps(report['summary'], indent=2))
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+        diff = diff_reports(report, baseline)
+        print('')
+        print(f"{'session':<24} {'turn':>4} {'phase':<7} {'reply_queued_ms':>15} {'delta':>9}")
+        for turn in diff['turns']:
+            delta = turn.get('reply_queued_ms_delta')
+            print(
+                f"{turn['session_id']:<24} {turn['turn']:>4} {turn['phase']:<7} "
+                f"{turn.get('reply_queued_ms', '-'):>15} "
+                f"{'-' if delta is None else f'{delta:+.2f}':>9}"
+                + ('  (timed out)' if turn.get('timed_out') else '')
+                + ('  (reply changed)' if turn['reply_changed'] else '')
+            )
+        print(json.dumps(diff['summary'], indent=2))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,323 @@
+"""Replay recorded sessions through VoiceAgent and compare per-turn latency."""
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+from ..storage.session_archive import SessionArchive
+from .stubs import StubSTTService, StubLLMService, StubTTSService
+
+# Audio is fed to the STT in 100 ms chunks (16 kHz, 16-bit mono)
+AUDIO_CHUNK_BYTES = 3200
+
+# How long to wait for a reply when turns go through real providers
+REAL_TURN_TIMEOUT_S = 30.0
+
+# How long to wait for a reply from stub providers (covers endpointing deferrals)
+STUB_TURN_TIMEOUT_S = 10.0
+
+# Longest wait for the first paced audio frame of a reply
+FIRST_FRAME_TIMEOUT_S = 1.0
+
+
+class Turn(NamedTuple):
+    """One caller utterance in a recorded session."""
+    offset_s: float
+    transcript: str
+    reply: Optional[str] = None
+    audio: Optional[bytes] = None
+
+
+class SessionTimeline(NamedTuple):
+    """Caller turns of one session with their original timing."""
+    session_id: str
+    turns: List[Turn]
+
+
+def load_archive_timelines(
+    root: str,
+    session_ids: Optional[List[str]] = None,
+    date: Optional[str] = None,
+    with_audio: bool = False,
+) -> List[SessionTimeline]:
+    """Load session timelines from the session archive."""
+    archive = SessionArchive(root)
+    archive._load_index()
+
+    if session_ids is None:
+        session_ids = archive.sessions_by_date(date) if date else list(archive.by_session)
+
+    timelines = []
+    for session_id in session_ids:
+        records = archive.read_session(session_id)
+        if not records:
+            continue
+
+        start = records[0]['ts']
+        turns: List[Turn] = []
+        for record in records:
+            role = record.get('role')
+            if record['type'] == 'message' and role == 'user':
+                turns.append(Turn(record['ts'] - start, record['content']))
+            elif record['type'] == 'message' and role == 'assistant' and turns:
+                if turns[-1].reply is None:
+                    turns[-1] = turns[-1]._replace(reply=record['content'])
+            elif record['type'] == 'audio' and record['direction'] == 'in' and turns and with_audio:
+                turns[-1] = turns[-1]._replace(audio=archive.read_audio(record))
+
+        if turns:
+            timelines.append(SessionTimeline(session_id, turns))
+
+    return timelines
+
+
+def load_file_timelines(path: str) -> List[SessionTimeline]:
+    """Load transcript timelines from a JSON file.
+
+    Format: ``[{"session_id": ..., "turns": [{"offset": s, "transcript": ..., "reply": ...}]}]``
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+
+    return [
+        SessionTimeline(
+            item['session_id'],
+            [
+                Turn(turn.get('offset', 0.0), turn['transcript'], turn.get('reply'))
+                for turn in item['turns']
+            ],
+        )
+        for item in data
+    ]
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    """Return a percentile of a list of values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class ReplayEngine:
+    """Feeds recorded timelines through the full VoiceAgent pipeline."""
+
+    def __init__(
+        self,
+        providers: str = 'stub',
+        mode: str = 'transcript',
+        speed: float = 0.0,
+        concurrency: int = 4,
+        llm_latency_ms: float = 0.0,
+        tts_latency_ms: float = 0.0,
+    ):
+        """Initialize engine.
+
+        ``speed`` scales the original timing (2.0 = twice as fast); 0 replays
+        each turn as soon as the previous reply is done.
+        """
+        self.providers = providers
+        self.mode = mode
+        self.speed = speed
+        self.concurrency = concurrency
+        self.llm_latency_ms = llm_latency_ms
+        self.tts_latency_ms = tts_latency_ms
+
+    async def run(self, timelines: List[SessionTimeline]) -> Dict[str, Any]:
+        """Replay all timelines with bounded concurrency and return a report."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(timeline: SessionTimeline):
+            async with semaphore:
+                return await self.replay_session(timeline)
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*[bounded(t) for t in timelines])
+
+        sessions = {timeline.session_id: result for timeline, result in zip(timelines, results)}
+        return {
+            'providers': self.providers,
+            'mode': self.mode,
+            'speed': self.speed,
+            'wall_s': round(time.perf_counter() - started, 3),
+            'sessions': sessions,
+            'summary': summarize(sessions),
+        }
+
+    def _build_agent(self, timeline: SessionTimeline):
+        """Create a VoiceAgent wired to stub or real providers."""
+        from ..agent.voice_agent import VoiceAgent
+
+        replay_id = f'replay-{timeline.session_id}'
+        if self.providers != 'stub':
+            return VoiceAgent(replay_id), None
+
+        replies: Dict[str, List[str]] = {}
+        for turn in timeline.turns:
+            if turn.reply is not None:
+                replies.setdefault(turn.transcript, []).append(turn.reply)
+
+        stt = StubSTTService()
+        agent = VoiceAgent(
+            replay_id,
+            stt_service=stt,
+            llm_service=StubLLMService(replies, self.llm_latency_ms),
+            tts_service=StubTTSService(self.tts_latency_ms),
+        )
+        return agent, stt
+
+    async def replay_session(self, timeline: SessionTimeline) -> Dict[str, Any]:
+        """Replay one session and measure each turn."""
+        agent, stub_stt = self._build_agent(timeline)
+
+        first_audio: List[Optional[float]] = [None]
+        replied = asyncio.Event()
+        audio_started = asyncio.Event()
+
+        async def on_audio(audio_bytes: bytes):
+            if first_audio[0] is None:
+                first_audio[0] = time.perf_counter()
+                audio_started.set()
+
+        async def on_response(response: dict):
+            replied.set()
+
+        agent.on_audio_callback = on_audio
+        agent.on_response_callback = on_response
+
+        init_started = time.perf_counter()
+        await agent.initialize()
+        init_ms = (time.perf_counter() - init_started) * 1000
+
+        turns = []
+        clock = time.monotonic()
+        try:
+            for index, turn in enumerate(timeline.turns):
+                if self.speed > 0:
+                    delay = clock + turn.offset_s / self.speed - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+
+                first_audio[0] = None
+                audio_started.clear()
+                replied.clear()
+                started = time.perf_counter()
+
+                timed_out = not await self._play_turn(agent, stub_stt, turn, replied)
+
+                # The reply is queued (on_response) before paced audio is played
+                # out, so this can be earlier than the first frame: not a full turn
+                queued = time.perf_counter()
+                if agent.output and first_audio[0] is None and not timed_out:
+                    # Paced output sends its first frame just after the reply is queued
+                    try:
+                        await asyncio.wait_for(audio_started.wait(), FIRST_FRAME_TIMEOUT_S)
+                    except asyncio.TimeoutError:
+                        pass
+                turns.append({
+                    'turn': index,
+                    'transcript': turn.transcript,
+                    'phase': agent.get_session_state().current_phase,
+                    'first_audio_ms': (
+                        round((first_audio[0] - started) * 1000, 2)
+                        if first_audio[0] is not None else None
+                    ),
+                    'reply_queued_ms': round((queued - started) * 1000, 2),
+                    # Without a reply the last message is stale
+                    'reply': (
+                        None if timed_out
+                        else agent.get_session_state().conversation_history[-1].content
+                    ),
+                    'timed_out': timed_out,
+                })
+        finally:
+            await agent.shutdown()
+
+        return {'init_ms': round(init_ms, 2), 'turns': turns}
+
+    async def _play_turn(self, agent, stub_stt, turn: Turn, replied: asyncio.Event) -> bool:
+        """Deliver one caller turn and wait until the agent has replied.
+
+        Returns False if no reply came in time: the endpointer may defer the
+        commit, and the next turn must not be fed before this one is answered.
+        """
+        if self.mode == 'audio' and turn.audio:
+            for i in range(0, len(turn.audio), AUDIO_CHUNK_BYTES):
+                await agent.process_audio(turn.audio[i:i + AUDIO_CHUNK_BYTES])
+
+        if stub_stt is not None:
+            await stub_stt.emit_final(turn.transcript)
+        elif not (self.mode == 'audio' and turn.audio):
+            # Real STT produces the transcript from audio; otherwise feed it directly
+            await agent._handle_transcript({
+                'transcript': turn.transcript,
+                'is_final': True,
+                'speech_final': True,
+                'confidence': 1.0,
+            })
+            await agent.endpointer.on_utterance_end()
+
+        timeout = STUB_TURN_TIMEOUT_S if self.providers == 'stub' else REAL_TURN_TIMEOUT_S
+        try:
+            await asyncio.wait_for(replied.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+def summarize(sessions: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate turn latencies across sessions."""
+    all_turns = [t for s in sessions.values() for t in s['turns']]
+    answered = [t for t in all_turns if not t.get('timed_out')]
+    first_audio = [t['first_audio_ms'] for t in answered if t['first_audio_ms'] is not None]
+    queued = [t['reply_queued_ms'] for t in answered]
+
+    return {
+        'sessions': len(sessions),
+        'turns': len(all_turns),
+        'timed_out': len(all_turns) - len(answered),
+        'first_audio_p50_ms': _percentile(first_audio, 50),
+        'first_audio_p95_ms': _percentile(first_audio, 95),
+        'reply_queued_p50_ms': _percentile(queued, 50),
+        'reply_queued_p95_ms': _percentile(queued, 95),
+    }
+
+
+def diff_reports(current: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Any]:
+    """Compare per-turn latency of a run against a baseline run."""
+    turns = []
+    for session_id, session in current['sessions'].items():
+        base_session = baseline['sessions'].get(session_id)
+        if not base_session:
+            continue
+
+        base_turns = {t['turn']: t for t in base_session['turns']}
+        for turn in session['turns']:
+            base = base_turns.get(turn['turn'])
+            if not base:
+                continue
+
+            entry = {'session_id': session_id, 'turn': turn['turn'], 'phase': turn['phase']}
+            if turn.get('timed_out') or base.get('timed_out'):
+                entry['timed_out'] = True
+                entry['reply_changed'] = turn['reply'] != base['reply']
+                turns.append(entry)
+                continue
+            for key in ('first_audio_ms', 'reply_queued_ms'):
+                # Baselines from before a field existed just skip it
+                if turn[key] is not None and base.get(key) is not None:
+                    entry[key] = turn[key]
+                    entry[f'{key}_delta'] = round(turn[key] - base[key], 2)
+            entry['reply_changed'] = turn['reply'] != base['reply']
+            turns.append(entry)
+
+    deltas = [t['reply_queued_ms_delta'] for t in turns if 'reply_queued_ms_delta' in t]
+    return {
+        'turns': turns,
+        'summary': {
+            'compared_turns': len(turns),
+            'reply_queued_delta_p50_ms': _percentile(deltas, 50),
+            'reply_queued_delta_p95_ms': _percentile(deltas, 95),
+            'baseline': baseline['summary'],
+            'current': current['summary'],
+        },
+    }
@@ -0,0 +1,120 @@
+"""Deterministic stand-ins for the provider services used during replay."""
+import asyncio
+import re
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional
+from ..config import settings
+from ..models import ConversationMessage, LLMResponse
+from ..services.providers import ProviderCapabilities
+from ..services.synthesis import plan_chunks, synthesize_ordered
+
+# 16 kHz, 16-bit mono: bytes of synthetic audio per character of text
+BYTES_PER_CHAR = 2 * 16000 // 15
+
+
+class StubSTTService:
+    """STT stand-in that emits the recorded transcript of each turn."""
+
+    capabilities = ProviderCapabilities(
+        streaming_input=True, streaming_output=True, audio_formats=('linear16',), max_concurrency=1,
+    )
+
+    def __init__(self):
+        """Initialize stub."""
+        self.on_transcript: Optional[Callable] = None
+        self.on_utterance_end: Optional[Callable] = None
+        self.on_speech_started: Optional[Callable] = None
+        self.on_error: Optional[Callable] = None
+        self.audio_bytes = 0
+
+    async def start_streaming(self):
+        """Pretend to open a streaming connection."""
+
+    async def send_audio(self, audio_data: bytes):
+        """Accept audio without transcribing it."""
+        self.audio_bytes += len(audio_data)
+
+    async def emit_final(self, transcript: str):
+        """Deliver a recorded utterance as one final followed by UtteranceEnd."""
+        if self.on_transcript:
+            await self.on_transcript({
+                'transcript': transcript,
+                'is_final': True,
+                'speech_final': True,
+                'confidence': 1.0,
+            })
+        if self.on_utterance_end:
+            await self.on_utterance_end()
+
+    async def close(self):
+        """Pretend to close the connection."""
+
+
+class StubLLMService:
+    """LLM stand-in that replays recorded assistant replies."""
+
+    capabilities = ProviderCapabilities()
+
+    def __init__(self, replies: Dict[str, List[str]], latency_ms: float = 0.0):
+        """Initialize stub with recorded replies keyed by user utterance."""
+        self.replies = {text: list(answers) for text, answers in replies.items()}
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    async def generate_response(
+        self,
+        conversation_history: List[ConversationMessage],
+        on_partial: Optional[Callable[[str], None]] = None,
+    ) -> LLMResponse:
+        """Return the recorded reply to the last user message."""
+        self.calls += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+        last_user = next(
+            (m.content for m in reversed(conversation_history) if m.role == 'user'), ''
+        )
+        answers = self.replies.get(last_user)
+        text = answers.pop(0) if answers else 'Posso te ajudar com algo mais?'
+        if on_partial:
+            on_partial(text)
+
+        metadata = {}
+        protocol_match = re.search(r'DEMO-[\w-]+', text)
+        if protocol_match:
+            metadata['protocol'] = protocol_match.group(0)
+
+        return LLMResponse(text=text, metadata=metadata)
+
+
+class StubTTSService:
+    """TTS stand-in that returns silence sized to the text."""
+
+    capabilities = ProviderCapabilities(
+        audio_formats=('pcm_16000',), max_concurrency=settings.tts_chunk_concurrency,
+    )
+
+    def __init__(self, latency_ms: float = 0.0):
+        """Initialize stub."""
+        self.latency_ms = latency_ms
+        self.characters = 0
+
+    async def text_to_speech(self, text: str) -> bytes:
+        """Return silent audio after the configured latency."""
+        self.characters += len(text)
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return bytes(len(text) * BYTES_PER_CHAR)
+
+    async def text_to_speech_chunks(self, text: str) -> AsyncIterator[bytes]:
+        """Chunked synthesis with the same planner as the real service."""
+        async for audio_bytes in synthesize_ordered(
+            plan_chunks(text), self.text_to_speech, settings.tts_chunk_concurrency
+        ):
+            yield audio_bytes
+
+    async def cached_phrase(self, text: str) -> bytes:
+        """Fixed phrases are served instantly, as from a warm cache."""
+        return bytes(len(text) * BYTES_PER_CHAR)
+
+    async def warm_cache(self, phrases: Iterable[str] = ()):
+        """Nothing to warm."""
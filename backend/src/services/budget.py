@@ -0,0 +1,84 @@
+"""Per-provider concurrency and rate budgets."""
+import time
+from typing import Any, Dict
+
+
+class ProviderBusyError(Exception):
+    """Raised when a provider budget cannot admit a call in time."""
+
+
+class TokenBucket:
+    """Token bucket rate limiter (``rate`` tokens/s, up to ``burst``)."""
+
+    def __init__(self, rate: float, burst: float):
+        """Initialize bucket; a rate of 0 disables limiting."""
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        """Add tokens accrued since the last update."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self) -> bool:
+        """Take one token if available."""
+        if not self.rate:
+            return True
+        self._refill()
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+    def wait_time(self) -> float:
+        """Seconds until the next token is available."""
+        if not self.rate:
+            return 0.0
+        self._refill()
+        return max(0.0, (1.0 - self.tokens) / self.rate)
+
+    def available(self) -> float:
+        """Tokens currently available."""
+        if not self.rate:
+            return float('inf')
+        self._refill()
+        return self.tokens
+
+
+class ProviderBudget:
+    """Concurrency, rate and queueing limits of one provider."""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        rate_per_s: float = 0.0,
+        burst: float = 0.0,
+        max_queue: int = 100,
+        max_wait_s: float = 2.0,
+    ):
+        """Initialize budget."""
+        self.max_concurrency = max_concurrency
+        self.bucket = TokenBucket(rate_per_s, burst or rate_per_s)
+        self.max_queue = max_queue
+        self.max_wait_s = max_wait_s
+
+        self.rejected_full = 0
+        self.rejected_deadline = 0
+
+    def snapshot(self, inflight: int, waiting: int) -> Dict[str, Any]:
+        """Return live utilization."""
+        tokens = self.bucket.available()
+        return {
+            'concurrency_used': inflight,
+            'concurrency_limit': self.max_concurrency,
+            'utilization': round(inflight / self.max_concurrency, 3) if self.max_concurrency else 0.0,
+            'rate_per_s': self.bucket.rate or None,
+            'tokens_available': round(tokens, 2) if tokens != float('inf') else None,
+            'queue_depth': waiting,
+            'queue_limit': self.max_queue,
+            'rejected_queue_full': self.rejected_full,
+            'rejected_deadline': self.rejected_deadline,
+        }
@@ -1,34 +1,142 @@
 """Deepgram STT service."""
 import asyncio
-from typing import Optional, Callable
-from deepgram import Deepgram
+import time
+from typing import Any, Dict, Optional, Callable
 from ..config import settings
+from ..observability.ledger import charge_upstream
+from ..observability.logs import get_logger
+from .budget import ProviderBudget
+from .deepgram_pool import LiveConnectionPool
+from .providers import ProviderCapabilities
+from .scheduler import UpstreamScheduler, get_scheduler
+
+log = get_logger(__name__)
+
+# Live transcription options for GISA calls
+LIVE_OPTIONS = {
+    'model': 'nova-2',
+    'language': 'pt-BR',
+    'smart_format': True,
+    'interim_results': True,
+    'punctuate': True,
+    # Connections are pre-opened, so per-turn endpointing is decided locally
+    # (agent/endpointing.py); 1000 ms is the smallest UtteranceEnd Deepgram allows
+    'utterance_end_ms': 1000,
+    'endpointing': settings.stt_endpointing_ms,
+    'vad_events': True,
+}
+
+# Shared client; the SDK is imported on first use
+_client: Optional[Any] = None
+
+_pool: Optional[LiveConnectionPool] = None
+
+
+def get_client():
+    """Return the process-wide Deepgram client, importing the SDK lazily."""
+    global _client
+    if _client is None:
+        from deepgram import Deepgram
+
+        _client = Deepgram(settings.deepgram_api_key)
+    return _client
+
+
+def warm_up():
+    """Import the SDK and create the shared client (blocking)."""
+    get_client()
+
+
+def get_stream_scheduler() -> UpstreamScheduler:
+    """Return the scheduler that budgets concurrent live streams."""
+    return get_scheduler('deepgram', ProviderBudget(
+        settings.stt_max_streams,
+        rate_per_s=settings.stt_rate_per_s,
+        max_queue=settings.stt_max_queue,
+        max_wait_s=settings.stt_queue_timeout_s,
+    ))
+
+
+async def open_live_connection():
+    """Open a live transcription connection with the GISA options."""
+    return await get_client().transcription.live(dict(LIVE_OPTIONS))
+
+
+def get_pool() -> Optional[LiveConnectionPool]:
+    """Return the warm connection pool, if started."""
+    return _pool
+
+
+def start_pool():
+    """Start the warm connection pool (needs a running loop)."""
+    global _pool
+    if _pool is None and settings.stt_pool_enabled:
+        _pool = LiveConnectionPool(
+            open_live_connection,
+            get_stream_scheduler(),
+            min_size=settings.stt_pool_min,
+            max_size=settings.stt_pool_max,
+            keepalive_s=settings.stt_pool_keepalive_s,
+            max_age_s=settings.stt_pool_max_age_s,
+        )
+        _pool.start()
+    return _pool
+
+
+async def stop_pool():
+    """Close pooled connections."""
+    global _pool
+    if _pool:
+        await _pool.stop()
+        _pool = None
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Return warm pool state for health output."""
+    return {'deepgram': _pool.stats()} if _pool else {}
 
 
 class DeepgramService:
     """Deepgram Speech-to-Text service."""
 
+    capabilities = ProviderCapabilities(
+        streaming_input=True,
+        streaming_output=True,
+        audio_formats=('linear16',),
+        max_concurrency=1,
+    )
+
     def __init__(self):
         """Initialize Deepgram client."""
-        self.client = Deepgram(settings.deepgram_api_key)
+        self.client = get_client()
         self.connection: Optional[any] = None
         self.on_transcript: Optional[Callable] = None
+        self.on_utterance_end: Optional[Callable] = None
+        self.on_speech_started: Optional[Callable] = None
         self.on_error: Optional[Callable] = None
 
+        # Each live connection holds one stream slot until close()
+        self.scheduler = get_stream_scheduler()
+        self.holds_stream = False
+
     async def start_streaming(self):
         """Start streaming transcription."""
+        started = time.perf_counter()
+        pool = get_pool()
+
+        # A warm connection comes with its stream slot already held
+        self.connection = pool.take() if pool else None
+        pooled = self.connection is not None
+        if not pooled:
+            await self.scheduler.acquire()
+        self.holds_stream = True
+
         try:
-            options = {
-                'model': 'nova-2',
-                'language': 'pt-BR',
-                'smart_format': True,
-                'interim_results': True,
-                'punctuate': True,
-                'utterance_end_ms': 1000,
-                'vad_events': True,
-            }
-
-            self.connection = await self.client.transcription.live(options)
+            if not pooled:
+                self.connection = await self.client.transcription.live(dict(LIVE_OPTIONS))
+
+            if pool:
+                pool.record_start(pooled, (time.perf_counter() - started) * 1000)
 
             # Set up event handlers
             self.connection.on('open', self._on_open)
@@ -36,25 +144,44 @@ class DeepgramService:
             self.connection.on('error', self._on_error)
             self.connection.on('close', self._on_close)
 
-            print('✅ Deepgram connection opened')
+            duration_ms = (time.perf_counter() - started) * 1000
+            charge_upstream('deepgram', duration_ms)
+            log.info(
+                'deepgram connection ready', stage='stt', pooled=pooled,
+                duration_ms=round(duration_ms, 1),
+            )
 
         except Exception as e:
-            print(f'❌ Failed to start Deepgram streaming: {e}')
+            log.error('failed to start deepgram streaming', stage='stt', error=str(e))
+            self._release_stream()
             raise
 
     def _on_open(self):
         """Handle connection open."""
-        print('🔊 Deepgram ready to receive audio')
+        log.debug('deepgram ready to receive audio', stage='stt')
 
     def _on_transcript_received(self, data):
-        """Handle transcript received."""
+        """Handle transcript received (also carries UtteranceEnd and SpeechStarted)."""
         try:
+            message_type = data.get('type', 'Results')
+            if message_type == 'UtteranceEnd':
+                if self.on_utterance_end:
+                    asyncio.create_task(self.on_utterance_end())
+                return
+            if message_type == 'SpeechStarted':
+                if self.on_speech_started:
+                    asyncio.create_task(self.on_speech_started())
+                return
+            if message_type != 'Results':
+                return
+
             transcript = data['channel']['alternatives'][0]['transcript']
 
             if transcript and transcript.strip():
                 result = {
                     'transcript': transcript,
                     'is_final': data.get('is_final', False),
+                    'speech_final': data.get('speech_final', False),
                     'confidence': data['channel']['alternatives'][0].get('confidence'),
                 }
 
@@ -62,17 +189,17 @@ class DeepgramService:
                     asyncio.create_task(self.on_transcript(result))
 
         except Exception as e:
-            print(f'❌ Error processing transcript: {e}')
+            log.error('error processing transcript', stage='stt', error=str(e))
 
     def _on_error(self, error):
         """Handle error."""
-        print(f'❌ Deepgram error: {error}')
+        log.error('deepgram error', stage='stt', error=str(error))
         if self.on_error:
             asyncio.create_task(self.on_error(error))
 
     def _on_close(self):
         """Handle connection close."""
-        print('🔌 Deepgram connection closed')
+        log.debug('deepgram connection closed', stage='stt')
 
     async def send_audio(self, audio_data: bytes):
         """Send audio data to Deepgram."""
@@ -81,6 +208,15 @@ class DeepgramService:
 
     async def close(self):
         """Close connection."""
-        if self.connection:
-            await self.connection.finish()
-            self.connection = None
+        try:
+            if self.connection:
+                await self.connection.finish()
+                self.connection = None
+        finally:
+            self._release_stream()
+
+    def _release_stream(self):
+        """Give the stream slot back to the budget."""
+        if self.holds_stream:
+            self.holds_stream = False
+            self.scheduler.release()
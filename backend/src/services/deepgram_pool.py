@@ -0,0 +1,241 @@
+"""Warm pool of pre-opened, keep-alived Deepgram live connections.
+
+Opening a live connection costs a TLS handshake and connection setup, paid
+inside ``/api/session/start``. The pool keeps a few connections open with
+the GISA options so a new session grabs one immediately. Idle connections
+are kept alive, recycled once stale, and refilled in the background to a
+size that follows the session arrival rate.
+"""
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+from ..observability.logs import get_logger
+from .resilience import LatencyTracker
+from .scheduler import UpstreamScheduler
+
+log = get_logger(__name__)
+
+# Deepgram closes live connections that receive no data for ~10s
+KEEPALIVE_MESSAGE = json.dumps({'type': 'KeepAlive'})
+
+# Session arrivals used for the rate estimate
+ARRIVAL_WINDOW_S = 60.0
+
+
+class PooledConnection:
+    """An idle live connection waiting for a session."""
+
+    def __init__(self, connection: Any):
+        """Initialize entry."""
+        self.connection = connection
+        self.opened_at = time.monotonic()
+        self.last_keepalive = self.opened_at
+        self.closed = False
+
+    def mark_closed(self):
+        """Close handler: the server dropped the connection."""
+        self.closed = True
+
+
+class LiveConnectionPool:
+    """Pre-opened live connections, each holding one stream slot."""
+
+    def __init__(
+        self,
+        open_connection: Callable[[], Awaitable[Any]],
+        scheduler: UpstreamScheduler,
+        min_size: int = 2,
+        max_size: int = 10,
+        keepalive_s: float = 5.0,
+        max_age_s: float = 300.0,
+        tick_s: float = 1.0,
+    ):
+        """Initialize pool."""
+        self.open_connection = open_connection
+        self.scheduler = scheduler
+        self.min_size = min_size
+        self.max_size = max_size
+        self.keepalive_s = keepalive_s
+        self.max_age_s = max_age_s
+        self.tick_s = tick_s
+
+        self.idle: Deque[PooledConnection] = deque()
+        self.opening = 0
+        self.arrivals: Deque[float] = deque()
+        self.created_at = time.monotonic()
+        self.task: Optional[asyncio.Task] = None
+        self.refill_event = asyncio.Event()
+
+        self.hits = 0
+        self.misses = 0
+        self.opened = 0
+        self.recycled = 0
+        self.open_failures = 0
+        self.open_latency = LatencyTracker()
+        # Session start (time to a usable connection), pooled vs cold
+        self.start_hit = LatencyTracker()
+        self.start_cold = LatencyTracker()
+
+    def start(self):
+        """Start the background maintenance loop."""
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop maintenance and close idle connections."""
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+        while self.idle:
+            await self._discard(self.idle.popleft())
+
+    def take(self) -> Optional[Any]:
+        """Hand an open connection (and its stream slot) to a session."""
+        now = time.monotonic()
+        self.arrivals.append(now)
+
+        while self.idle:
+            entry = self.idle.popleft()
+            if entry.closed or now - entry.opened_at > self.max_age_s:
+                asyncio.create_task(self._discard(entry))
+                self.recycled += 1
+                continue
+            self.hits += 1
+            self.refill_event.set()
+            return entry.connection
+
+        self.misses += 1
+        self.refill_event.set()
+        return None
+
+    def record_start(self, pooled: bool, elapsed_ms: float):
+        """Record how long a session waited for its connection."""
+        (self.start_hit if pooled else self.start_cold).record(elapsed_ms)
+
+    def arrival_rate(self) -> float:
+        """Sessions per second over the recent window."""
+        now = time.monotonic()
+        while self.arrivals and self.arrivals[0] < now - ARRIVAL_WINDOW_S:
+            self.arrivals.popleft()
+        # Until a full window has passed, average over the pool's lifetime
+        span = max(self.tick_s, min(ARRIVAL_WINDOW_S, now - self.created_at))
+        return len(self.arrivals) / span
+
+    def target_size(self) -> int:
+        """Connections needed to cover arrivals while replacements open.
+
+        Little's law: sessions arriving during one open (plus one tick of
+        maintenance delay) would otherwise find the pool empty.
+        """
+        open_ms = self.open_latency.percentile(95)
+        if open_ms is None:
+            open_ms = 1000.0
+        needed = math.ceil(self.arrival_rate() * (open_ms / 1000 + self.tick_s))
+        return min(self.max_size, max(self.min_size, needed))
+
+    async def _run(self):
+        """Keep alive, recycle and refill until stopped."""
+        while True:
+            try:
+                await self._maintain()
+            except Exception as e:
+                log.warning('deepgram pool maintenance failed', stage='stt', error=str(e))
+
+            self.refill_event.clear()
+            try:
+                await asyncio.wait_for(self.refill_event.wait(), self.tick_s)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _maintain(self):
+        """One maintenance pass."""
+        now = time.monotonic()
+
+        # Recycle dropped and stale connections
+        for entry in list(self.idle):
+            if entry.closed or now - entry.opened_at > self.max_age_s:
+                self.idle.remove(entry)
+                self.recycled += 1
+                await self._discard(entry)
+
+        # Keep the rest alive
+        for entry in self.idle:
+            if now - entry.last_keepalive >= self.keepalive_s:
+                try:
+                    await entry.connection.send(KEEPALIVE_MESSAGE)
+                    entry.last_keepalive = now
+                except Exception:
+                    entry.closed = True
+
+        target = self.target_size()
+
+        # Idle connections hold stream slots: give them up to queued sessions
+        while self.idle and (len(self.idle) > target or self.scheduler.has_waiters()):
+            await self._discard(self.idle.pop())
+
+        missing = target - len(self.idle) - self.opening
+        if missing > 0:
+            await asyncio.gather(*[self._open_one() for _ in range(missing)])
+
+    async def _open_one(self):
+        """Open one connection if a stream slot is free."""
+        if not self.scheduler.try_acquire():
+            return
+
+        self.opening += 1
+        started = time.perf_counter()
+        try:
+            connection = await self.open_connection()
+        except Exception as e:
+            self.open_failures += 1
+            self.scheduler.release()
+            log.warning('deepgram pool could not open a connection', stage='stt', error=str(e))
+            return
+        finally:
+            self.opening -= 1
+
+        self.open_latency.record((time.perf_counter() - started) * 1000)
+        self.opened += 1
+
+        entry = PooledConnection(connection)
+        connection.on('close', entry.mark_closed)
+        self.idle.append(entry)
+
+    async def _discard(self, entry: PooledConnection):
+        """Close an idle connection and free its stream slot."""
+        try:
+            if not entry.closed:
+                await entry.connection.finish()
+        except Exception as e:
+            log.warning('error closing pooled deepgram connection', stage='stt', error=str(e))
+        finally:
+            self.scheduler.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool state for health output."""
+        def ms(tracker: LatencyTracker, pct: float):
+            value = tracker.percentile(pct)
+            return round(value, 1) if value is not None else None
+
+        return {
+            'idle': len(self.idle),
+            'opening': self.opening,
+            'target': self.target_size(),
+            'arrival_rate_per_s': round(self.arrival_rate(), 3),
+            'hits': self.hits,
+            'misses': self.misses,
+            'opened': self.opened,
+            'recycled': self.recycled,
+            'open_failures': self.open_failures,
+            'open_p95_ms': ms(self.open_latency, 95),
+            'start_pooled_p50_ms': ms(self.start_hit, 50),
+            'start_cold_p50_ms': ms(self.start_cold, 50),
+        }
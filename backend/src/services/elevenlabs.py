@@ -1,52 +1,175 @@
 """ElevenLabs TTS service."""
-from elevenlabs import generate, stream, Voice, VoiceSettings
+import asyncio
+import time
+from typing import AsyncIterator, Dict, Iterable
 from ..config import settings
+from ..context import current_ledger
+from ..observability.ledger import charge, charge_upstream
+from ..observability.logs import get_logger
+from ..agent.gisa_prompt import GISA_HOLD_MESSAGE
+from .resilience import get_policy
+from .budget import ProviderBudget, ProviderBusyError
+from .scheduler import get_scheduler
+from .providers import ProviderCapabilities
+from .synthesis import normalize_for_speech, plan_chunks, synthesize_ordered
+
+log = get_logger(__name__)
+
+# Audio for fixed phrases, shared by every session
+_phrase_cache: Dict[str, bytes] = {}
+
+# Phrases being synthesized, so concurrent callers share one request
+_phrase_pending: Dict[str, asyncio.Future] = {}
+
+
+def warm_up():
+    """Import the SDK ahead of the first synthesis (blocking)."""
+    import elevenlabs  # noqa: F401
 
 
 class ElevenLabsService:
     """ElevenLabs Text-to-Speech service."""
 
+    capabilities = ProviderCapabilities(
+        streaming_output=True,
+        audio_formats=(settings.elevenlabs_output_format,),
+        max_concurrency=settings.tts_chunk_concurrency,
+    )
+
     def __init__(self):
         """Initialize ElevenLabs client."""
         self.api_key = settings.elevenlabs_api_key
         self.voice_id = settings.elevenlabs_voice_id
+        self.policy = get_policy(
+            'elevenlabs',
+            timeout_s=settings.tts_timeout_s,
+            latency_slo_ms=settings.tts_latency_slo_ms,
+        )
+        self.scheduler = get_scheduler('elevenlabs', ProviderBudget(
+            settings.tts_max_inflight,
+            rate_per_s=settings.tts_rate_per_s,
+            burst=settings.tts_burst,
+            max_queue=settings.tts_max_queue,
+            max_wait_s=settings.tts_queue_timeout_s,
+        ))
 
     async def text_to_speech(self, text: str) -> bytes:
-        """Convert text to speech."""
+        """Convert text to speech.
+
+        Failures (open breaker, deadline, over budget) are raised: audio must
+        never stand in for the requested text, or a chunked reply could get
+        the hold message spliced into it. VoiceAgent decides what to play.
+        """
         try:
-            print(f'🔊 Generating speech for: {text[:50]}...')
+            started = time.perf_counter()
 
-            # Generate audio
-            audio = generate(
-                text=text,
-                voice=Voice(
-                    voice_id=self.voice_id,
-                    settings=VoiceSettings(
-                        stability=0.5,
-                        similarity_boost=0.75,
-                        style=0.5,
-                        use_speaker_boost=True,
-                    )
-                ),
-                model='eleven_turbo_v2_5',  # Fastest model for real-time
-                api_key=self.api_key,
+            # The SDK call is blocking: run it off the event loop, in budget per attempt
+            audio_bytes = await self.policy.call(
+                lambda: self.scheduler.run_in_thread(self._generate, text)
             )
 
-            # Convert generator to bytes
-            audio_bytes = b''.join(audio)
-
-            print(f'✅ Generated audio: {len(audio_bytes)} bytes')
+            duration_ms = (time.perf_counter() - started) * 1000
+            charge('tts_characters', len(text))
+            charge_upstream('elevenlabs', duration_ms)
+            log.info(
+                'speech generated', stage='tts', characters=len(text), bytes=len(audio_bytes),
+                duration_ms=round(duration_ms, 1),
+            )
             return audio_bytes
 
+        except ProviderBusyError as e:
+            log.warning('elevenlabs over budget', stage='tts', error=str(e))
+            raise
+
         except Exception as e:
-            print(f'❌ ElevenLabs error: {e}')
+            log.error('elevenlabs error', stage='tts', error=str(e))
             raise
 
+    async def text_to_speech_chunks(self, text: str) -> AsyncIterator[bytes]:
+        """Synthesize a long reply in parallel chunks, yielding audio in order."""
+        chunks = plan_chunks(text)
+        log.info('synthesizing chunks', stage='tts', chunks=len(chunks), characters=len(text))
+
+        async for audio_bytes in synthesize_ordered(
+            chunks, self.text_to_speech, settings.tts_chunk_concurrency
+        ):
+            yield audio_bytes
+
+    async def cached_phrase(self, text: str) -> bytes:
+        """Return audio for a fixed phrase, synthesizing it once per process."""
+        audio_bytes = _phrase_cache.get(text)
+        if audio_bytes is not None:
+            charge('tts_cache_hits', 1)
+            return audio_bytes
+
+        pending = _phrase_pending.get(text)
+        if pending is None:
+            pending = asyncio.ensure_future(self._synthesize_phrase(text))
+            _phrase_pending[text] = pending
+            pending.add_done_callback(lambda _: _phrase_pending.pop(text, None))
+        else:
+            charge('tts_cache_hits', 1)
+
+        # A cancelled caller (barge-in) must not cancel the others' synthesis
+        return await asyncio.shield(pending)
+
+    async def _synthesize_phrase(self, text: str) -> bytes:
+        """Synthesize a fixed phrase and store it in the process cache."""
+        started = time.perf_counter()
+        audio_bytes = await self.policy.call(
+            lambda: self.scheduler.run_in_thread(self._generate, text)
+        )
+        _phrase_cache[text] = audio_bytes
+        charge('tts_characters', len(text))
+        charge_upstream('elevenlabs', (time.perf_counter() - started) * 1000)
+        return audio_bytes
+
+    async def warm_cache(self, phrases: Iterable[str] = (GISA_HOLD_MESSAGE,)):
+        """Pre-synthesize fixed phrases (the hold message first)."""
+        # Shared process cache: not charged to the session that triggered it
+        token = current_ledger.set(None)
+        try:
+            for phrase in phrases:
+                if phrase in _phrase_cache:
+                    continue
+                try:
+                    await self.cached_phrase(phrase)
+                except Exception as e:
+                    log.warning('could not warm tts cache', stage='tts', error=str(e))
+                    return
+        finally:
+            current_ledger.reset(token)
+
+    def _generate(self, text: str) -> bytes:
+        """Synthesize text and collect the audio (blocking)."""
+        from elevenlabs import generate, Voice, VoiceSettings
+
+        audio = generate(
+            text=normalize_for_speech(text),
+            voice=Voice(
+                voice_id=self.voice_id,
+                settings=VoiceSettings(
+                    stability=0.5,
+                    similarity_boost=0.75,
+                    style=0.5,
+                    use_speaker_boost=True,
+                )
+            ),
+            model='eleven_turbo_v2_5',  # Fastest model for real-time
+            output_format=settings.elevenlabs_output_format,
+            api_key=self.api_key,
+        )
+
+        # Convert generator to bytes
+        return b''.join(audio)
+
     async def text_to_speech_stream(self, text: str):
         """Convert text to speech with streaming."""
+        from elevenlabs import generate, Voice, VoiceSettings
+
         try:
             audio_stream = generate(
-                text=text,
+                text=normalize_for_speech(text),
                 voice=Voice(
                     voice_id=self.voice_id,
                     settings=VoiceSettings(
@@ -57,14 +180,19 @@ class ElevenLabsService:
                     )
                 ),
                 model='eleven_turbo_v2_5',
+                output_format=settings.elevenlabs_output_format,
                 stream=True,
                 api_key=self.api_key,
             )
 
-            # Stream audio
-            for chunk in audio_stream:
+            # The SDK reads a blocking HTTP stream; pull each chunk off the loop
+            chunks = iter(audio_stream)
+            while True:
+                chunk = await asyncio.to_thread(next, chunks, None)
+                if chunk is None:
+                    break
                 yield chunk
 
         except Exception as e:
-            print(f'❌ ElevenLabs streaming error: {e}')
+            log.error('elevenlabs streaming error', stage='tts', error=str(e))
             raise
@@ -1,38 +1,123 @@
 """Google Gemini LLM service."""
-import google.generativeai as genai
-from typing import List, Dict
+import asyncio
+import time
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
 from ..config import settings
+from ..context import current_phase, current_scenario, current_slots
+from ..observability.ledger import charge, charge_upstream
+from ..observability.logs import get_logger
 from ..models import ConversationMessage, LLMResponse
 from ..agent.gisa_prompt import GISA_SYSTEM_PROMPT
+from ..agent.prompt_builder import build_prompt
+from .resilience import get_policy
+from .budget import ProviderBudget
+from .scheduler import get_scheduler
+from .providers import ProviderCapabilities
+from .response_cache import get_response_cache
+
+log = get_logger(__name__)
+
+GENERATION_CONFIG = {
+    'temperature': 0.7,
+    'top_p': 0.95,
+    'top_k': 40,
+    'max_output_tokens': 500,  # Keep responses concise for voice
+}
+
+PRIMARY_MODEL = 'gemini-2.0-flash-exp'
+
+# Rough token size, used only when the SDK reports no usage metadata
+CHARS_PER_TOKEN = 4
+
+# Shared SDK module and models; the SDK is imported on first use
+_genai: Any = None
+_models: Dict[str, Any] = {}
+
+
+def get_model(model_name: str):
+    """Return a process-wide GenerativeModel, configuring the SDK once."""
+    global _genai
+    if _genai is None:
+        import google.generativeai as genai
+
+        genai.configure(api_key=settings.google_api_key)
+        _genai = genai
+
+    model = _models.get(model_name)
+    if model is None:
+        model = _genai.GenerativeModel(
+            model_name=model_name,
+            generation_config=GENERATION_CONFIG,
+        )
+        _models[model_name] = model
+    return model
+
+
+def warm_up():
+    """Import the SDK and build the shared models (blocking)."""
+    get_model(PRIMARY_MODEL)
+    get_model(settings.llm_fallback_model)
 
 
 class GeminiService:
     """Google Gemini LLM service."""
 
-    def __init__(self):
-        """Initialize Gemini client."""
-        genai.configure(api_key=settings.google_api_key)
+    capabilities = ProviderCapabilities(streaming_output=True)
+
+    def __init__(self, model_name: Optional[str] = None):
+        """Initialize Gemini client (another model than the primary for A/B runs)."""
+        self.name = f'gemini:{model_name}' if model_name else 'gemini'
+        self.model = get_model(model_name or PRIMARY_MODEL)
+        self.fallback_model = get_model(settings.llm_fallback_model)
 
-        self.model = genai.GenerativeModel(
-            model_name='gemini-2.0-flash-exp',
-            generation_config={
-                'temperature': 0.7,
-                'top_p': 0.95,
-                'top_k': 40,
-                'max_output_tokens': 500,  # Keep responses concise for voice
-            },
+        # Latency (breaker) is tracked per model; the quota is shared
+        self.policy = get_policy(
+            self.name,
+            timeout_s=settings.llm_timeout_s,
+            latency_slo_ms=settings.llm_latency_slo_ms,
         )
+        self.cache = get_response_cache()
+        self.scheduler = get_scheduler('gemini', ProviderBudget(
+            settings.llm_max_inflight,
+            rate_per_s=settings.llm_rate_per_s,
+            burst=settings.llm_burst,
+            max_queue=settings.llm_max_queue,
+            max_wait_s=settings.llm_queue_timeout_s,
+        ))
 
     async def generate_response(
-        self, conversation_history: List[ConversationMessage]
+        self,
+        conversation_history: List[ConversationMessage],
+        on_partial: Optional[Callable[[str], None]] = None,
     ) -> LLMResponse:
-        """Generate response from conversation history."""
+        """Generate response from conversation history.
+
+        With ``on_partial``, the reply is streamed and each text chunk is passed
+        to it as it arrives.
+        """
         try:
+            # Repeated informational FASE_3 questions are answered from the cache
+            slots = current_slots.get()
+            key = self._cache_key(conversation_history, slots)
+            if key:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    charge('llm_cache_hits', 1)
+                    if on_partial:
+                        on_partial(cached)
+                    log.info('gemini cache hit', stage='llm', scenario=key[2])
+                    return LLMResponse(text=cached, metadata=self._extract_metadata(cached))
+
             # Build conversation context
             messages = []
 
-            # Add system prompt first
-            messages.append({'role': 'user', 'parts': [GISA_SYSTEM_PROMPT]})
+            # Add system prompt first, scoped to the phase and candidate scenario group
+            system_prompt = (
+                build_prompt(current_phase.get(), current_scenario.get())
+                if settings.prompt_scoping_enabled else GISA_SYSTEM_PROMPT
+            )
+            messages.append({'role': 'user', 'parts': [system_prompt]})
             messages.append({'role': 'model', 'parts': ['Entendido. Vou seguir essas diretrizes.']})
 
             # Add conversation history
@@ -43,15 +128,34 @@ class GeminiService:
                 role = 'model' if msg.role == 'assistant' else 'user'
                 messages.append({'role': role, 'parts': [msg.content]})
 
-            # Start chat with history (excluding last message)
-            chat = self.model.start_chat(history=messages[:-1])
-
-            # Send last message
+            # History excludes the last message, which is sent to the chat
+            history = messages[:-1]
             last_message = messages[-1]['parts'][0]
-            response = await asyncio.to_thread(chat.send_message, last_message)
 
-            text = response.text
-            print(f'🤖 Gemini response: {text[:100]}...')
+            # Each attempt starts its own chat so retries don't share state
+            started = time.perf_counter()
+            if on_partial:
+                attempt = partial(self._stream, self.model, history, last_message, on_partial)
+            else:
+                attempt = partial(self._send, self.model, history, last_message)
+            # Each attempt (and the fallback) takes its own upstream slot
+            text = await self.policy.call(
+                attempt,
+                fallback=lambda: asyncio.wait_for(
+                    self._send(self.fallback_model, history, last_message),
+                    settings.llm_timeout_s,
+                ),
+            )
+            duration_ms = (time.perf_counter() - started) * 1000
+            charge('llm_calls', 1)
+            charge_upstream(self.name, duration_ms)
+            if key:
+                self.cache.put(key, text, duration_ms, slots)
+            log.info(
+                'gemini response', stage='llm', characters=len(text), streamed=bool(on_partial),
+                prompt_chars=len(system_prompt),
+                duration_ms=round(duration_ms, 1),
+            )
 
             return LLMResponse(
                 text=text,
@@ -59,9 +163,64 @@ class GeminiService:
             )
 
         except Exception as e:
-            print(f'❌ Gemini error: {e}')
+            log.error('gemini error', stage='llm', error=str(e))
             raise
 
+    def _cache_key(self, conversation_history: List[ConversationMessage], slots):
+        """Reply cache key for this turn, or None if it must go to the model."""
+        if not self.cache or not conversation_history:
+            return None
+        last = conversation_history[-1]
+        if last.role != 'user':
+            return None
+        return self.cache.key(self.name, current_phase.get(), last.content, slots)
+
+    async def _send(self, model, history: List[Dict], message: str) -> str:
+        """Send one message on a fresh chat and return the reply text."""
+        chat = model.start_chat(history=history)
+        response = await self.scheduler.run_in_thread(chat.send_message, message)
+        self._charge_tokens(response, history, message, response.text)
+        return response.text
+
+    async def _stream(
+        self, model, history: List[Dict], message: str, on_partial: Callable[[str], None]
+    ) -> str:
+        """Stream one message on a fresh chat, passing each text chunk on."""
+        chat = model.start_chat(history=history)
+        async with self.scheduler.slot():
+            response = await asyncio.to_thread(chat.send_message, message, stream=True)
+
+            # The SDK iterates a blocking HTTP stream; pull each chunk off the loop
+            chunks = iter(response)
+            parts = []
+            while True:
+                chunk = await asyncio.to_thread(next, chunks, None)
+                if chunk is None:
+                    break
+                if chunk.text:
+                    parts.append(chunk.text)
+                    on_partial(chunk.text)
+
+        text = ''.join(parts)
+        self._charge_tokens(response, history, message, text)
+        return text
+
+    def _charge_tokens(self, response, history: List[Dict], message: str, text: str):
+        """Charge the tokens of one attempt."""
+        usage = getattr(response, 'usage_metadata', None)
+        input_tokens = getattr(usage, 'prompt_token_count', None)
+        output_tokens = getattr(usage, 'candidates_token_count', None)
+
+        # Estimate (~4 characters per token) when the SDK reports no usage
+        if input_tokens is None:
+            prompt_chars = sum(len(m['parts'][0]) for m in history) + len(message)
+            input_tokens = prompt_chars // CHARS_PER_TOKEN
+        if output_tokens is None:
+            output_tokens = len(text) // CHARS_PER_TOKEN
+
+        charge('llm_input_tokens', input_tokens)
+        charge('llm_output_tokens', output_tokens)
+
     def _extract_metadata(self, text: str) -> Dict:
         """Extract metadata from response."""
         metadata = {}
@@ -72,16 +231,4 @@ class GeminiService:
         if protocol_match:
             metadata['protocol'] = protocol_match.group(0)
 
-        # Detect phase
-        if 'Com quem eu falo' in text or 'FASE_1' in text:
-            metadata['phase'] = 'FASE_1'
-        elif 'Unidade Consumidora' in text or 'UC' in text:
-            metadata['phase'] = 'FASE_2'
-        else:
-            metadata['phase'] = 'FASE_3'
-
         return metadata
-
-
-# Import asyncio for async operations
-import asyncio
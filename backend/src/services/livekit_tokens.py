@@ -0,0 +1,118 @@
+"""LiveKit access token issuance with a short-TTL cache."""
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+from ..config import settings
+
+# Grants given to GISA participants: (name, value) pairs, hashable for cache keys
+DEFAULT_GRANTS: Tuple[Tuple[str, bool], ...] = (
+    ('room_join', True),
+    ('can_publish', True),
+    ('can_subscribe', True),
+    ('can_publish_data', True),
+)
+
+
+def warm_up():
+    """Import the SDK ahead of the first token request (blocking)."""
+    from livekit import api  # noqa: F401
+
+
+class TokenIssuer:
+    """Signs LiveKit JWTs and reuses them until shortly before expiry.
+
+    Reconnect storms hit the same room + participant + grants repeatedly, so
+    a cached token is returned while it still has ``reuse_margin_s`` left.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        ttl_s: int = 600,
+        reuse_margin_s: int = 120,
+        max_entries: int = 10000,
+    ):
+        """Initialize issuer."""
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.ttl_s = ttl_s
+        self.reuse_margin_s = reuse_margin_s
+        self.max_entries = max_entries
+
+        # (room, participant, grants) -> (jwt, expires_at)
+        self.cache: 'OrderedDict[Tuple, Tuple[str, float]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        # Bulk issuance runs in a worker thread alongside the event loop
+        self.lock = threading.Lock()
+
+    def issue(
+        self,
+        room_name: str,
+        participant_name: str,
+        grants: Tuple[Tuple[str, bool], ...] = DEFAULT_GRANTS,
+    ) -> str:
+        """Return a valid token, signing a new one only when needed."""
+        key = (room_name, participant_name, grants)
+        now = time.time()
+
+        with self.lock:
+            cached = self.cache.get(key)
+            if cached and cached[1] - now > self.reuse_margin_s:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+
+        jwt_token = self._sign(room_name, participant_name, grants)
+
+        with self.lock:
+            self.cache[key] = (jwt_token, now + self.ttl_s)
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.max_entries:
+                self.cache.popitem(last=False)
+
+        return jwt_token
+
+    def issue_many(
+        self,
+        requests: List[Tuple[str, str]],
+        grants: Tuple[Tuple[str, bool], ...] = DEFAULT_GRANTS,
+    ) -> List[str]:
+        """Issue tokens for many (room, participant) pairs."""
+        return [self.issue(room, participant, grants) for room, participant in requests]
+
+    def _sign(self, room_name: str, participant_name: str, grants: Tuple) -> str:
+        """Build and sign a new JWT."""
+        from livekit import api
+
+        token = api.AccessToken(self.api_key, self.api_secret)
+        token.with_identity(participant_name)
+        token.with_name(participant_name)
+        token.with_ttl(timedelta(seconds=self.ttl_s))
+        token.with_grants(api.VideoGrants(room=room_name, **dict(grants)))
+        return token.to_jwt()
+
+    def stats(self) -> Dict[str, int]:
+        """Return cache statistics."""
+        return {'entries': len(self.cache), 'hits': self.hits, 'misses': self.misses}
+
+
+_issuer: Optional[TokenIssuer] = None
+
+
+def get_issuer() -> TokenIssuer:
+    """Return the process-wide token issuer."""
+    global _issuer
+    if _issuer is None:
+        _issuer = TokenIssuer(
+            settings.livekit_api_key,
+            settings.livekit_api_secret,
+            ttl_s=settings.livekit_token_ttl_s,
+            reuse_margin_s=settings.livekit_token_reuse_margin_s,
+        )
+    return _issuer
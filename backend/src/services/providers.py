@@ -0,0 +1,164 @@
+"""Provider interfaces, capabilities and registry.
+
+VoiceAgent talks to STT, LLM and TTS providers through the interfaces
+below and reads each provider's declared capabilities to pick the fastest
+path it supports. Providers are created by name from ``Settings``
+(``LLM_PROVIDER=gemini:gemini-1.5-flash``); a B variant per kind can be
+assigned to a fraction of sessions to compare provider latency.
+"""
+import zlib
+from typing import (
+    Any, AsyncIterator, Callable, Dict, Iterable, List, NamedTuple, Optional, Protocol, Tuple,
+)
+from ..config import settings
+from ..models import ConversationMessage, LLMResponse
+
+KINDS = ('stt', 'llm', 'tts')
+
+
+class ProviderCapabilities(NamedTuple):
+    """What a provider supports."""
+    # Accepts input incrementally (live audio for STT)
+    streaming_input: bool = False
+    # Produces output incrementally (tokens for LLM, audio chunks for TTS)
+    streaming_output: bool = False
+    # Audio formats accepted (STT) or produced (TTS), preferred first
+    audio_formats: Tuple[str, ...] = ()
+    # Useful concurrent requests per session; None for no limit
+    max_concurrency: Optional[int] = None
+
+
+class STTProvider(Protocol):
+    """Streaming speech-to-text."""
+    capabilities: ProviderCapabilities
+    on_transcript: Optional[Callable]
+    on_utterance_end: Optional[Callable]
+    on_speech_started: Optional[Callable]
+    on_error: Optional[Callable]
+
+    async def start_streaming(self) -> None:
+        """Open the live transcription stream."""
+
+    async def send_audio(self, audio_data: bytes) -> None:
+        """Send caller audio."""
+
+    async def close(self) -> None:
+        """Close the stream."""
+
+
+class LLMProvider(Protocol):
+    """Conversation model."""
+    capabilities: ProviderCapabilities
+
+    async def generate_response(
+        self,
+        conversation_history: List[ConversationMessage],
+        on_partial: Optional[Callable[[str], None]] = None,
+    ) -> LLMResponse:
+        """Reply to the conversation, streaming text to ``on_partial`` if supported."""
+
+
+class TTSProvider(Protocol):
+    """Text-to-speech."""
+    capabilities: ProviderCapabilities
+
+    async def text_to_speech(self, text: str) -> bytes:
+        """Synthesize text in one call."""
+
+    def text_to_speech_chunks(self, text: str) -> AsyncIterator[bytes]:
+        """Synthesize a long text in parallel chunks, in order."""
+
+    async def cached_phrase(self, text: str) -> bytes:
+        """Audio of a fixed phrase, synthesized once per process."""
+
+    async def warm_cache(self, phrases: Iterable[str] = ()) -> None:
+        """Pre-synthesize fixed phrases."""
+
+
+def output_format(tts_service: Any) -> str:
+    """Audio format a TTS provider produces."""
+    capabilities = getattr(tts_service, 'capabilities', None)
+    if capabilities and capabilities.audio_formats:
+        return capabilities.audio_formats[0]
+    return settings.elevenlabs_output_format
+
+
+# kind -> name -> factory(option) building a provider
+_registry: Dict[str, Dict[str, Callable[[str], Any]]] = {kind: {} for kind in KINDS}
+
+
+def register(kind: str, name: str, factory: Callable[[str], Any]):
+    """Register a provider factory; it receives the text after ``name:``."""
+    _registry[kind][name] = factory
+
+
+def available() -> Dict[str, List[str]]:
+    """Registered provider names per kind."""
+    return {kind: sorted(names) for kind, names in _registry.items()}
+
+
+def create(kind: str, spec: str) -> Any:
+    """Build a provider from a ``name`` or ``name:option`` spec."""
+    name, _, option = spec.partition(':')
+    factory = _registry[kind].get(name)
+    if factory is None:
+        raise ValueError(f'Unknown {kind} provider {name!r}; available: {available()[kind]}')
+    return factory(option)
+
+
+def in_variant_b(session_id: str) -> bool:
+    """Stable A/B assignment: a session (and its resumption) always lands in the same group."""
+    return zlib.crc32(session_id.encode()) % 10000 < settings.provider_ab_fraction * 10000
+
+
+def select(session_id: str) -> Dict[str, str]:
+    """Provider spec per kind for a session, applying the B variants."""
+    variant_b = in_variant_b(session_id)
+    specs = {}
+    for kind in KINDS:
+        spec = getattr(settings, f'{kind}_provider')
+        alternative = getattr(settings, f'{kind}_provider_b')
+        specs[kind] = alternative if variant_b and alternative else spec
+    return specs
+
+
+# Built-in providers; modules are imported on first use to keep SDKs lazy
+
+def _deepgram(option: str):
+    from .deepgram import DeepgramService
+    return DeepgramService()
+
+
+def _gemini(option: str):
+    from .gemini import GeminiService
+    return GeminiService(option or None)
+
+
+def _elevenlabs(option: str):
+    from .elevenlabs import ElevenLabsService
+    return ElevenLabsService()
+
+
+def _stub_stt(option: str):
+    from ..replay.stubs import StubSTTService
+    return StubSTTService()
+
+
+def _stub_llm(option: str):
+    from ..replay.stubs import StubLLMService
+    return StubLLMService({}, float(option or 0))
+
+
+def _stub_tts(option: str):
+    from ..replay.stubs import StubTTSService
+    return StubTTSService(float(option or 0))
+
+
+register('stt', 'deepgram', _deepgram)
+register('llm', 'gemini', _gemini)
+register('tts', 'elevenlabs', _elevenlabs)
+
+# Replay stand-ins (``stub`` or ``stub:<latency ms>``)
+register('stt', 'stub', _stub_stt)
+register('llm', 'stub', _stub_llm)
+register('tts', 'stub', _stub_tts)
@@ -0,0 +1,246 @@
+"""Resilience layer shared by provider services.
+
+Each upstream (Gemini, ElevenLabs, ...) gets one process-wide policy that
+combines a per-call deadline and a circuit breaker with an optional
+fallback path. Attempts are never hedged: the SDK calls block in threads,
+so a losing duplicate would keep running and just double the provider load.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+from ..config import settings
+from ..observability.logs import get_logger
+from .budget import ProviderBusyError
+
+log = get_logger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because its breaker is open."""
+
+
+class LatencyTracker:
+    """Rolling window of call latencies."""
+
+    def __init__(self, window: int = 200):
+        """Initialize tracker."""
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, latency_ms: float):
+        """Record a latency sample."""
+        self.samples.append(latency_ms)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the given percentile, or None without samples."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class CircuitBreaker:
+    """Circuit breaker tripped by error-rate or latency SLO breaches."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(
+        self,
+        name: str,
+        latency_slo_ms: float,
+        window: int = 20,
+        min_calls: int = 10,
+        max_error_rate: float = 0.5,
+        max_slow_rate: float = 0.5,
+        cooldown_s: float = 30.0,
+    ):
+        """Initialize breaker."""
+        self.name = name
+        self.latency_slo_ms = latency_slo_ms
+        self.min_calls = min_calls
+        self.max_error_rate = max_error_rate
+        self.max_slow_rate = max_slow_rate
+        self.cooldown_s = cooldown_s
+
+        # Each outcome is (failed, slow)
+        self.outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window)
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.trips = 0
+        self.probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Return whether a call may go upstream."""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.cooldown_s:
+                return False
+            self.state = self.HALF_OPEN
+            self.probe_in_flight = False
+
+        if self.state == self.HALF_OPEN:
+            if self.probe_in_flight:
+                return False
+            self.probe_in_flight = True
+
+        return True
+
+    def release(self):
+        """Give up a call without an outcome (cancelled): free the half-open probe."""
+        if self.state == self.HALF_OPEN:
+            self.probe_in_flight = False
+
+    def record_success(self, latency_ms: float):
+        """Record a successful call."""
+        slow = latency_ms > self.latency_slo_ms
+        if self.state == self.HALF_OPEN:
+            if slow:
+                self._trip()
+            else:
+                self._close()
+            return
+        self.outcomes.append((False, slow))
+        self._evaluate()
+
+    def record_failure(self):
+        """Record a failed or timed out call."""
+        if self.state == self.HALF_OPEN:
+            self._trip()
+            return
+        self.outcomes.append((True, False))
+        self._evaluate()
+
+    def _evaluate(self):
+        """Trip the breaker when the window breaches the SLOs."""
+        total = len(self.outcomes)
+        if total < self.min_calls:
+            return
+
+        errors = sum(1 for failed, _ in self.outcomes if failed)
+        slow = sum(1 for _, is_slow in self.outcomes if is_slow)
+
+        if errors / total >= self.max_error_rate or slow / total >= self.max_slow_rate:
+            self._trip()
+
+    def _trip(self):
+        """Open the breaker."""
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.probe_in_flight = False
+        self.trips += 1
+        self.outcomes.clear()
+        log.warning('circuit breaker opened', breaker=self.name)
+
+    def _close(self):
+        """Close the breaker after a healthy probe."""
+        self.state = self.CLOSED
+        self.probe_in_flight = False
+        self.outcomes.clear()
+        log.info('circuit breaker closed', breaker=self.name)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return breaker state for health output."""
+        total = len(self.outcomes)
+        errors = sum(1 for failed, _ in self.outcomes if failed)
+        slow = sum(1 for _, is_slow in self.outcomes if is_slow)
+        return {
+            'state': self.state,
+            'trips': self.trips,
+            'window_calls': total,
+            'error_rate': errors / total if total else 0.0,
+            'slow_rate': slow / total if total else 0.0,
+        }
+
+
+class ResiliencePolicy:
+    """Deadline + circuit breaker for one upstream."""
+
+    def __init__(self, name: str, timeout_s: float, latency_slo_ms: float):
+        """Initialize policy."""
+        self.name = name
+        self.timeout_s = timeout_s
+        self.latency = LatencyTracker()
+        self.breaker = CircuitBreaker(
+            name,
+            latency_slo_ms=latency_slo_ms,
+            window=settings.breaker_window,
+            min_calls=settings.breaker_min_calls,
+            max_error_rate=settings.breaker_error_rate,
+            max_slow_rate=settings.breaker_slow_rate,
+            cooldown_s=settings.breaker_cooldown_s,
+        )
+
+        self.calls = 0
+        self.timeouts = 0
+        self.fallbacks = 0
+
+    async def call(
+        self,
+        attempt: Callable[[], Awaitable[Any]],
+        fallback: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> Any:
+        """Run an attempt under this policy."""
+        self.calls += 1
+
+        if not self.breaker.allow():
+            if fallback:
+                self.fallbacks += 1
+                return await fallback()
+            raise CircuitOpenError(f'{self.name} circuit is open')
+
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(attempt(), self.timeout_s)
+
+        except (asyncio.CancelledError, ProviderBusyError):
+            # Barge-in, the caller's own deadline or our own budget: no upstream
+            # outcome, but never leave a half-open probe marked in flight, or
+            # every later call is rejected
+            self.breaker.release()
+            raise
+
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                self.timeouts += 1
+                log.warning('deadline exceeded', provider=self.name, timeout_s=self.timeout_s)
+            self.breaker.record_failure()
+            if fallback:
+                self.fallbacks += 1
+                return await fallback()
+            raise
+
+        latency_ms = (time.perf_counter() - started) * 1000
+        self.latency.record(latency_ms)
+        self.breaker.record_success(latency_ms)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return policy statistics for health output."""
+        p95 = self.latency.percentile(95)
+        return {
+            **self.breaker.snapshot(),
+            'calls': self.calls,
+            'timeouts': self.timeouts,
+            'fallbacks': self.fallbacks,
+            'p95_ms': round(p95, 1) if p95 is not None else None,
+        }
+
+
+# Process-wide policies, shared by every session's service instances
+_policies: Dict[str, ResiliencePolicy] = {}
+
+
+def get_policy(name: str, **kwargs) -> ResiliencePolicy:
+    """Get or create the process-wide policy for an upstream."""
+    policy = _policies.get(name)
+    if policy is None:
+        policy = ResiliencePolicy(name, **kwargs)
+        _policies[name] = policy
+    return policy
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Return the state of every registered policy."""
+    return {name: policy.snapshot() for name, policy in _policies.items()}
@@ -0,0 +1,147 @@
+"""Normalized cache of FASE_3 LLM replies.
+
+Many callers ask the same thing in nearly the same words ("tem manutenção
+programada hoje?"), and for the informational scenarios the answer only
+depends on the fixed simulation data in the prompt. Replies are cached by
+model, phase, scenario and the normalized utterance (lowercased,
+accent-folded, stopword-stripped) with TTL and LRU eviction. Turns that
+carry caller-specific slots (digits, the caller's name or UC) or that
+register a new protocol never read or write the cache.
+"""
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+from ..agent.classifier import classify
+from ..agent.dialogue import fold
+from ..config import settings
+
+# Scenarios answered from fixed data only; C/D registrations and B3 create protocols
+CACHEABLE_SCENARIOS = {'A1', 'A2', 'A3', 'A4', 'B1', 'B2', 'D2'}
+
+# Protocols that are part of the simulation data, safe to repeat to any caller
+FIXED_PROTOCOLS = {'DEMO-2024150', 'DEMO-2024098', 'DEMO-2024120'}
+
+PROTOCOL = re.compile(r'DEMO-[\w-]+')
+DIGIT = re.compile(r'\d')
+
+# Function words that don't change the question ("nao" does, so it stays)
+STOPWORDS = {
+    'a', 'o', 'as', 'os', 'um', 'uma', 'uns', 'umas', 'de', 'da', 'do', 'das',
+    'dos', 'em', 'na', 'no', 'nas', 'nos', 'para', 'pra', 'pro', 'por', 'pelo',
+    'pela', 'com', 'e', 'que', 'se', 'me', 'eu', 'minha', 'meu', 'voce', 'ai',
+    'ne', 'ta', 'entao', 'assim', 'sabe', 'oi', 'ola', 'gisa', 'favor', 'queria',
+    'gostaria', 'saber', 'sera', 'tipo', 'bom', 'boa', 'dia', 'tarde', 'noite',
+    'aqui', 'la', 'isso', 'essa', 'esse', 'ja',
+}
+
+# Utterances shorter than this after normalization are too vague to reuse
+MIN_KEY_WORDS = 2
+
+# Shorter parts of a name ("da", "de") are not caller-specific
+MIN_SLOT_CHARS = 3
+
+CacheKey = Tuple[str, str, str, str]
+
+
+def normalize(utterance: str) -> str:
+    """Lowercase, fold accents and punctuation, and drop stopwords."""
+    return ' '.join(w for w in fold(utterance).split() if w not in STOPWORDS)
+
+
+def _mentions(text: str, slots: Sequence[str]) -> bool:
+    """Whether text contains any caller-specific value."""
+    words = set(fold(text).split())
+    # Whole words only ("Ada" must not match "programada"); any part of a
+    # name counts, since replies usually say just the first name
+    return any(
+        word in words
+        for slot in slots
+        for word in fold(slot).split()
+        if len(word) >= MIN_SLOT_CHARS
+    )
+
+
+class ResponseCache:
+    """LRU cache of LLM replies with a TTL, keyed by normalized utterance."""
+
+    def __init__(self, max_entries: int = 512, ttl_s: float = 600.0):
+        """Initialize cache."""
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+
+        # key -> (reply, expires_at, upstream ms it took to generate)
+        self.cache: 'OrderedDict[CacheKey, Tuple[str, float, float]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.rejected = 0
+        self.saved_ms = 0.0
+
+    def key(
+        self, model: str, phase: str, utterance: str, slots: Sequence[str] = ()
+    ) -> Optional[CacheKey]:
+        """Cache key for a turn, or None if the turn must go to the LLM."""
+        scenario = classify(utterance)
+        normalized = normalize(utterance)
+        if (
+            phase != 'FASE_3'
+            # The question itself must carry the scenario signal, not a follow-up
+            or scenario not in CACHEABLE_SCENARIOS
+            or DIGIT.search(utterance)
+            or len(normalized.split()) < MIN_KEY_WORDS
+            or _mentions(utterance, slots)
+        ):
+            self.bypassed += 1
+            return None
+        return (model, phase, scenario, normalized)
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        """Cached reply for a key, if still fresh."""
+        cached = self.cache.get(key)
+        if cached is None or cached[1] < time.monotonic():
+            if cached is not None:
+                del self.cache[key]
+            self.misses += 1
+            return None
+        self.cache.move_to_end(key)
+        self.hits += 1
+        self.saved_ms += cached[2]
+        return cached[0]
+
+    def put(self, key: CacheKey, reply: str, duration_ms: float, slots: Sequence[str] = ()):
+        """Store a reply unless it carries a caller-specific value or a new protocol."""
+        protocols = set(PROTOCOL.findall(reply))
+        if _mentions(reply, slots) or protocols - FIXED_PROTOCOLS:
+            self.rejected += 1
+            return
+        self.cache[key] = (reply, time.monotonic() + self.ttl_s, duration_ms)
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit rate and latency saved."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'bypassed': self.bypassed,
+            'rejected': self.rejected,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            'saved_ms': round(self.saved_ms, 1),
+        }
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the process-wide reply cache, or None when disabled."""
+    global _cache
+    if not settings.llm_cache_enabled:
+        return None
+    if _cache is None:
+        _cache = ResponseCache(settings.llm_cache_max_entries, settings.llm_cache_ttl_s)
+    return _cache
@@ -0,0 +1,253 @@
+"""Process-wide priority scheduler for upstream provider calls.
+
+Calls are admitted within the provider's budget (concurrency + token-bucket
+rate). When the budget is exhausted, waiters are dispatched by strict
+priority class (critical > high > normal) and, within a class, by weighted
+fair queuing across sessions so one chatty session cannot starve the others.
+The queue is bounded and every waiter has a deadline, so overload fails fast
+with ProviderBusyError instead of piling up.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional
+from ..context import current_session_id, current_priority
+from .budget import ProviderBudget, ProviderBusyError
+from .resilience import LatencyTracker
+
+PRIORITY_CLASSES = ('critical', 'high', 'normal')
+
+
+class ClassStats:
+    """Queue wait statistics for one priority class."""
+
+    def __init__(self):
+        """Initialize stats."""
+        self.admitted = 0
+        self.queued = 0
+        self.wait = LatencyTracker()
+
+    def snapshot(self, waiting: int) -> Dict[str, Any]:
+        """Return stats for health output."""
+        p50 = self.wait.percentile(50)
+        p95 = self.wait.percentile(95)
+        return {
+            'waiting': waiting,
+            'admitted': self.admitted,
+            'queued': self.queued,
+            'wait_p50_ms': round(p50, 1) if p50 is not None else None,
+            'wait_p95_ms': round(p95, 1) if p95 is not None else None,
+        }
+
+
+class UpstreamScheduler:
+    """Admits calls to one upstream by priority class and fair share."""
+
+    def __init__(self, name: str, budget: ProviderBudget):
+        """Initialize scheduler."""
+        self.name = name
+        self.budget = budget
+        self.inflight = 0
+        self.retry_timer: Optional[asyncio.TimerHandle] = None
+
+        # Per class heap of (finish_tag, seq, future)
+        self.queues: Dict[str, List] = {c: [] for c in PRIORITY_CLASSES}
+        self.seq = itertools.count()
+
+        # WFQ state: global virtual time and each session's last finish tag
+        self.virtual_time = 0.0
+        self.finish_tags: Dict[str, float] = {}
+        self.stats = {c: ClassStats() for c in PRIORITY_CLASSES}
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        session_id: Optional[str] = None,
+        priority: Optional[str] = None,
+        weight: float = 1.0,
+    ):
+        """Hold one upstream slot for the duration of the block."""
+        await self.acquire(session_id, priority, weight)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(
+        self,
+        session_id: Optional[str] = None,
+        priority: Optional[str] = None,
+        weight: float = 1.0,
+    ):
+        """Wait for a slot; pair with ``release`` (or use ``slot``)."""
+        session_id = session_id if session_id is not None else current_session_id.get()
+        priority = priority or current_priority.get()
+        if priority not in self.queues:
+            priority = 'normal'
+
+        stats = self.stats[priority]
+        started = time.perf_counter()
+
+        if not self._has_waiter() and self._can_admit():
+            self.inflight += 1
+            stats.admitted += 1
+            stats.wait.record(0.0)
+            return
+
+        if self._waiting() >= self.budget.max_queue:
+            self.budget.rejected_full += 1
+            raise ProviderBusyError(f'{self.name} queue is full')
+
+        # Fair-share finish tag: each request costs 1 unit of service
+        start_tag = max(self.virtual_time, self.finish_tags.get(session_id, 0.0))
+        finish_tag = start_tag + 1.0 / weight
+        self.finish_tags[session_id] = finish_tag
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.queues[priority], (finish_tag, next(self.seq), future))
+        stats.queued += 1
+
+        # Slots may be free while the rate budget is empty
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(future, self.budget.max_wait_s)
+        except asyncio.TimeoutError:
+            if not (future.done() and not future.cancelled()):
+                self.budget.rejected_deadline += 1
+                raise ProviderBusyError(
+                    f'{self.name} had no capacity within {self.budget.max_wait_s}s'
+                )
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was granted just as we were cancelled: pass it on
+                self.release()
+            raise
+
+        stats.admitted += 1
+        stats.wait.record((time.perf_counter() - started) * 1000)
+
+    async def run_in_thread(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking upstream call in a thread, holding a slot until it ends.
+
+        A cancelled caller (deadline, barge-in) cannot stop the thread, so the
+        slot is only freed when the thread returns: orphaned calls stay in budget.
+        """
+        await self.acquire()
+        try:
+            future = asyncio.ensure_future(asyncio.to_thread(fn, *args, **kwargs))
+        except BaseException:
+            self.release()
+            raise
+        future.add_done_callback(self._release_after)
+        return await asyncio.shield(future)
+
+    def _release_after(self, future: asyncio.Future):
+        """Done callback of a threaded call: free its slot."""
+        if not future.cancelled():
+            # Nobody may be awaiting an orphaned call; mark its error as seen
+            future.exception()
+        self.release()
+
+    def has_waiters(self) -> bool:
+        """Whether any caller is queued for a slot."""
+        return self._has_waiter()
+
+    def try_acquire(self) -> bool:
+        """Take a slot only if one is free and nobody is waiting (never queues)."""
+        if not self._has_waiter() and self._can_admit():
+            self.inflight += 1
+            return True
+        return False
+
+    def release(self):
+        """Free a slot and dispatch the next waiter."""
+        self.inflight -= 1
+        self._dispatch()
+
+    def _can_admit(self) -> bool:
+        """Whether the budget allows one more call right now."""
+        return self.inflight < self.budget.max_concurrency and self.budget.bucket.try_take()
+
+    def _dispatch(self):
+        """Grant free slots to waiters, highest class and lowest tag first."""
+        while self.inflight < self.budget.max_concurrency and self._has_waiter():
+            if not self.budget.bucket.try_take():
+                self._retry_later(self.budget.bucket.wait_time())
+                return
+
+            finish_tag, _, future = self._pop_next()
+            self.virtual_time = max(self.virtual_time, finish_tag)
+            self.inflight += 1
+            future.set_result(None)
+
+    def _retry_later(self, delay: float):
+        """Dispatch again once the rate budget has refilled."""
+        if self.retry_timer is None:
+            self.retry_timer = asyncio.get_running_loop().call_later(delay, self._on_retry)
+
+    def _on_retry(self):
+        """Timer callback for rate-limited dispatch."""
+        self.retry_timer = None
+        self._dispatch()
+
+    def _has_waiter(self) -> bool:
+        """Whether any live waiter is queued (drops cancelled heads)."""
+        for queue in self.queues.values():
+            while queue and queue[0][2].done():
+                heapq.heappop(queue)
+            if queue:
+                return True
+        return False
+
+    def _pop_next(self):
+        """Pop the next live waiter, highest class first."""
+        for priority in PRIORITY_CLASSES:
+            queue = self.queues[priority]
+            while queue:
+                entry = heapq.heappop(queue)
+                if not entry[2].done():
+                    return entry
+        return None
+
+    def _waiting(self) -> int:
+        """Number of queued waiters (including cancelled ones not yet popped)."""
+        return sum(len(q) for q in self.queues.values())
+
+    def forget(self, session_id: str):
+        """Drop fair-share state of an ended session."""
+        self.finish_tags.pop(session_id, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return scheduler state for health output."""
+        return {
+            **self.budget.snapshot(self.inflight, self._waiting()),
+            'classes': {
+                c: self.stats[c].snapshot(len(self.queues[c])) for c in PRIORITY_CLASSES
+            },
+        }
+
+
+_schedulers: Dict[str, UpstreamScheduler] = {}
+
+
+def get_scheduler(name: str, budget: ProviderBudget) -> UpstreamScheduler:
+    """Get or create the process-wide scheduler for an upstream."""
+    scheduler = _schedulers.get(name)
+    if scheduler is None:
+        scheduler = UpstreamScheduler(name, budget)
+        _schedulers[name] = scheduler
+    return scheduler
+
+
+def forget_session(session_id: str):
+    """Drop an ended session from every scheduler."""
+    for scheduler in _schedulers.values():
+        scheduler.forget(session_id)
+
+
+def scheduler_states() -> Dict[str, Dict[str, Any]]:
+    """Return the state of every scheduler."""
+    return {name: s.snapshot() for name, s in _schedulers.items()}
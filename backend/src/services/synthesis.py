@@ -0,0 +1,101 @@
+"""Synthesis planner: prosodic chunking, speech normalization and ordered parallel TTS."""
+import asyncio
+import re
+from typing import AsyncIterator, Awaitable, Callable, List
+
+DIGIT_WORDS = {
+    '0': 'zero', '1': 'um', '2': 'dois', '3': 'três', '4': 'quatro',
+    '5': 'cinco', '6': 'seis', '7': 'sete', '8': 'oito', '9': 'nove',
+}
+
+# DEMO-2024150, DEMO-VIP-3391, DEMO-OCD4-8812, DEMO-EAC-551
+PROTOCOL_PATTERN = re.compile(r'\bDEMO((?:-[A-Z0-9]+)+)\b')
+
+MARKDOWN_PATTERN = re.compile(r'[*_`#>]+')
+
+# Sentence and line boundaries, keeping the punctuation with its sentence
+SENTENCE_PATTERN = re.compile(r'[^.!?\n]+[.!?]*')
+
+# The head chunk is kept short so the first audio is ready sooner
+HEAD_MAX_CHARS = 80
+MIN_CHUNK_CHARS = 25
+MAX_CHUNK_CHARS = 100
+
+
+def spell_code(code: str) -> List[List[str]]:
+    """Spell a code group by group: letters one by one, digits as words.
+
+    ``DEMO-OCD4-88`` -> ``[['DEMO'], ['O', 'C', 'D', 'quatro'], ['oito', 'oito']]``
+    """
+    groups = []
+    for part in code.strip('-').split('-'):
+        if part == 'DEMO':
+            groups.append([part])
+        else:
+            groups.append([DIGIT_WORDS.get(char, char) for char in part])
+    return groups
+
+
+def normalize_for_speech(text: str) -> str:
+    """Rewrite text so it is read naturally (protocol codes, markdown)."""
+    def protocol(match: re.Match) -> str:
+        return ', '.join(' '.join(group) for group in spell_code(match.group(0)))
+
+    text = PROTOCOL_PATTERN.sub(protocol, text)
+    return MARKDOWN_PATTERN.sub('', text)
+
+
+def plan_chunks(text: str) -> List[str]:
+    """Split a reply into prosodic chunks for parallel synthesis.
+
+    Chunks follow sentence and line boundaries; short sentences are merged
+    with the next one so every chunk keeps natural intonation.
+    """
+    sentences = [s.strip() for s in SENTENCE_PATTERN.findall(text) if s.strip()]
+    # Lines without final punctuation still end in a pause
+    sentences = [s if s[-1] in '.!?:;,' else f'{s}.' for s in sentences]
+
+    chunks: List[str] = []
+    current = ''
+    for sentence in sentences:
+        limit = HEAD_MAX_CHARS if not chunks else MAX_CHUNK_CHARS
+        candidate = f'{current} {sentence}'.strip()
+
+        if current and len(candidate) > limit and len(current) >= MIN_CHUNK_CHARS:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = candidate
+
+    if current:
+        if chunks and len(current) < MIN_CHUNK_CHARS:
+            chunks[-1] = f'{chunks[-1]} {current}'
+        else:
+            chunks.append(current)
+
+    return chunks
+
+
+async def synthesize_ordered(
+    chunks: List[str],
+    synthesize: Callable[[str], Awaitable[bytes]],
+    max_concurrency: int,
+) -> AsyncIterator[bytes]:
+    """Synthesize chunks concurrently and yield their audio strictly in order.
+
+    Each chunk is yielded as soon as it and every chunk before it are ready.
+    Pending syntheses are cancelled if the consumer stops early.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def bounded(chunk: str) -> bytes:
+        async with semaphore:
+            return await synthesize(chunk)
+
+    tasks = [asyncio.create_task(bounded(chunk)) for chunk in chunks]
+    try:
+        for task in tasks:
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,181 @@
+"""Template audio splicing for the fixed closing formats.
+
+The fixed parts of each closing format in ``gisa_prompt.py`` are synthesized
+once per process; only the variable slots (protocol codes, UCs, amounts) are
+looked up or synthesized per reply, and the PCM segments are joined with
+short linear crossfades.
+"""
+import re
+from array import array
+from string import Formatter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from ..config import settings
+from ..agent.gisa_prompt import GISA_CLOSING_TEMPLATES
+from .providers import output_format
+from .synthesis import DIGIT_WORDS, MARKDOWN_PATTERN, spell_code
+
+# What each slot may contain in a reply
+SLOT_PATTERNS = {
+    'protocol': r'DEMO(?:-[A-Z0-9]+)+',
+    'uc': r'\d{3,}',
+    'amount': r'R\$ ?\d{1,3}(?:\.\d{3})*,\d{2}',
+}
+
+# Letters that appear in protocol prefixes (VIP, OCD4, EAC)
+CODE_LETTERS = ('DEMO', 'V', 'I', 'P', 'O', 'C', 'D', 'E', 'A')
+
+CROSSFADE_MS = 10
+TOKEN_GAP_MS = 60
+GROUP_GAP_MS = 180
+SLOT_PAUSE_MS = 120
+
+# Samples quieter than this are trimmed from the edges of spliced clips
+SILENCE_THRESHOLD = 300
+
+
+class Template(NamedTuple):
+    """A closing format split into fixed text and slot names."""
+    name: str
+    pattern: re.Pattern
+    # ('text', phrase) or ('slot', slot name), in order
+    parts: List[Tuple[str, str]]
+
+
+def _collapse(text: str) -> str:
+    """Collapse whitespace so replies match regardless of line breaks."""
+    return ' '.join(text.split())
+
+
+def compile_template(name: str, fmt: str) -> Template:
+    """Build the matcher and part list of a closing format."""
+    regex = []
+    parts = []
+    for literal, field, _, _ in Formatter().parse(fmt):
+        literal = _collapse(literal)
+        if literal:
+            parts.append(('text', literal))
+            regex.append(r'\s*'.join(re.escape(word) for word in literal.split()))
+        if field:
+            parts.append(('slot', field))
+            regex.append(rf'\s*(?P<{field}>{SLOT_PATTERNS[field]})\s*')
+    return Template(name, re.compile(r'\s*'.join(regex)), parts)
+
+
+TEMPLATES = [compile_template(name, fmt) for name, fmt in GISA_CLOSING_TEMPLATES.items()]
+
+
+def _samples(audio_bytes: bytes) -> array:
+    """16-bit PCM bytes as a sample array."""
+    samples = array('h')
+    samples.frombytes(audio_bytes[:len(audio_bytes) - len(audio_bytes) % 2])
+    return samples
+
+
+def trim_silence(samples: array, threshold: int = SILENCE_THRESHOLD) -> array:
+    """Strip quiet samples from both edges of a clip."""
+    start = 0
+    end = len(samples)
+    while start < end and abs(samples[start]) < threshold:
+        start += 1
+    while end > start and abs(samples[end - 1]) < threshold:
+        end -= 1
+    return samples[start:end]
+
+
+def splice(clips: List[array], fade_samples: int) -> bytes:
+    """Join clips, crossfading linearly over ``fade_samples`` at each seam."""
+    out = array('h')
+    for clip in clips:
+        n = min(fade_samples, len(out), len(clip))
+        base = len(out) - n
+        for i in range(n):
+            weight = (i + 1) / (n + 1)
+            out[base + i] = int(out[base + i] * (1 - weight) + clip[i] * weight)
+        out.extend(clip[n:])
+    return out.tobytes()
+
+
+def sample_rate(output_format: str) -> Optional[int]:
+    """Sample rate of a PCM output format (``pcm_16000``), None otherwise."""
+    if not output_format.startswith('pcm_'):
+        return None
+    return int(output_format.split('_')[1])
+
+
+class TemplateEngine:
+    """Renders closing formats from cached phrase audio."""
+
+    def __init__(self, tts_service):
+        """Initialize engine; splicing needs raw PCM output."""
+        self.tts_service = tts_service
+        self.rate = sample_rate(output_format(tts_service))
+        self.enabled = settings.tts_templates_enabled and self.rate is not None
+
+        self.renders = 0
+        self.characters_spliced = 0
+
+    def phrases(self) -> List[str]:
+        """Fixed parts and slot tokens worth caching ahead of time."""
+        if not self.enabled:
+            return []
+        fixed = [text for t in TEMPLATES for kind, text in t.parts if kind == 'text']
+        return fixed + list(CODE_LETTERS) + list(DIGIT_WORDS.values())
+
+    def match(self, text: str) -> Optional[Tuple[Template, Dict[str, str]]]:
+        """Return the template a reply follows and its slot values."""
+        if not self.enabled:
+            return None
+        plain = MARKDOWN_PATTERN.sub('', text).strip()
+        for template in TEMPLATES:
+            found = template.pattern.fullmatch(plain)
+            if found:
+                return template, found.groupdict()
+        return None
+
+    async def render(self, text: str) -> Optional[bytes]:
+        """Splice audio for a reply that follows a closing format, if any."""
+        matched = self.match(text)
+        if not matched:
+            return None
+
+        template, slots = matched
+        clips: List[array] = []
+        for kind, value in template.parts:
+            if kind == 'text':
+                clips.append(await self._clip(value))
+            else:
+                clips.append(self._silence(SLOT_PAUSE_MS))
+                clips.extend(await self._slot_clips(value, slots[value]))
+                clips.append(self._silence(SLOT_PAUSE_MS))
+
+        self.renders += 1
+        self.characters_spliced += len(text)
+        return splice(clips, self.rate * CROSSFADE_MS // 1000)
+
+    async def _slot_clips(self, slot: str, value: str) -> List[array]:
+        """Clips for a slot value: codes token by token, amounts whole."""
+        if slot == 'amount':
+            return [await self._clip(value)]
+
+        groups = spell_code(value) if slot == 'protocol' else [[DIGIT_WORDS[d] for d in value]]
+        clips = []
+        for g, group in enumerate(groups):
+            if g:
+                clips.append(self._silence(GROUP_GAP_MS))
+            for t, token in enumerate(group):
+                if t:
+                    clips.append(self._silence(TOKEN_GAP_MS))
+                clips.append(await self._clip(token))
+        return clips
+
+    async def _clip(self, phrase: str) -> array:
+        """Cached audio of a phrase with its edge silence trimmed."""
+        return trim_silence(_samples(await self.tts_service.cached_phrase(phrase)))
+
+    def _silence(self, ms: int) -> array:
+        """A run of silent samples."""
+        return array('h', bytes(self.rate * ms // 1000 * 2))
+
+    def stats(self) -> Dict[str, int]:
+        """Return splicing counters."""
+        return {'renders': self.renders, 'characters_spliced': self.characters_spliced}
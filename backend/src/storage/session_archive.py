@@ -0,0 +1,343 @@
+"""Append-only session archive with an async batched writer.
+
+Layout of ``archive_dir``::
+
+    segments/segment-000001.seg   length-prefixed, zlib-compressed records
+    index.log                     one line per record: session, date, segment, offset, size
+    audio/<date>/<session_id>/    optional raw audio, one file per utterance
+
+Records are appended by a background task so the event loop never blocks on
+disk I/O; reads go through mmap.
+"""
+import asyncio
+import json
+import mmap
+import os
+import re
+import struct
+import time
+import zlib
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from ..config import settings
+from ..observability.logs import get_logger
+
+log = get_logger(__name__)
+
+# Record header: payload length, crc32 of payload
+HEADER = struct.Struct('<II')
+
+SEGMENT_PATTERN = 'segment-{:06d}.seg'
+
+# Session ids come from clients and end up in file names
+SESSION_ID = re.compile(r'[A-Za-z0-9_-]{1,128}')
+
+
+def safe_session_id(session_id: str) -> str:
+    """Return the session id if it is safe as a path component, else raise ValueError."""
+    if not SESSION_ID.fullmatch(session_id):
+        raise ValueError(f'invalid session id: {session_id!r}')
+    return session_id
+
+
+def _date_of(ts: float) -> str:
+    """Return the UTC date (YYYY-MM-DD) of a timestamp."""
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+class SessionArchive:
+    """Durable, append-only store of session transcripts and metadata."""
+
+    def __init__(
+        self,
+        root: str,
+        segment_bytes: int = 64 * 1024 * 1024,
+        batch_size: int = 256,
+        flush_interval_s: float = 0.5,
+        queue_size: int = 10000,
+        record_audio: bool = False,
+        fsync: bool = True,
+    ):
+        """Initialize archive."""
+        self.root = Path(root)
+        self.segments_dir = self.root / 'segments'
+        self.audio_dir = self.root / 'audio'
+        self.index_path = self.root / 'index.log'
+
+        self.segment_bytes = segment_bytes
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.record_audio = record_audio
+        self.fsync = fsync
+
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.writer_task: Optional[asyncio.Task] = None
+
+        # session_id -> [(segment, offset, size)], date -> [session_id]
+        self.by_session: Dict[str, List[Tuple[int, int, int]]] = defaultdict(list)
+        self.by_date: Dict[str, List[str]] = defaultdict(list)
+
+        self.segment_id = 0
+        self.segment_file = None
+        self.index_file = None
+        self.dropped = 0
+        self.written = 0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        """Open files, load the index and start the background writer."""
+        await asyncio.to_thread(self._open)
+        self.writer_task = asyncio.create_task(self._run())
+        log.info('session archive opened', root=str(self.root), sessions=len(self.by_session))
+
+    async def close(self):
+        """Flush pending records and close files."""
+        if self.writer_task:
+            await self.queue.join()
+            self.writer_task.cancel()
+            try:
+                await self.writer_task
+            except asyncio.CancelledError:
+                pass
+            self.writer_task = None
+        await asyncio.to_thread(self._close_files)
+
+    def _open(self):
+        """Create directories, load the index and open the active segment."""
+        self.segments_dir.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+        existing = sorted(self.segments_dir.glob('segment-*.seg'))
+        if existing:
+            self.segment_id = int(existing[-1].stem.split('-')[1])
+        else:
+            self.segment_id = 1
+
+        self.segment_file = open(self.segments_dir / SEGMENT_PATTERN.format(self.segment_id), 'ab')
+        self.index_file = open(self.index_path, 'a', encoding='utf-8')
+
+    def _load_index(self):
+        """Load the session and date indexes from disk."""
+        if not self.index_path.exists():
+            return
+
+        with open(self.index_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    session_id, date, segment, offset, size = json.loads(line)
+                except ValueError:
+                    continue  # Torn last line after a crash
+                self._index(session_id, date, segment, offset, size)
+
+    def _index(self, session_id: str, date: str, segment: int, offset: int, size: int):
+        """Add one record location to the in-memory indexes."""
+        if session_id not in self.by_session:
+            self.by_date[date].append(session_id)
+        self.by_session[session_id].append((segment, offset, size))
+
+    def _close_files(self):
+        """Sync and close the active files."""
+        for f in (self.segment_file, self.index_file):
+            if f:
+                f.flush()
+                os.fsync(f.fileno())
+                f.close()
+        self.segment_file = None
+        self.index_file = None
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, session_id: str, record: Dict[str, Any]):
+        """Queue a record for a session without blocking."""
+        record.setdefault('ts', time.time())
+        try:
+            self.queue.put_nowait((session_id, record, None))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def append_audio(self, session_id: str, direction: str, audio: bytes):
+        """Queue raw audio for a session (stored in a separate file)."""
+        if not self.record_audio or not audio:
+            return
+        record = {'type': 'audio', 'direction': direction, 'ts': time.time()}
+        try:
+            self.queue.put_nowait((session_id, record, audio))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _run(self):
+        """Drain the queue in batches and write them off the event loop."""
+        while True:
+            batch = [await self.queue.get()]
+            deadline = time.monotonic() + self.flush_interval_s
+
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+                self.written += len(batch)
+            except Exception as e:
+                log.error('session archive write failed', error=str(e))
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _write_batch(self, batch: List[Tuple[str, Dict[str, Any], Optional[bytes]]]):
+        """Append a batch of records to the active segment (blocking)."""
+        index_lines = []
+        locations = []
+
+        for session_id, record, audio in batch:
+            date = _date_of(record['ts'])
+
+            if audio is not None:
+                try:
+                    record['path'] = self._write_audio(session_id, date, record, audio)
+                except ValueError as e:
+                    log.warning('audio not archived', error=str(e))
+
+            record['session_id'] = session_id
+            payload = zlib.compress(
+                json.dumps(record, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+            )
+
+            position = self.segment_file.tell()
+            if position and position + HEADER.size + len(payload) > self.segment_bytes:
+                self._rotate()
+
+            offset = self.segment_file.tell()
+            self.segment_file.write(HEADER.pack(len(payload), zlib.crc32(payload)))
+            self.segment_file.write(payload)
+
+            size = HEADER.size + len(payload)
+            locations.append((session_id, date, self.segment_id, offset, size))
+            index_lines.append(
+                json.dumps([session_id, date, self.segment_id, offset, size], separators=(',', ':'))
+            )
+
+        # Segment data must be durable before the index points at it
+        self.segment_file.flush()
+        if self.fsync:
+            os.fsync(self.segment_file.fileno())
+
+        self.index_file.write('\n'.join(index_lines) + '\n')
+        self.index_file.flush()
+        if self.fsync:
+            os.fsync(self.index_file.fileno())
+
+        # Only expose records to readers once they are on disk
+        for location in locations:
+            self._index(*location)
+
+    def _write_audio(self, session_id: str, date: str, record: Dict[str, Any], audio: bytes) -> str:
+        """Write raw audio to its own file and return its archive-relative path."""
+        directory = self.audio_dir / date / safe_session_id(session_id)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        path = directory / f"{int(record['ts'] * 1000)}-{record['direction']}.raw"
+        with open(path, 'wb') as f:
+            f.write(audio)
+        return str(path.relative_to(self.root))
+
+    def _rotate(self):
+        """Close the active segment and start the next one."""
+        self.segment_file.flush()
+        os.fsync(self.segment_file.fileno())
+        self.segment_file.close()
+
+        self.segment_id += 1
+        self.segment_file = open(self.segments_dir / SEGMENT_PATTERN.format(self.segment_id), 'ab')
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def sessions_by_date(self, date: str) -> List[str]:
+        """Return the session ids first recorded on a date (YYYY-MM-DD)."""
+        return list(self.by_date.get(date, []))
+
+    def read_session(self, session_id: str) -> List[Dict[str, Any]]:
+        """Read every record of a session, in write order."""
+        locations = self.by_session.get(session_id)
+        if not locations:
+            return []
+
+        records = []
+        by_segment: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+        for segment, offset, size in locations:
+            by_segment[segment].append((offset, size))
+
+        for segment, spans in sorted(by_segment.items()):
+            path = self.segments_dir / SEGMENT_PATTERN.format(segment)
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                for offset, size in spans:
+                    length, crc = HEADER.unpack_from(view, offset)
+                    payload = view[offset + HEADER.size:offset + HEADER.size + length]
+                    if zlib.crc32(payload) != crc:
+                        log.warning('corrupt archive record', segment=segment, offset=offset)
+                        continue
+                    records.append(json.loads(zlib.decompress(payload)))
+
+        return records
+
+    def read_audio(self, record: Dict[str, Any]) -> bytes:
+        """Read the raw audio referenced by an audio record."""
+        path = self.root / record['path']
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            return bytes(view)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return writer statistics."""
+        return {
+            'sessions': len(self.by_session),
+            'segment': self.segment_id,
+            'pending': self.queue.qsize(),
+            'written': self.written,
+            'dropped': self.dropped,
+        }
+
+
+# Process-wide archive, created on startup when enabled
+_archive: Optional[SessionArchive] = None
+
+
+def get_archive() -> Optional[SessionArchive]:
+    """Return the process-wide archive, or None when disabled."""
+    return _archive
+
+
+async def start_archive() -> Optional[SessionArchive]:
+    """Create and start the process-wide archive if enabled."""
+    global _archive
+    if not settings.archive_enabled or _archive is not None:
+        return _archive
+
+    _archive = SessionArchive(
+        settings.archive_dir,
+        segment_bytes=settings.archive_segment_mb * 1024 * 1024,
+        record_audio=settings.archive_audio,
+    )
+    await _archive.start()
+    return _archive
+
+
+async def stop_archive():
+    """Flush and close the process-wide archive."""
+    global _archive
+    if _archive is not None:
+        await _archive.close()
+        _archive = None
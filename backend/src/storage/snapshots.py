@@ -0,0 +1,130 @@
+"""Session snapshots handed from a draining worker to the next one.
+
+Snapshots are zlib-compressed JSON files in a directory shared by the
+workers (``snapshot_dir``), and/or are posted to a peer worker
+(``snapshot_peer_url``). A reconnecting client that starts a session with
+the same id resumes from its snapshot.
+"""
+import asyncio
+import os
+import time
+import zlib
+from pathlib import Path
+from typing import List, Optional
+from ..config import settings
+from ..models import SessionSnapshot
+from ..observability.logs import get_logger
+from .session_archive import safe_session_id
+
+log = get_logger(__name__)
+
+
+def encode(snapshot: SessionSnapshot) -> bytes:
+    """Serialize a snapshot compactly."""
+    return zlib.compress(snapshot.model_dump_json(exclude_none=True).encode('utf-8'))
+
+
+def decode(data: bytes) -> SessionSnapshot:
+    """Deserialize a snapshot."""
+    return SessionSnapshot.model_validate_json(zlib.decompress(data))
+
+
+class SnapshotStore:
+    """Directory of pending session snapshots, consumed on resume."""
+
+    def __init__(self, root: str, ttl_s: float = 300.0):
+        """Initialize store."""
+        self.root = Path(root)
+        self.ttl_s = ttl_s
+
+    def _path(self, session_id: str) -> Path:
+        """File holding a session's snapshot (ValueError for unsafe ids)."""
+        return self.root / f'{safe_session_id(session_id)}.snap'
+
+    def save(self, snapshot: SessionSnapshot):
+        """Write a snapshot atomically (blocking)."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(snapshot.state.session_id)
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(encode(snapshot))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def take(self, session_id: str) -> Optional[SessionSnapshot]:
+        """Load and remove a session's snapshot, if present and fresh (blocking)."""
+        try:
+            path = self._path(session_id)
+        except ValueError:
+            # No snapshot can have been saved under an unsafe id
+            return None
+        try:
+            data = path.read_bytes()
+            path.unlink()
+        except FileNotFoundError:
+            return None
+
+        snapshot = decode(data)
+        if time.time() - snapshot.taken_at > self.ttl_s:
+            log.info('snapshot expired', session_id=session_id)
+            return None
+        return snapshot
+
+
+_store: Optional[SnapshotStore] = None
+
+
+def get_snapshot_store() -> SnapshotStore:
+    """Return the process-wide snapshot store."""
+    global _store
+    if _store is None:
+        _store = SnapshotStore(settings.snapshot_dir, ttl_s=settings.snapshot_ttl_s)
+    return _store
+
+
+def _save_all(snapshots: List[SessionSnapshot]) -> int:
+    """Save snapshots to the shared directory, skipping unsafe session ids (blocking)."""
+    store = get_snapshot_store()
+    saved = 0
+    for snapshot in snapshots:
+        try:
+            store.save(snapshot)
+            saved += 1
+        except ValueError as e:
+            log.warning('snapshot not saved', error=str(e))
+    return saved
+
+
+async def _post_to_peer(snapshots: List[SessionSnapshot]):
+    """Send snapshots to the peer worker."""
+    import aiohttp
+
+    url = settings.snapshot_peer_url.rstrip('/') + '/api/session/snapshot'
+    async with aiohttp.ClientSession() as http:
+        for snapshot in snapshots:
+            async with http.post(url, data=snapshot.model_dump_json(exclude_none=True),
+                                 headers={'Content-Type': 'application/json',
+                                          'X-Admin-Token': settings.admin_token}) as response:
+                response.raise_for_status()
+
+
+async def hand_off(snapshots: List[SessionSnapshot]) -> int:
+    """Make snapshots available to the worker that will resume the sessions.
+
+    Returns how many were saved to the shared directory.
+    """
+    if not snapshots:
+        return 0
+
+    saved = await asyncio.to_thread(_save_all, snapshots)
+
+    if settings.snapshot_peer_url:
+        try:
+            await _post_to_peer(snapshots)
+        except Exception as e:
+            # The shared directory still has them
+            log.warning('snapshot handoff to peer failed', error=str(e))
+
+    log.info('snapshots handed off', count=saved)
+    return saved
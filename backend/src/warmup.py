@@ -0,0 +1,105 @@
+"""Background warm-up of provider SDKs, shared clients and the TTS cache."""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional
+from .observability.logs import get_logger
+
+log = get_logger(__name__)
+
+# Backoff between retries of a failed warm-up stage
+RETRY_BASE_S = 1.0
+RETRY_MAX_S = 30.0
+
+
+class Readiness:
+    """Tracks warm-up progress for the readiness endpoint."""
+
+    def __init__(self):
+        """Initialize readiness state."""
+        self.ready = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.stages: Dict[str, str] = {}
+
+    def snapshot(self) -> Dict:
+        """Return readiness state."""
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+        return {
+            'ready': self.ready,
+            'stages': dict(self.stages),
+            'warmup_s': round(elapsed, 3) if elapsed is not None else None,
+        }
+
+
+readiness = Readiness()
+
+
+async def _stage(name: str, run: Callable[[], Awaitable], retry: bool = False) -> bool:
+    """Run one warm-up stage and record its outcome, retrying with backoff if asked."""
+    attempt = 0
+    while True:
+        readiness.stages[name] = 'running'
+        started = time.perf_counter()
+        try:
+            await run()
+            readiness.stages[name] = f'ok ({(time.perf_counter() - started) * 1000:.0f}ms)'
+            return True
+        except Exception as e:
+            if not retry:
+                readiness.stages[name] = f'failed: {e}'
+                log.warning('warm-up stage failed', stage=name, error=str(e))
+                return False
+
+            # A transient failure at boot must not keep /ready at 503 for good
+            delay = min(RETRY_MAX_S, RETRY_BASE_S * 2 ** attempt)
+            attempt += 1
+            readiness.stages[name] = f'failed: {e} (retry {attempt} in {delay:.0f}s)'
+            log.warning('warm-up stage failed', stage=name, error=str(e),
+                        attempt=attempt, retry_in_s=delay)
+            await asyncio.sleep(delay)
+
+
+async def warm_up():
+    """Import SDKs and build shared clients off the loop, then fill the TTS cache."""
+    from .services import deepgram, gemini, elevenlabs, livekit_tokens
+    from .agent.dialogue import SCRIPTED_PHRASES
+    from .services.tts_templates import TemplateEngine
+
+    readiness.started_at = time.time()
+
+    async def stt():
+        await _stage('deepgram', lambda: asyncio.to_thread(deepgram.warm_up), retry=True)
+        # Pre-open live STT connections once the client exists
+        deepgram.start_pool()
+
+    async def tts():
+        await _stage('elevenlabs', lambda: asyncio.to_thread(elevenlabs.warm_up), retry=True)
+        # Hold audio, scripted FASE_1/FASE_2 phrases and closing template fragments,
+        # once per process. A cold cache only costs latency: it doesn't block readiness
+        service = elevenlabs.ElevenLabsService()
+        phrases = SCRIPTED_PHRASES + tuple(TemplateEngine(service).phrases())
+        await _stage('tts_cache', lambda: service.warm_cache(phrases))
+
+    # SDK imports are blocking and independent, so run them in parallel threads;
+    # each is retried until it succeeds, and only then is the process ready
+    await asyncio.gather(
+        stt(),
+        _stage('gemini', lambda: asyncio.to_thread(gemini.warm_up), retry=True),
+        tts(),
+        # Otherwise the first /api/token imports it on the event loop
+        _stage('livekit', lambda: asyncio.to_thread(livekit_tokens.warm_up), retry=True),
+    )
+
+    readiness.finished_at = time.time()
+    readiness.ready = True
+    log.info(
+        'warm-up finished',
+        duration_ms=round((readiness.finished_at - readiness.started_at) * 1000, 1),
+    )
+
+
+def mark_ready():
+    """Mark the process ready without warming up."""
+    readiness.ready = True